@@ -1,9 +1,11 @@
 """Audio input module for capturing microphone audio."""
 import sounddevice as sd
 import numpy as np
-import queue
 import threading
-from typing import Callable, Optional
+import time
+from typing import Optional
+from utils.endpointer import Endpointer
+from utils.ring_buffer import CallbackStats, RecordingBuffer, SPSCRingBuffer
 import config
 
 
@@ -12,20 +14,65 @@ class AudioInput:
     
     def __init__(self):
         self.is_recording = False
-        self.audio_queue = queue.Queue()
         self.stream = None
-        self.recorded_frames = []
+        self.buffer = self._new_buffer()
+        self.stream_to = None
+        self.drain_thread: Optional[threading.Thread] = None
         
-    def start_recording(self) -> None:
-        """Start recording audio from microphone."""
+        # Speech boundaries within the recording (absolute frame positions)
+        self.endpointer = Endpointer(
+            sample_rate=config.SAMPLE_RATE,
+            pre_roll_ms=config.VAD_PRE_ROLL_MS,
+            hangover_ms=config.VAD_HANGOVER_MS
+        )
+        self.speech_start: Optional[int] = None
+        self.speech_end: Optional[int] = None
+        
+        # Lock-free handoff from the audio callback to the drain thread
+        self.handoff = SPSCRingBuffer(
+            int(config.CALLBACK_BUFFER_SECONDS * config.SAMPLE_RATE),
+            channels=config.CHANNELS,
+            dtype=config.AUDIO_FORMAT
+        )
+        self.callback_stats = CallbackStats(config.SAMPLE_RATE)
+    
+    def _new_buffer(self) -> RecordingBuffer:
+        """Preallocate storage for one recording."""
+        max_frames = None
+        if config.MAX_RECORDING_SECONDS:
+            max_frames = int(config.MAX_RECORDING_SECONDS * config.SAMPLE_RATE)
+        
+        return RecordingBuffer(
+            int(config.RECORDING_PREALLOCATE_SECONDS * config.SAMPLE_RATE),
+            channels=config.CHANNELS,
+            dtype=config.AUDIO_FORMAT,
+            max_frames=max_frames
+        )
+    
+    def start_recording(self, stream_to=None) -> None:
+        """
+        Start recording audio from microphone.
+        
+        Args:
+            stream_to: Optional consumer with a ``feed(chunk)`` method (such
+                as a streaming transcription) that receives audio while
+                recording is still in progress
+        """
+        # Fresh storage, since the previous recording may still be in use
+        self.buffer = self._new_buffer()
+        self.stream_to = stream_to
+        self.handoff.clear()
+        self.endpointer.reset()
+        self.speech_start = None
+        self.speech_end = None
         self.is_recording = True
-        self.recorded_frames = []
         
-        def audio_callback(indata, frames, time, status):
-            if status:
-                print(f"Audio input status: {status}")
+        def audio_callback(indata, frames, time_info, status):
+            # Runs on the PortAudio thread: copy into the ring and count, nothing else
+            started = time.perf_counter()
             if self.is_recording:
-                self.audio_queue.put(indata.copy())
+                self.handoff.write(indata)
+            self.callback_stats.record(frames, started, status)
         
         self.stream = sd.InputStream(
             samplerate=config.SAMPLE_RATE,
@@ -35,31 +82,86 @@ class AudioInput:
             blocksize=config.CHUNK_SIZE
         )
         self.stream.start()
+        
+        self.drain_thread = threading.Thread(target=self._drain_while_recording, daemon=True)
+        self.drain_thread.start()
+    
+    def _drain_while_recording(self) -> None:
+        """Process newly recorded audio while the stream runs."""
+        while self.is_recording:
+            time.sleep(0.05)
+            self._process_new_audio()
+    
+    def _process_new_audio(self) -> None:
+        """Move handed-off audio into the recording and run it through the endpointer and stream consumer."""
+        chunk = self.handoff.read()
+        if not len(chunk):
+            return
+        
+        self.buffer.write(chunk)
+        
+        if self.stream_to is not None:
+            self.stream_to.feed(chunk)
+        
+        event = self.endpointer.process(chunk)
+        if event == Endpointer.START and self.speech_start is None:
+            self.speech_start = self.endpointer.speech_start
+        elif event == Endpointer.END:
+            self.speech_end = self.endpointer.speech_end
     
     def stop_recording(self) -> np.ndarray:
-        """Stop recording and return the audio data."""
-        self.is_recording = False
+        """
+        Stop recording and return the audio data.
         
-        # Collect all recorded frames
-        while not self.audio_queue.empty():
-            self.recorded_frames.append(self.audio_queue.get())
+        Leading and trailing silence beyond the endpointer's pre-roll and
+        hangover is trimmed when speech was detected.
         
+        Returns:
+            Recorded frames, shape (frames, channels). This is a view of the
+            recording buffer, not a copy.
+        """
         if self.stream:
             self.stream.stop()
             self.stream.close()
+            self.stream = None
+        self.is_recording = False
+        
+        if self.drain_thread:
+            self.drain_thread.join()
+            self.drain_thread = None
         
-        if not self.recorded_frames:
-            return np.array([], dtype=config.AUDIO_FORMAT)
+        self._process_new_audio()
+        self.stream_to = None
         
-        # Concatenate all frames
-        audio_data = np.concatenate(self.recorded_frames, axis=0)
-        return audio_data
+        audio = self.buffer.view()
+        if self.speech_start is None:
+            return audio
+        
+        first = self.buffer.total_frames - len(audio)
+        end = self.buffer.total_frames
+        if self.speech_end is not None and not self.endpointer.in_speech:
+            end = self.speech_end
+        return audio[max(0, self.speech_start - first):max(0, end - first)]
+    
+    def get_stats(self) -> dict:
+        """Get statistics for the current (or last) recording."""
+        return {
+            'frames': self.buffer.total_frames,
+            'seconds': self.buffer.total_frames / config.SAMPLE_RATE,
+            'capacity_frames': self.buffer.capacity,
+            'overflow_frames': self.buffer.overflow_frames,
+            'overflow_events': self.buffer.overflow_events,
+            'dropped_frames': self.handoff.dropped_frames,
+            **self.callback_stats.as_dict(),
+            'speech_detected': self.speech_start is not None,
+            'noise_floor': self.endpointer.noise_floor
+        }
     
     def get_audio_level(self) -> float:
         """Get current audio level for interrupt detection."""
-        if not self.audio_queue.empty():
-            data = self.audio_queue.get()
-            return np.abs(data).mean()
+        data = self.buffer.tail(config.CHUNK_SIZE)
+        if len(data):
+            return float(np.abs(data).mean())
         return 0.0
     
     def cleanup(self) -> None:
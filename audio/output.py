@@ -1,9 +1,8 @@
 """Audio output module for playing synthesized speech."""
-import sounddevice as sd
-import numpy as np
 import threading
-import queue
-from typing import Optional
+from typing import Iterable, Optional
+from audio.playback import PlaybackStream, StopReport
+from providers.tts import SAMPLE_RATE as TTS_SAMPLE_RATE
 import config
 
 
@@ -11,93 +10,113 @@ class AudioOutput:
     """Handles audio playback with interrupt capability."""
     
     def __init__(self):
-        self.is_playing = False
         self.should_stop = False
         self.playback_thread: Optional[threading.Thread] = None
+        self.stream_stopped = threading.Event()
+        self.player = PlaybackStream(
+            sample_rate=TTS_SAMPLE_RATE,
+            target_ms=config.PLAYBACK_TARGET_MS,
+            speed=config.TTS_SPEED
+        )
+        self.queued_until = 0
+        self.last_stop: Optional[StopReport] = None
+    
+    @property
+    def is_playing(self) -> bool:
+        return self.player.playing
+    
+    @property
+    def played_seconds(self) -> float:
+        return self.player.played_seconds
+    
+    @property
+    def sample_rate(self) -> int:
+        """Rate of the output stream; stream positions count these samples."""
+        return self.player.sample_rate
+    
+    @property
+    def speed(self) -> float:
+        """Speaking rate; can be changed while speech is playing."""
+        return self.player.speed
+    
+    @speed.setter
+    def speed(self, value: float) -> None:
+        self.player.speed = value
+    
+    def play_audio(self, audio_data: bytes, sample_rate: int = TTS_SAMPLE_RATE, final: bool = True, label=None) -> int:
+        """
+        Queue 16-bit PCM audio to play right after anything already playing.
         
-    def play_audio(self, audio_data: bytes, sample_rate: int = 24000) -> None:
-        """Play audio data with interrupt capability."""
-        self.should_stop = False
-        self.is_playing = True
-        
-        # Convert bytes to numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
+        Args:
+            audio_data: PCM bytes; chunks need not end on a sample boundary
+            sample_rate: Samples per second
+            final: False for a chunk of audio that is still arriving; call
+                ``finish_stream`` after the last one
+            label: Identifies this audio (e.g. its sentence) in stop reports
         
-        def playback():
-            try:
-                sd.play(audio_array, samplerate=sample_rate)
-                
-                # Check for interrupts while playing
-                while sd.get_stream().active and not self.should_stop:
-                    sd.sleep(100)
-                
-                if self.should_stop:
-                    sd.stop()
-            finally:
-                self.is_playing = False
-        
-        self.playback_thread = threading.Thread(target=playback)
-        self.playback_thread.start()
+        Returns:
+            Stream position where this audio ends, for ``wait_until_done``
+        """
+        self.should_stop = False
+        self.queued_until = self.player.enqueue(audio_data, sample_rate, final=final, label=label)
+        return self.queued_until
     
-    def play_streaming_audio(self, audio_stream) -> None:
-        """Play audio from a streaming source."""
+    def finish_stream(self) -> None:
+        """Mark the end of audio queued with ``final=False``."""
+        self.player.finish()
+    
+    def play_streaming_audio(self, audio_stream: Iterable[bytes], sample_rate: int = TTS_SAMPLE_RATE) -> None:
+        """Play 16-bit PCM audio from a streaming source as chunks arrive."""
         self.should_stop = False
-        self.is_playing = True
+        stopped = self.stream_stopped = threading.Event()
         
         def stream_playback():
             try:
-                audio_queue = queue.Queue()
-                
-                def callback(outdata, frames, time, status):
-                    if status:
-                        print(f"Audio output status: {status}")
-                    
-                    if self.should_stop:
-                        raise sd.CallbackStop()
-                    
-                    try:
-                        data = audio_queue.get_nowait()
-                        outdata[:len(data)] = data.reshape(-1, 1)
-                    except queue.Empty:
-                        outdata.fill(0)
-                
-                # Start output stream
-                with sd.OutputStream(
-                    samplerate=24000,
-                    channels=1,
-                    callback=callback,
-                    dtype='int16'
-                ):
-                    # Feed audio chunks to queue
-                    for chunk in audio_stream:
-                        if self.should_stop:
-                            break
-                        audio_data = np.frombuffer(chunk, dtype=np.int16)
-                        audio_queue.put(audio_data)
-                    
-                    # Wait for queue to empty
-                    while not audio_queue.empty() and not self.should_stop:
-                        sd.sleep(100)
-                        
+                for chunk in audio_stream:
+                    if stopped.is_set():
+                        break
+                    self.queued_until = self.player.enqueue(chunk, sample_rate, final=False)
             finally:
-                self.is_playing = False
+                if not stopped.is_set():
+                    self.finish_stream()
         
-        self.playback_thread = threading.Thread(target=stream_playback)
+        self.playback_thread = threading.Thread(target=stream_playback, daemon=True)
         self.playback_thread.start()
     
-    def stop(self) -> None:
-        """Stop current playback immediately."""
-        self.should_stop = True
-        sd.stop()
+    def stop(self) -> StopReport:
+        """
+        Stop current playback within one audio block.
         
-        if self.playback_thread and self.playback_thread.is_alive():
-            self.playback_thread.join(timeout=1.0)
+        A streaming source still being read is abandoned; its thread exits
+        at the next chunk.
+        
+        Returns:
+            How many samples of each queued clip were played
+        """
+        self.should_stop = True
+        self.stream_stopped.set()
+        self.playback_thread = None
+        self.last_stop = self.player.stop()
+        return self.last_stop
     
-    def wait_until_done(self) -> None:
-        """Wait until playback is complete."""
+    def wait_until_done(self, position: Optional[int] = None) -> None:
+        """
+        Wait until playback is complete.
+        
+        Args:
+            position: Wait only until this position (from ``play_audio``)
+                has played, instead of everything queued
+        """
         if self.playback_thread:
             self.playback_thread.join()
+            self.playback_thread = None
+        self.player.wait(position, lambda: self.should_stop)
+    
+    def get_stats(self) -> dict:
+        """Get playback buffer and underrun statistics."""
+        return self.player.get_stats()
     
     def cleanup(self) -> None:
         """Clean up audio resources."""
         self.stop()
+        self.player.close()
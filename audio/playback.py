@@ -0,0 +1,265 @@
+"""Persistent output stream for gapless speech playback."""
+import threading
+import time
+from typing import Any, Callable, List, NamedTuple, Optional, Union
+
+import numpy as np
+import sounddevice as sd
+
+from utils.jitter_buffer import JitterBuffer
+from utils.metrics import metrics
+from utils.ring_buffer import CallbackStats
+from utils.time_stretch import TimeStretcher
+
+
+class SegmentPlayback(NamedTuple):
+    """How much of one queued clip (such as a sentence) was played."""
+    label: Any
+    played: int  # Samples played
+    total: int  # Samples queued
+
+
+class StopReport(NamedTuple):
+    """Outcome of stopping playback."""
+    position: int  # Stream position playback was cut at
+    latency: float  # Seconds from the stop request until output went silent
+    segments: List[SegmentPlayback]
+
+
+class PlaybackStream:
+    """
+    A long-lived, callback-driven output stream fed by a jitter buffer.
+    
+    The PortAudio stream is opened on first use and kept open, so queuing a
+    sentence costs no stream startup and consecutive sentences play without
+    a gap. The callback only copies from the jitter buffer and counts.
+    
+    ``stop`` silences output at the next audio block and reports exactly
+    how many samples of each queued clip were played. When audio was
+    playing, its latency is recorded in the ``playback.interrupt_latency``
+    histogram.
+    
+    Audio is time-stretched to ``speed`` as it is queued, without changing
+    its pitch, so the speaking rate can change between or within clips.
+    Positions and sample counts refer to the stretched audio.
+    """
+    
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        target_ms: int = 80,
+        blocksize: int = 0,
+        latency: Union[str, float] = 'low',
+        speed: float = 1.0
+    ):
+        self.channels = channels
+        self._speed = speed
+        self.target_ms = target_ms
+        self.blocksize = blocksize
+        self.latency = latency
+        self.stream: Optional[sd.OutputStream] = None
+        self._lock = threading.Lock()
+        
+        # Set by the callback
+        self.output_delay = 0.0  # Seconds from callback to the speaker
+        self.flush_applied_at = 0.0
+        
+        self._reset(sample_rate)
+    
+    def _reset(self, sample_rate: int) -> None:
+        """Create a fresh jitter buffer (the stream must be closed)."""
+        self.sample_rate = sample_rate
+        self.buffer = JitterBuffer(sample_rate, self.channels, self.target_ms)
+        self.callback_stats = CallbackStats(sample_rate)
+        self.stretcher = TimeStretcher(sample_rate, self._speed)
+        
+        # Clips queued since the last stop: [label, start, end or None while arriving]
+        self.segments: List[list] = []
+    
+    @property
+    def playing(self) -> bool:
+        """Whether audio is queued or playing."""
+        return self.buffer.buffered > 0
+    
+    @property
+    def speed(self) -> float:
+        """Playback speed (1.0 = as synthesized)."""
+        return self.stretcher.rate
+    
+    @speed.setter
+    def speed(self, value: float) -> None:
+        # Applies from the next queued audio, mid-clip included
+        self.stretcher.rate = value
+        self._speed = self.stretcher.rate
+    
+    @property
+    def played_seconds(self) -> float:
+        """Seconds of audio played (or flushed) since the stream was opened."""
+        return self.buffer.played / self.sample_rate
+    
+    def enqueue(
+        self,
+        audio: Union[bytes, np.ndarray],
+        sample_rate: Optional[int] = None,
+        final: bool = True,
+        label: Any = None
+    ) -> int:
+        """
+        Queue audio to play after whatever is already queued.
+        
+        Args:
+            audio: int16 PCM bytes, or int16/float samples
+            sample_rate: Rate of ``audio``; a different rate than the open
+                stream's waits for the queue to drain and reopens the stream
+            final: No more audio follows right away, so play it out even
+                if it is shorter than the target buffer depth. Pass False
+                for chunks of a stream that is still arriving.
+            label: Names the clip in ``stop`` reports; chunks queued with
+                ``final=False`` belong to one clip until ``finish``
+        
+        Returns:
+            Position at which the audio ends, for ``wait``
+        """
+        with self._lock:
+            if sample_rate and sample_rate != self.sample_rate:
+                self.wait(self.buffer.write_index)
+                self._close_stream()
+                self._reset(sample_rate)
+            self._open_stream()
+            
+            if not self.segments or self.segments[-1][2] is not None:
+                self._prune_segments()
+                self.segments.append([label, self.buffer.write_index, None])
+            
+            if self.stretcher.active or self._speed != 1.0:
+                audio = self.stretcher.process(self.buffer.to_frames(audio))
+        
+        end = self.buffer.append(audio)
+        if final:
+            self.finish()
+        return end
+    
+    def finish(self) -> None:
+        """Mark the end of a clip queued with ``final=False``."""
+        with self._lock:
+            tail = self.stretcher.flush()
+        if len(tail):
+            self.buffer.append(tail)
+        
+        self.buffer.mark_end()
+        with self._lock:
+            if self.segments and self.segments[-1][2] is None:
+                self.segments[-1][2] = self.buffer.write_index
+    
+    def wait(self, position: Optional[int] = None, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Block until the stream has played up to ``position``.
+        
+        Args:
+            position: Position returned by ``enqueue`` (default: everything queued)
+            should_stop: Optional check that ends the wait early
+        """
+        if position is None:
+            position = self.buffer.write_index
+        while self.buffer.played < position:
+            if should_stop and should_stop():
+                return
+            if self.stream is None or not self.stream.active:
+                return
+            time.sleep(0.01)
+    
+    def flush(self) -> None:
+        """Drop everything queued; playback goes silent within one block."""
+        self.buffer.flush()
+    
+    def stop(self, timeout: float = 0.25) -> StopReport:
+        """
+        Stop playback at the next audio block and report what was played.
+        
+        Args:
+            timeout: Longest wait for the callback to apply the stop
+        
+        Returns:
+            StopReport with the cut position, the latency until silence
+            and per-clip played sample counts
+        """
+        requested = time.perf_counter()
+        queued = self.buffer.write_index
+        was_playing = self.playing
+        generation = self.buffer.flush()
+        
+        # Stopping silence is not an interruption, so it records no latency
+        deadline = requested + timeout
+        active = was_playing and self.stream is not None and self.stream.active
+        while active and self.buffer.applied_generation < generation and time.perf_counter() < deadline:
+            time.sleep(0.0005)
+        
+        if active and self.buffer.applied_generation >= generation:
+            # Audio handed to the device before the cut still has to play out
+            position = self.buffer.cut_position
+            output_delay = self.output_delay if self.output_delay > 0 else self.stream.latency
+            latency = max(0.0, self.flush_applied_at - requested) + output_delay
+            metrics.histogram("playback.interrupt_latency").observe(latency)
+        else:
+            position = self.buffer.played
+            latency = 0.0
+        
+        with self._lock:
+            self.stretcher.reset()
+            segments = []
+            for label, start, end in self.segments:
+                total = (queued if end is None else end) - start
+                segments.append(SegmentPlayback(label, min(max(position - start, 0), total), total))
+            self.segments = []
+        
+        return StopReport(position, latency, segments)
+    
+    def get_stats(self) -> dict:
+        """Get buffer depth, underrun and callback statistics."""
+        return {**self.buffer.get_stats(), **self.callback_stats.as_dict()}
+    
+    def close(self) -> None:
+        """Stop and close the output stream."""
+        self.buffer.flush()
+        with self._lock:
+            self._close_stream()
+    
+    def _open_stream(self) -> None:
+        if self.stream is not None:
+            return
+        
+        buffer = self.buffer
+        stats = self.callback_stats
+        
+        def callback(outdata, frames, time_info, status):
+            # Runs on the PortAudio thread: copy from the buffer and count, nothing else
+            started = time.perf_counter()
+            generation = buffer.applied_generation
+            buffer.read_into(outdata)
+            if buffer.applied_generation != generation:
+                self.flush_applied_at = started
+                self.output_delay = time_info.outputBufferDacTime - time_info.currentTime
+            stats.record(frames, started, status)
+        
+        self.stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype='float32',
+            blocksize=self.blocksize,
+            latency=self.latency,
+            callback=callback
+        )
+        self.stream.start()
+    
+    def _prune_segments(self) -> None:
+        """Forget clips that finished playing, keeping the most recent."""
+        played = self.buffer.played
+        while len(self.segments) > 1 and self.segments[0][2] is not None and self.segments[0][2] <= played:
+            self.segments.pop(0)
+    
+    def _close_stream(self) -> None:
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
@@ -0,0 +1,7 @@
+"""Init file for benchmarks package."""
+
+# Add parent directory to path for imports
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
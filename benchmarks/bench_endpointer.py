@@ -0,0 +1,163 @@
+"""
+Benchmark for streaming speech endpointing.
+
+Generates synthetic speech-like bursts (voiced harmonics with syllable
+gaps) over background noise that slowly gets louder, then runs it through
+the old recognizer logic (50-block ring recounted with list comprehensions
+on every block), the old core/audio_input polling (energy of the latest
+block every 100 ms) and Endpointer. Reports CPU time per
+second of audio and how long after the true boundaries speech start and end
+are reported.
+
+Usage:
+    python -m benchmarks.bench_endpointer
+"""
+
+import collections
+import time
+
+import numpy as np
+
+from utils.endpointer import Endpointer
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+SAMPLE_RATE = 16000
+BLOCK = 480  # 30 ms, the recognizer's block size
+SEED = 7
+
+# (start, end) seconds of each utterance
+UTTERANCES = [(1.0, 3.2), (5.0, 6.1), (8.5, 11.0), (13.0, 14.2)]
+DURATION = 16.0
+
+
+def make_signal():
+    """Synthetic recording and its true utterance boundaries."""
+    rng = np.random.default_rng(SEED)
+    t = np.arange(int(DURATION * SAMPLE_RATE)) / SAMPLE_RATE
+    
+    # Background noise that drifts up over the recording
+    noise_level = 0.002 + 0.01 * t / DURATION
+    signal = rng.normal(0.0, 1.0, len(t)) * noise_level
+    
+    for start, end in UTTERANCES:
+        mask = (t >= start) & (t < end)
+        local = t[mask] - start
+        pitch = 140 + 20 * np.sin(2 * np.pi * 0.7 * local)
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+        # Syllables at 4 Hz with short gaps in between
+        envelope = np.clip(np.sin(2 * np.pi * 4 * local), 0.15, 1.0)
+        signal[mask] += 0.15 * voice * envelope
+    
+    return np.clip(signal, -1, 1).astype(np.float32)
+
+
+def legacy_endpoints(blocks, classify):
+    """Old SpeechRecognizer.detect_speech state machine."""
+    ring = collections.deque(maxlen=50)
+    triggered = False
+    events = []
+    for index, block in enumerate(blocks):
+        is_speech = classify(block)
+        ring.append((block, is_speech))
+        if not triggered:
+            num_voiced = len([f for f, speech in ring if speech])
+            if num_voiced > 0.75 * ring.maxlen:
+                triggered = True
+                events.append(("start", index))
+                ring.clear()
+        else:
+            num_unvoiced = len([f for f, speech in ring if not speech])
+            if num_unvoiced > 0.75 * ring.maxlen:
+                triggered = False
+                events.append(("end", index))
+                ring.clear()
+    return events
+
+
+def legacy_poll_endpoints(blocks):
+    """Old core AudioInput._record_with_vad loop."""
+    check_every = 3  # ~100 ms of 30 ms blocks
+    has_speech = False
+    silence_duration = 0
+    events = []
+    for index in range(check_every - 1, len(blocks), check_every):
+        recent_chunk = blocks[index]
+        energy = np.sum(recent_chunk ** 2) / len(recent_chunk)
+        if energy > 0.01:
+            if not has_speech:
+                events.append(("start", index))
+            has_speech = True
+            silence_duration = 0
+        elif has_speech:
+            silence_duration += 100
+            if silence_duration >= 500:
+                has_speech = False
+                events.append(("end", index))
+    return events
+
+
+def endpointer_endpoints(blocks, classifier=None):
+    """Endpointer with default settings."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE, classifier=classifier)
+    events = []
+    for index, block in enumerate(blocks):
+        event = endpointer.process(block)
+        if event:
+            events.append((event, index))
+    return events
+
+
+def score(events):
+    """Mean start/end detection delay (seconds) and missed/extra utterances."""
+    starts = [(index + 1) * BLOCK / SAMPLE_RATE for kind, index in events if kind == "start"]
+    ends = [(index + 1) * BLOCK / SAMPLE_RATE for kind, index in events if kind == "end"]
+    
+    start_delays, end_delays = [], []
+    for true_start, true_end in UTTERANCES:
+        start = [s for s in starts if true_start <= s < true_end]
+        end = [e for e in ends if e >= true_end]
+        if start and end:
+            start_delays.append(start[0] - true_start)
+            end_delays.append(end[0] - true_end)
+    
+    missed = len(UTTERANCES) - len(end_delays)
+    extra = max(0, len(starts) - len(UTTERANCES))
+    mean = lambda values: sum(values) / len(values) if values else float("nan")
+    return mean(start_delays), mean(end_delays), missed, extra
+
+
+def main():
+    signal = make_signal()
+    pcm = (signal * 32767).astype(np.int16)
+    float_blocks = [signal[i:i + BLOCK] for i in range(0, len(signal) - BLOCK + 1, BLOCK)]
+    int_blocks = [pcm[i:i + BLOCK] for i in range(0, len(pcm) - BLOCK + 1, BLOCK)]
+    
+    runs = []
+    if webrtcvad is not None:
+        vad = webrtcvad.Vad(3)
+        classify = lambda block: vad.is_speech(block.tobytes(), SAMPLE_RATE)
+        runs.append(("legacy ring + webrtcvad", lambda: legacy_endpoints(int_blocks, classify)))
+        runs.append(("endpointer + webrtcvad", lambda: endpointer_endpoints(int_blocks, classify)))
+    
+    runs.append(("legacy poll + energy", lambda: legacy_poll_endpoints(float_blocks)))
+    runs.append(("endpointer (adaptive)", lambda: endpointer_endpoints(float_blocks)))
+    
+    print(f"{'strategy':<26}{'CPU us/s audio':>16}{'start delay':>13}{'end delay':>11}{'missed':>8}{'extra':>7}")
+    print("-" * 81)
+    for name, run in runs:
+        repeats = 5
+        started = time.process_time()
+        for _ in range(repeats):
+            events = run()
+        cpu = (time.process_time() - started) / repeats
+        start_delay, end_delay, missed, extra = score(events)
+        print(f"{name:<26}{cpu / DURATION * 1e6:>16.0f}{start_delay:>13.3f}{end_delay:>11.3f}{missed:>8}{extra:>7}")
+
+
+if __name__ == "__main__":
+    main()
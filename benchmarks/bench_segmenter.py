@@ -0,0 +1,138 @@
+"""
+Benchmark for streaming TTS segmentation.
+
+Replays sample responses as a simulated LLM token stream and models TTS
+latency and playback time, comparing the old per-token sentence check with
+SentenceSegmenter. Reports TTS requests per response, time to first audio
+and total silence between segments.
+
+Usage:
+    python -m benchmarks.bench_segmenter
+"""
+
+from utils.helpers import calculate_speaking_time
+from utils.segmenter import SentenceSegmenter
+
+# Simulated timings (seconds)
+LLM_FIRST_TOKEN = 0.40
+LLM_TOKEN_INTERVAL = 1 / 40
+TTS_BASE_LATENCY = 0.35
+TTS_LATENCY_PER_CHAR = 0.004
+
+RESPONSES = [
+    "Sure! Dr. Smith's study found a 3.5 percent improvement, which is modest. "
+    "Still, it was consistent across all groups. I'd call that a solid result.",
+    
+    "Okay.",
+    
+    "Here's the short version: the train leaves at 9.15 a.m. and takes about "
+    "two hours, so you'll arrive around eleven. If you want, I can also check "
+    "the return times for you. Just let me know which day works best.",
+    
+    "Python was created by Guido van Rossum and first released in 1991 and it "
+    "has since become one of the most widely used programming languages in the "
+    "world thanks to its readable syntax and its huge ecosystem of libraries "
+    "for everything from web development to data science and machine learning "
+    "and it keeps growing every year",
+    
+    "Hmm, good question. There are a few options, e.g. a bus, a taxi, or a "
+    "bike. The bus is cheapest. A taxi is fastest. A bike is the most fun, "
+    "honestly. Which would you prefer?",
+]
+
+
+def tokenize(text):
+    """Split text into LLM-like tokens (words with leading spaces)."""
+    words = text.split(" ")
+    return [words[0]] + [" " + word for word in words[1:]]
+
+
+def naive_segments(tokens):
+    """Segment with the old per-token sentence-ending check."""
+    buffer = []
+    for i, token in enumerate(tokens):
+        buffer.append(token)
+        if any(token.endswith(end) for end in ['.', '!', '?', '\n']):
+            sentence = "".join(buffer).strip()
+            if sentence:
+                yield i, sentence
+            buffer = []
+    if "".join(buffer).strip():
+        yield len(tokens) - 1, "".join(buffer).strip()
+
+
+def segmenter_segments(tokens, clock):
+    """Segment with SentenceSegmenter on a simulated clock."""
+    segmenter = SentenceSegmenter(clock=lambda: clock[0])
+    for i, token in enumerate(tokens):
+        clock[0] = token_time(i)
+        for segment in segmenter.push(token):
+            yield i, segment
+    for segment in segmenter.flush():
+        yield len(tokens) - 1, segment
+
+
+def token_time(index):
+    """Arrival time of the index-th token."""
+    return LLM_FIRST_TOKEN + index * LLM_TOKEN_INTERVAL
+
+
+def simulate(segments):
+    """
+    Play segments through a single TTS worker and sequential playback.
+    
+    Returns:
+        (request count, time to first audio, total silence after first audio)
+    """
+    tts_free_at = 0.0
+    playback_end = None
+    first_audio = None
+    silence = 0.0
+    requests = 0
+    
+    for token_index, text in segments:
+        requests += 1
+        synth_start = max(token_time(token_index), tts_free_at)
+        audio_ready = synth_start + TTS_BASE_LATENCY + TTS_LATENCY_PER_CHAR * len(text)
+        tts_free_at = audio_ready
+        
+        if playback_end is None:
+            first_audio = audio_ready
+            start = audio_ready
+        else:
+            start = max(audio_ready, playback_end)
+            silence += start - playback_end
+        playback_end = start + calculate_speaking_time(text, words_per_minute=165)
+    
+    return requests, first_audio, silence
+
+
+def main():
+    print(f"{'strategy':<12}{'requests':>10}{'first audio (s)':>18}{'silence (s)':>14}")
+    print("-" * 54)
+    
+    totals = {}
+    for name in ("naive", "segmenter"):
+        totals[name] = [0, 0.0, 0.0]
+    
+    for text in RESPONSES:
+        tokens = tokenize(text)
+        runs = {
+            "naive": simulate(naive_segments(tokens)),
+            "segmenter": simulate(segmenter_segments(tokens, [0.0])),
+        }
+        for name, (requests, first_audio, silence) in runs.items():
+            print(f"{name:<12}{requests:>10}{first_audio:>18.3f}{silence:>14.3f}")
+            totals[name][0] += requests
+            totals[name][1] += first_audio
+            totals[name][2] += silence
+        print()
+    
+    count = len(RESPONSES)
+    print("Averages per response")
+    for name, (requests, first_audio, silence) in totals.items():
+        print(f"{name:<12}{requests / count:>10.1f}{first_audio / count:>18.3f}{silence / count:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
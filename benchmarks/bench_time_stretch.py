@@ -0,0 +1,105 @@
+"""
+Benchmark for local playback-speed changes.
+
+Time-stretches a synthetic spoken passage at 24 kHz to several speeds with
+TimeStretcher, both in one call and fed in 4096-byte TTS chunks the way
+the playback stream receives them, and compares it with the same WSOLA
+written as a plain per-candidate loop. Reports CPU milliseconds per second
+of input and the real-time factor. BLAS is limited to one thread, so the
+figures are for a single core.
+
+Usage:
+    python -m benchmarks.bench_time_stretch
+"""
+
+import os
+
+# One core: keep BLAS from spreading the matrix-vector products over threads
+for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(variable, "1")
+
+import time
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from benchmarks.bench_endpointer import make_signal
+from utils.time_stretch import TimeStretcher, time_stretch
+
+TTS_RATE = 24000
+CHUNK = 2048  # Samples in a 4096-byte PCM chunk
+SPEEDS = [0.75, 1.25, 1.5, 2.0]
+REPEATS = 3
+
+
+def make_passage() -> np.ndarray:
+    """Speech-like audio at the TTS sample rate."""
+    return resample_poly(make_signal(), 3, 2).astype(np.float32)
+
+
+def loop_wsola(audio: np.ndarray, rate: float, frame: int = 480, tolerance: int = 120) -> np.ndarray:
+    """Reference WSOLA with the offset search and overlap-add as Python loops."""
+    hop = frame // 2
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)
+    x = np.concatenate([np.zeros(hop), audio, np.zeros(frame + 2 * tolerance)])
+    frames = int((len(x) - frame - 2 * tolerance) / (hop * rate))
+    out = np.zeros(frames * hop + frame)
+    previous = None
+    
+    for k in range(frames):
+        nominal = int(round(k * hop * rate))
+        best = nominal
+        if previous is not None:
+            template = x[previous + hop:previous + hop + frame]
+            best_score = -np.inf
+            for candidate in range(max(nominal - tolerance, 0), nominal + tolerance + 1):
+                score = np.dot(x[candidate:candidate + frame], template)
+                if score > best_score:
+                    best, best_score = candidate, score
+        out[k * hop:k * hop + frame] += window * x[best:best + frame]
+        previous = best
+    
+    return out[hop:hop + int(round(len(audio) / rate))]
+
+
+def stream_stretch(audio: np.ndarray, rate: float) -> np.ndarray:
+    """Stretch chunk by chunk, as the playback stream does."""
+    stretcher = TimeStretcher(TTS_RATE, rate)
+    parts = [stretcher.process(audio[i:i + CHUNK]) for i in range(0, len(audio), CHUNK)]
+    parts.append(stretcher.flush())
+    return np.concatenate(parts)
+
+
+def measure(stretch, audio: np.ndarray, rate: float, repeats: int = REPEATS):
+    """CPU seconds per call, and the output length."""
+    out = stretch(audio, rate)
+    started = time.process_time()
+    for _ in range(repeats):
+        stretch(audio, rate)
+    return (time.process_time() - started) / repeats, len(out)
+
+
+def main():
+    audio = make_passage()
+    seconds = len(audio) / TTS_RATE
+    
+    header = f"{'speed':>6}  {'path':<22}{'out s':>8}{'CPU ms/s':>10}{'x real time':>13}"
+    print(header)
+    print("-" * len(header))
+    
+    for rate in SPEEDS:
+        paths = [
+            ('loop WSOLA (reference)', loop_wsola, 1),
+            ('TimeStretcher, 1 call', lambda a, r: time_stretch(a, r, TTS_RATE), REPEATS),
+            ('TimeStretcher, chunks', stream_stretch, REPEATS),
+        ]
+        for name, stretch, repeats in paths:
+            cpu, frames = measure(stretch, audio, rate, repeats)
+            print(f"{rate:>6.2f}  {name:<22}{frames / TTS_RATE:>8.2f}{1000 * cpu / seconds:>10.2f}"
+                  f"{seconds / cpu:>13.0f}")
+    
+    print(f"\nInput: {seconds:.1f} s at {TTS_RATE} Hz, 20 ms frames, 5 ms search tolerance")
+
+
+if __name__ == "__main__":
+    main()
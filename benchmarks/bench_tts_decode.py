@@ -0,0 +1,116 @@
+"""
+Benchmark for decoding synthesized speech before playback.
+
+Encodes a synthetic spoken sentence at 24 kHz in each TTS response format
+and reports the cost of turning one response into playable samples: the
+old path (pydub.AudioSegment.from_mp3, which starts an ffmpeg subprocess,
+then array -> NumPy -> float32), libsndfile decoding in process, and raw
+PCM. Also shows the download size per sentence, which is what PCM trades
+for skipping the decode.
+
+Usage:
+    python -m benchmarks.bench_tts_decode
+"""
+
+import io
+import shutil
+import time
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from benchmarks.bench_endpointer import make_signal
+from utils.codecs import RESPONSE_FORMATS, AudioDecoder, decode_audio, decode_available
+from utils.wav import to_pcm16
+
+TTS_RATE = 24000
+SENTENCE = (1.0, 4.2)  # Seconds of the synthetic recording used as one sentence
+REPEATS = 10
+
+
+def make_sentence() -> np.ndarray:
+    """One sentence of speech-like audio at the TTS sample rate."""
+    audio = resample_poly(make_signal(), 3, 2).astype(np.float32)
+    start, end = (int(t * TTS_RATE) for t in SENTENCE)
+    return audio[start:end]
+
+
+def encode(sentence: np.ndarray, response_format: str) -> bytes:
+    """Encode a sentence the way the TTS service would return it."""
+    if response_format == 'pcm':
+        return to_pcm16(sentence).tobytes()
+    
+    file_format, subtype = RESPONSE_FORMATS[response_format]
+    buffer = io.BytesIO()
+    sf.write(buffer, sentence, TTS_RATE, format=file_format, subtype=subtype)
+    return buffer.getvalue()
+
+
+def pydub_decode(data: bytes) -> np.ndarray:
+    """The previous core/audio_output decode path."""
+    from pydub import AudioSegment
+    
+    audio_segment = AudioSegment.from_mp3(io.BytesIO(data))
+    samples = np.array(audio_segment.get_array_of_samples())
+    if audio_segment.channels == 2:
+        samples = samples.reshape((-1, 2))
+    return samples.astype(np.float32) / 32768.0
+
+
+def measure(decode, data: bytes):
+    """Wall and CPU milliseconds per decode."""
+    decode(data)  # Warm up
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    for _ in range(REPEATS):
+        decode(data)
+    wall = (time.perf_counter() - wall_started) / REPEATS
+    cpu = (time.process_time() - cpu_started) / REPEATS
+    return wall * 1000, cpu * 1000
+
+
+def main():
+    sentence = make_sentence()
+    seconds = len(sentence) / TTS_RATE
+    
+    header = f"{'path':<30}{'KB':>8}{'wall ms':>10}{'CPU ms':>9}{'ms/s audio':>12}"
+    print(header)
+    print("-" * len(header))
+    
+    def row(name, data, decode):
+        wall, cpu = measure(decode, data)
+        print(f"{name:<30}{len(data) / 1024:>8.1f}{wall:>10.2f}{cpu:>9.2f}{wall / seconds:>12.2f}")
+    
+    mp3 = encode(sentence, 'mp3') if decode_available('mp3') else None
+    if mp3 is None:
+        print(f"{'mp3 via pydub/ffmpeg (old)':<30}  (libsndfile cannot write MP3 here)")
+    elif shutil.which('ffmpeg') is None:
+        print(f"{'mp3 via pydub/ffmpeg (old)':<30}  (ffmpeg not installed)")
+    else:
+        row('mp3 via pydub/ffmpeg (old)', mp3, pydub_decode)
+    
+    for response_format in ('mp3', 'opus', 'flac'):
+        if not decode_available(response_format):
+            print(f"{response_format + ' in process':<30}  (not supported by this libsndfile)")
+            continue
+        data = mp3 if response_format == 'mp3' else encode(sentence, response_format)
+        row(f"{response_format} in process", data, lambda d, f=response_format: decode_audio(d, f))
+    
+    row('pcm (new default)', encode(sentence, 'pcm'), lambda d: decode_audio(d, 'pcm', TTS_RATE))
+    
+    # Several sentences decoding at once on the worker pool
+    if mp3 is not None:
+        decoder = AudioDecoder(workers=2)
+        started = time.perf_counter()
+        futures = [decoder.submit(mp3, 'mp3') for _ in range(8)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        decoder.shutdown()
+        print(f"\nDecoder pool (2 workers): 8 mp3 sentences in {elapsed * 1000:.1f} ms")
+    
+    print(f"Sentence: {seconds:.1f} s at {TTS_RATE} Hz; times are per sentence")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark for STT upload codecs.
+
+Encodes a synthetic speech-like recording (voiced harmonics with syllable
+gaps over background noise) with each available upload codec and reports
+bytes per second of audio, bytes saved against WAV, encoding CPU time per
+second of audio, and the resulting upload time on a few uplink speeds.
+
+Usage:
+    python -m benchmarks.bench_upload_codecs
+"""
+
+import time
+
+from benchmarks.bench_endpointer import SAMPLE_RATE, DURATION, make_signal
+from utils.codecs import CODECS, codec_available, encode_audio
+
+UPLINKS_KBPS = [256, 1000, 5000]
+REPEATS = 5
+
+
+def encoded_size(audio_file):
+    """Size in bytes of an encoded upload."""
+    audio_file.seek(0, 2)
+    size = audio_file.tell()
+    audio_file.seek(0)
+    return size
+
+
+def main():
+    audio = make_signal().reshape(-1, 1)
+    
+    header = f"{'codec':<8}{'KB/s audio':>12}{'saved':>8}{'CPU ms/s audio':>16}"
+    header += "".join(f"{f'@{kbps} kbit/s':>15}" for kbps in UPLINKS_KBPS)
+    print(header)
+    print("-" * len(header))
+    
+    wav_size = None
+    for codec in CODECS:
+        if not codec_available(codec):
+            print(f"{codec:<8}  (not supported by this libsndfile)")
+            continue
+        
+        started = time.process_time()
+        for _ in range(REPEATS):
+            audio_file = encode_audio(audio, SAMPLE_RATE, codec)
+        cpu = (time.process_time() - started) / REPEATS
+        
+        size = encoded_size(audio_file)
+        if wav_size is None:
+            wav_size = size
+        
+        # Upload seconds for the whole recording, plus encoding time
+        row = f"{codec:<8}{size / DURATION / 1024:>12.1f}{1 - size / wav_size:>8.0%}{cpu / DURATION * 1000:>16.2f}"
+        for kbps in UPLINKS_KBPS:
+            upload = size * 8 / (kbps * 1000) + cpu
+            row += f"{upload:>14.2f}s"
+        print(row)
+    
+    print(f"\nRecording: {DURATION:.0f} s at {SAMPLE_RATE} Hz; upload columns include encoding time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark for WAV encoding of recorded audio before upload.
+
+Compares the three encoders the STT paths used before (soundfile into a
+BytesIO, scipy wavfile after an int16 copy, and the wave module through a
+temp file) with utils.wav.encode_wav. Each run encodes a float32 recording
+and streams the result out in 64 KiB reads, as an HTTP upload would.
+Reports mean time and peak traced memory relative to the recording size.
+
+Usage:
+    python -m benchmarks.bench_wav_encoder
+"""
+
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+import soundfile as sf
+from scipy.io import wavfile
+
+from utils.wav import encode_wav
+
+SAMPLE_RATE = 16000
+DURATIONS = [5, 30, 120]  # seconds of audio
+REPEATS = 5
+READ_SIZE = 64 * 1024
+
+
+def stream_out(audio_file):
+    """Read a file object to the end the way an upload would."""
+    total = 0
+    while True:
+        chunk = audio_file.read(READ_SIZE)
+        if not chunk:
+            return total
+        total += len(chunk)
+
+
+def soundfile_bytesio(audio):
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, SAMPLE_RATE, format='WAV', subtype='PCM_16')
+    buffer.seek(0)
+    return stream_out(buffer)
+
+
+def scipy_wavfile(audio):
+    buffer = io.BytesIO()
+    wavfile.write(buffer, SAMPLE_RATE, (audio * 32767).astype(np.int16))
+    buffer.seek(0)
+    return stream_out(buffer)
+
+
+def wave_tempfile(audio):
+    pcm = (audio * 32767).astype(np.int16).tobytes()
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
+        temp_path = temp_audio.name
+        with wave.open(temp_path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(pcm)
+    try:
+        with open(temp_path, 'rb') as audio_file:
+            return stream_out(audio_file)
+    finally:
+        os.unlink(temp_path)
+
+
+def zero_copy(audio):
+    return stream_out(encode_wav(audio, SAMPLE_RATE))
+
+
+ENCODERS = [
+    ("soundfile BytesIO", soundfile_bytesio),
+    ("scipy wavfile", scipy_wavfile),
+    ("wave temp file", wave_tempfile),
+    ("encode_wav", zero_copy),
+]
+
+
+def measure(encoder, audio):
+    """Mean seconds per encode and peak traced bytes."""
+    encoder(audio)  # warm up
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        encoder(audio)
+    elapsed = (time.perf_counter() - started) / REPEATS
+    
+    tracemalloc.start()
+    encoder(audio)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'encoder':<20}{'audio (s)':>10}{'time (ms)':>12}{'peak (MiB)':>12}{'peak / PCM':>12}")
+    print("-" * 66)
+    
+    for seconds in DURATIONS:
+        audio = rng.uniform(-0.5, 0.5, (seconds * SAMPLE_RATE, 1)).astype(np.float32)
+        pcm_bytes = audio.size * 2
+        for name, encoder in ENCODERS:
+            elapsed, peak = measure(encoder, audio)
+            print(f"{name:<20}{seconds:>10}{elapsed * 1000:>12.2f}{peak / 2**20:>12.2f}{peak / pcm_bytes:>12.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,21 +6,63 @@ load_dotenv()
 # API Keys
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 
 # Audio Settings
 SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK_SIZE = 1024
 AUDIO_FORMAT = "float32"  # sounddevice uses float32 by default
+RECORDING_PREALLOCATE_SECONDS = 15  # Capture buffer size before it grows
+MAX_RECORDING_SECONDS = None  # Keep only the most recent audio past this (None = unlimited)
+CALLBACK_BUFFER_SECONDS = 2.0  # Audio the input callback can hand off before the reader catches up
+VAD_PRE_ROLL_MS = 300  # Audio kept before detected speech
+VAD_HANGOVER_MS = 500  # Silence after speech before it counts as ended
 
 # Speech Recognition
+STT_BACKEND = "openai"  # "openai", "local" (in-process faster-whisper) or "stub"
+STT_FALLBACK_BACKEND = None  # Used when the primary backend fails, e.g. "local"
+STT_LOCAL_MODEL = "base.en"  # faster-whisper model for the local backend
 WHISPER_MODEL = "whisper-1"
 STT_LANGUAGE = "en"
+STT_BASE_URL = "https://api.openai.com/v1"
+STT_STREAMING = True  # Upload audio while the user is still speaking
+STT_TIMEOUT = 30.0  # Seconds to wait for a transcript
+STT_UPLOAD_CODEC = "flac"  # Upload format for full recordings: "wav", "flac" (lossless) or "opus"
+STT_SEGMENT_SECONDS = 15.0  # Split longer recordings at pauses and transcribe in parallel (None = never)
+STT_SEGMENT_OVERLAP = 0.5  # Overlap (seconds) where a split finds no pause
+STT_MAX_PARALLEL = 4  # Concurrent transcription requests per recording
+
+# Speech Gate (skips transcription of recordings without speech)
+SPEECH_GATE = True
+SPEECH_MIN_VOICED_SECONDS = 0.25  # Voiced audio needed to transcribe
+SPEECH_MIN_LEVEL = 1e-4  # Minimum block energy (mean square) for speech
+SPEECH_PADDING_SECONDS = 0.2  # Silence kept around the speech when trimming
 
 # Text-to-Speech
+TTS_PROVIDER = "openai"  # "openai", "elevenlabs" or "local" (offline test tone)
+TTS_FALLBACK_PROVIDER = None  # Hedge slow requests to this provider, e.g. "elevenlabs"
+TTS_HEDGE_DEADLINE = 0.6  # Seconds to wait for the provider's first audio byte before hedging
 TTS_MODEL = "tts-1"
 TTS_VOICE = "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
-TTS_SPEED = 1.0
+TTS_SPEED = 1.0  # Playback speed (0.25-4.0), applied locally by time-stretching
+TTS_STREAM_CHUNK_BYTES = 4096  # PCM read per chunk while streaming (about 85 ms at 24 kHz)
+ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+ELEVENLABS_MODEL = "eleven_turbo_v2_5"
+TTS_CACHE = True  # Reuse audio for sentences already synthesized
+TTS_CACHE_MEMORY_MB = 16  # In-memory LRU tier
+TTS_CACHE_DIR = ".tts_cache"  # On-disk tier (None = memory only)
+TTS_CACHE_DISK_MB = 256
+TTS_LOOKAHEAD = 2  # Sentences synthesized ahead of the one playing
+TTS_CONCURRENCY = 3  # TTS requests in flight at once
+TTS_SCHEDULE_MARGIN = 0.3  # Seconds of unplayed speech kept beyond the expected TTS first-audio time
+PLAYBACK_TARGET_MS = 80  # Audio buffered before playback starts, absorbing late chunks
+
+# Streaming segmentation (characters per TTS request, seconds)
+SEGMENT_FIRST_MIN_CHARS = 20  # Shortest first clause sent to TTS
+SEGMENT_MIN_CHARS = 60  # Shortest later chunk
+SEGMENT_MAX_CHARS = 250  # Longest chunk
+SEGMENT_DEADLINE = 0.6  # Cut pending text after this long without a boundary
 
 # LLM Settings
 LLM_MODEL = "claude-sonnet-4-20250514"
@@ -35,5 +77,10 @@ LONG_TERM_SUMMARY_THRESHOLD = 20  # Summarize after this many messages
 INTERRUPT_SILENCE_THRESHOLD = 0.02  # Audio amplitude threshold for voice detection
 INTERRUPT_MIN_DURATION = 0.3  # Minimum speech duration to trigger interrupt (seconds)
 
+# Provider HTTP pools (shared by every client)
+HTTP_MAX_CONNECTIONS = 10  # Per provider
+HTTP_KEEPALIVE_EXPIRY = 120.0  # Seconds an idle connection stays open
+HTTP2 = True  # Used when the h2 package is installed
+
 # File Paths
 MEMORY_FILE = "conversation_memory.json"
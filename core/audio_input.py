@@ -4,12 +4,15 @@ Captures microphone input and converts to text.
 """
 
 import asyncio
+import time
 import numpy as np
 import sounddevice as sd
-from openai import OpenAI
-import io
-from scipy.io import wavfile
+from providers.clients import registry as clients
+from providers.stt import get_stt_backend
+from utils.endpointer import Endpointer
 from utils.logger import setup_logger
+from utils.ring_buffer import CallbackStats, RecordingBuffer, SPSCRingBuffer
+from utils.wav import WavReader, encode_wav
 
 logger = setup_logger(__name__)
 
@@ -19,14 +22,25 @@ class AudioInput:
     
     def __init__(self, config):
         self.config = config
-        self.client = OpenAI(api_key=config.get('OPENAI_API_KEY'))
+        self.stt = get_stt_backend(
+            config.get('STT_BACKEND', 'openai'),
+            language='en',
+            api_key=config.get('OPENAI_API_KEY'),
+            model=config.get('STT_MODEL', 'whisper-1')
+        )
         
         self.sample_rate = config.get_int('SAMPLE_RATE', 16000)
         self.channels = config.get_int('CHANNELS', 1)
         self.chunk_size = config.get_int('CHUNK_SIZE', 1024)
         
         self.is_recording = False
-        self.audio_buffer = []
+        
+        # Lock-free handoff from the audio callback to the recording loop
+        self.handoff = SPSCRingBuffer(
+            int(config.get_float('CALLBACK_BUFFER_SECONDS', 2.0) * self.sample_rate),
+            channels=self.channels
+        )
+        self.callback_stats = CallbackStats(self.sample_rate)
         
         logger.info("AudioInput initialized")
     
@@ -42,6 +56,8 @@ class AudioInput:
             if audio_data is None or len(audio_data) == 0:
                 return ""
             
+            clients.record_turn(self._providers())
+            
             # Convert to WAV format for Whisper
             wav_buffer = self._to_wav_buffer(audio_data)
             
@@ -49,27 +65,30 @@ class AudioInput:
             text = await self._transcribe(wav_buffer)
             
             return text.strip()
-            
+        
         except Exception as e:
             logger.error(f"Error in listen: {e}", exc_info=True)
             return ""
     
     async def _record_with_vad(self) -> np.ndarray:
         """Record audio with voice activity detection."""
-        self.audio_buffer = []
         self.is_recording = True
+        self.handoff.clear()
         
-        silence_threshold = self.config.get_int('SILENCE_THRESHOLD', 500)
-        silence_duration = 0
-        has_speech = False
+        endpointer = Endpointer(
+            sample_rate=self.sample_rate,
+            pre_roll_ms=self.config.get_int('VAD_PRE_ROLL_MS', 300),
+            hangover_ms=self.config.get_int('SILENCE_THRESHOLD', 500)
+        )
+        max_samples = 30 * self.sample_rate
+        recording = RecordingBuffer(max_samples, channels=self.channels)
+        dropped = self.handoff.dropped_frames
         
         def audio_callback(indata, frames, time_info, status):
-            """Callback for audio stream."""
-            if status:
-                logger.warning(f"Audio callback status: {status}")
-            
-            # Add to buffer
-            self.audio_buffer.append(indata.copy())
+            """Callback for audio stream: copy into the ring and count, nothing else."""
+            started = time.perf_counter()
+            self.handoff.write(indata)
+            self.callback_stats.record(frames, started, status)
         
         # Start recording stream
         with sd.InputStream(callback=audio_callback,
@@ -77,72 +96,61 @@ class AudioInput:
                           samplerate=self.sample_rate,
                           blocksize=self.chunk_size):
             
-            # Monitor for speech and silence
+            # Run every new block through the endpointer
             while self.is_recording:
                 await asyncio.sleep(0.1)
                 
-                # Check if we have audio
-                if len(self.audio_buffer) > 0:
-                    # Simple energy-based VAD
-                    recent_chunk = self.audio_buffer[-1]
-                    energy = np.sum(recent_chunk ** 2) / len(recent_chunk)
-                    
-                    if energy > 0.01:  # Speech detected
-                        has_speech = True
-                        silence_duration = 0
-                    elif has_speech:  # Silence after speech
-                        silence_duration += 100  # 100ms per check
-                        
-                        if silence_duration >= silence_threshold:
-                            self.is_recording = False
-                            break
+                chunk = self.handoff.read()
+                recording.write(chunk)
+                event = endpointer.process(chunk) if len(chunk) else None
                 
-                # Timeout after 30 seconds
-                if len(self.audio_buffer) * 0.1 > 30:
+                if event == Endpointer.START:
+                    # Speech started, so warm the STT and LLM pools
+                    clients.warm_up(self._providers())
+                elif event == Endpointer.END:
+                    self.is_recording = False
+                
+                # Timeout after 30 seconds of audio
+                if endpointer.position >= max_samples:
                     self.is_recording = False
-                    break
-        
-        # Combine audio chunks
-        if len(self.audio_buffer) > 0:
-            return np.concatenate(self.audio_buffer, axis=0)
-        return None
-    
-    def _to_wav_buffer(self, audio_data: np.ndarray) -> io.BytesIO:
-        """Convert numpy array to WAV file buffer."""
-        buffer = io.BytesIO()
         
-        # Normalize to int16
-        audio_int16 = (audio_data * 32767).astype(np.int16)
+        if self.handoff.dropped_frames > dropped:
+            logger.warning(f"Audio input fell behind; dropped {self.handoff.dropped_frames - dropped} frames")
         
-        # Write WAV file to buffer
-        wavfile.write(buffer, self.sample_rate, audio_int16)
-        buffer.seek(0)
+        if endpointer.speech_start is None:
+            return None
         
-        return buffer
+        # Keep the speech plus pre-roll and hangover
+        audio = recording.view()
+        end = endpointer.speech_end if endpointer.speech_end is not None else len(audio)
+        return audio[endpointer.speech_start:end]
+    
+    def _providers(self) -> list:
+        """Providers a turn will call: STT, the configured LLM and the TTS providers."""
+        providers = ['openai', self.config.get('LLM_PROVIDER', 'openai')]
+        for provider in (self.config.get('TTS_PROVIDER'), self.config.get('TTS_FALLBACK_PROVIDER')):
+            if provider and provider != 'local' and provider not in providers:
+                providers.append(provider)
+        return providers
     
-    async def _transcribe(self, audio_buffer: io.BytesIO) -> str:
-        """Transcribe audio using Whisper API."""
+    def _to_wav_buffer(self, audio_data: np.ndarray) -> WavReader:
+        """Wrap the recording as an in-memory WAV file for Whisper."""
+        return encode_wav(audio_data, self.sample_rate)
+    
+    async def _transcribe(self, audio_buffer: WavReader) -> str:
+        """Transcribe audio with the configured STT backend."""
         try:
-            # Prepare the audio file
-            audio_buffer.name = "audio.wav"
-            
-            # Call Whisper API
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.audio.transcriptions.create(
-                    model=self.config.get('STT_MODEL', 'whisper-1'),
-                    file=audio_buffer,
-                    language="en"
-                )
-            )
-            
-            return response.text
-            
+            return await loop.run_in_executor(None, self.stt.transcribe, audio_buffer, "en")
+        
         except Exception as e:
             logger.error(f"Transcription error: {e}", exc_info=True)
             return ""
     
+    def get_stats(self) -> dict:
+        """Get audio callback timing and overflow counts."""
+        return {'dropped_frames': self.handoff.dropped_frames, **self.callback_stats.as_dict()}
+    
     def cleanup(self):
         """Cleanup resources."""
         self.is_recording = False
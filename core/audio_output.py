@@ -4,12 +4,15 @@ Supports streaming TTS for real-time response.
 """
 
 import asyncio
-import io
-from openai import OpenAI
-import sounddevice as sd
+from typing import Tuple
 import numpy as np
-from pydub import AudioSegment
+from audio.playback import PlaybackStream
+from providers.clients import get_openai_client
+from providers.tts import SAMPLE_RATE as TTS_SAMPLE_RATE, get_tts_backend
+from utils.codecs import AudioDecoder, decode_audio, decode_available
 from utils.logger import setup_logger
+from utils.segmenter import SentenceSegmenter
+from utils.tts_cache import TTSCache, cache_key
 
 logger = setup_logger(__name__)
 
@@ -19,55 +22,90 @@ class AudioOutput:
     
     def __init__(self, config):
         self.config = config
-        self.client = OpenAI(api_key=config.get('OPENAI_API_KEY'))
+        self.client = get_openai_client(config.get('OPENAI_API_KEY'))
         
         self.tts_provider = config.get('TTS_PROVIDER', 'openai')
+        self.tts_model = config.get('TTS_MODEL', 'tts-1')
         self.tts_voice = config.get('TTS_VOICE', 'alloy')
+        self.tts_backend = get_tts_backend(
+            self.tts_provider,
+            fallback=config.get('TTS_FALLBACK_PROVIDER'),
+            hedge_deadline=config.get_float('TTS_HEDGE_DEADLINE', 0.6),
+            api_key=config.get('OPENAI_API_KEY'),
+            model=self.tts_model,
+            voice=self.tts_voice,
+            elevenlabs_api_key=config.get('ELEVENLABS_API_KEY'),
+            elevenlabs_voice_id=config.get('ELEVENLABS_VOICE_ID'),
+            elevenlabs_model=config.get('ELEVENLABS_MODEL')
+        )
+        
+        # Raw PCM needs no decoding; compressed formats decode on a worker pool
+        self.tts_format = config.get('TTS_FORMAT', 'pcm')
+        if not decode_available(self.tts_format):
+            logger.warning(f"TTS format '{self.tts_format}' cannot be decoded here, using PCM")
+            self.tts_format = 'pcm'
+        elif self.tts_format != 'pcm' and self.tts_backend.name != 'openai':
+            logger.warning(f"TTS format '{self.tts_format}' is only requested from OpenAI, using PCM")
+            self.tts_format = 'pcm'
+        self.decoder = AudioDecoder(workers=config.get_int('TTS_DECODE_WORKERS', 2))
+        
+        # Repeated sentences skip the TTS request entirely
+        self.cache = TTSCache(
+            memory_bytes=config.get_int('TTS_CACHE_MEMORY_MB', 16) << 20,
+            disk_dir=config.get('TTS_CACHE_DIR'),
+            disk_bytes=config.get_int('TTS_CACHE_DISK_MB', 256) << 20
+        )
         
-        self.text_buffer = ""
-        self.audio_queue = asyncio.Queue()
-        self.is_playing = False
+        self.segmenter = SentenceSegmenter(
+            first_min_chars=config.get_int('SEGMENT_FIRST_MIN_CHARS', 20),
+            min_chars=config.get_int('SEGMENT_MIN_CHARS', 60),
+            max_chars=config.get_int('SEGMENT_MAX_CHARS', 250),
+            deadline=config.get_float('SEGMENT_DEADLINE', 0.6)
+        )
         self.should_stop = False
         
+        # One long-lived output stream; sentences are queued on it back to back
+        self.player = PlaybackStream(
+            sample_rate=TTS_SAMPLE_RATE,
+            target_ms=config.get_int('PLAYBACK_TARGET_MS', 80)
+        )
+        self.playing_until = 0
+        
         logger.info("AudioOutput initialized")
     
+    @property
+    def is_playing(self) -> bool:
+        return self.player.playing
+    
     async def speak_token(self, token: str):
         """
         Add token to speech buffer. 
-        Converts to speech when buffer reaches sentence boundary.
+        Converts to speech when the segmenter has a segment ready.
         """
-        self.text_buffer += token
-        
-        # Check for sentence boundaries
-        if any(char in token for char in '.!?\n'):
-            # We have a complete sentence, convert to speech
-            await self._convert_and_play(self.text_buffer)
-            self.text_buffer = ""
+        for segment in self.segmenter.push(token):
+            await self._convert_and_play(segment)
     
     async def finish(self):
         """Speak any remaining text in buffer."""
-        if self.text_buffer.strip():
-            await self._convert_and_play(self.text_buffer)
-            self.text_buffer = ""
+        for segment in self.segmenter.flush():
+            await self._convert_and_play(segment)
         
         # Wait for all audio to finish playing
-        while not self.audio_queue.empty():
-            await asyncio.sleep(0.1)
+        await self._wait_played(self.player.buffer.write_index)
     
     async def stop(self):
-        """Stop current playback immediately."""
+        """Stop current playback within one audio block and report what was played."""
         self.should_stop = True
         
-        # Clear queues
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        # Drop queued audio; output is silent after the next block
+        report = self.player.stop()
+        logger.info(f"Playback stopped {report.latency * 1000:.0f} ms after the request "
+                    f"at sample {report.position}")
         
-        self.text_buffer = ""
-        await asyncio.sleep(0.2)  # Let audio stop
+        self.segmenter.reset()
+        self.playing_until = 0
         self.should_stop = False
+        return report
     
     async def _convert_and_play(self, text: str):
         """Convert text to speech and play audio."""
@@ -76,68 +114,92 @@ class AudioOutput:
         
         try:
             # Generate speech
-            audio_data = await self._text_to_speech(text)
+            audio_data, sample_rate = await self._text_to_speech(text)
             
             # Play audio
-            await self._play_audio(audio_data)
-            
+            await self._play_audio(audio_data, sample_rate)
+        
         except Exception as e:
             logger.error(f"Error in speak: {e}", exc_info=True)
     
-    async def _text_to_speech(self, text: str) -> np.ndarray:
-        """Convert text to speech audio."""
-        loop = asyncio.get_event_loop()
-        
-        # Call OpenAI TTS API
-        response = await loop.run_in_executor(
-            None,
-            lambda: self.client.audio.speech.create(
-                model="tts-1",
-                voice=self.tts_voice,
-                input=text
-            )
-        )
-        
-        # Convert to numpy array for playback
-        audio_bytes = response.content
-        audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_bytes))
-        
-        # Convert to numpy array
-        samples = np.array(audio_segment.get_array_of_samples())
-        
-        # Reshape for channels
-        if audio_segment.channels == 2:
-            samples = samples.reshape((-1, 2))
+    async def _text_to_speech(self, text: str) -> Tuple[np.ndarray, int]:
+        """
+        Convert text to speech audio.
         
-        # Normalize
-        samples = samples.astype(np.float32) / 32768.0
+        Returns:
+            (float32 samples, sample rate)
+        """
+        loop = asyncio.get_event_loop()
+        backend = self.tts_backend
+        
+        # Cached under the backend that produced the audio (either one, if hedged)
+        audio_bytes = None
+        for candidate in backend.candidates:
+            key = cache_key(text, f"{candidate.name}:{candidate.model}", candidate.voice, 1.0, self.tts_format)
+            audio_bytes = self.cache.get(key)
+            if audio_bytes is not None:
+                break
         
-        return samples
+        if audio_bytes is None:
+            if self.tts_format == 'pcm':
+                # Streamed from the configured provider (hedged if a fallback is set)
+                stream = backend.stream(text)
+                audio_bytes = await loop.run_in_executor(None, lambda: b"".join(stream))
+                source = stream.backend
+                key = cache_key(text, f"{source.name}:{source.model}", source.voice, 1.0, self.tts_format)
+            else:
+                # Compressed formats come straight from the OpenAI TTS API
+                key = cache_key(text, f"openai:{self.tts_model}", self.tts_voice, 1.0, self.tts_format)
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: self.client.audio.speech.create(
+                        model=self.tts_model,
+                        voice=self.tts_voice,
+                        input=text,
+                        response_format=self.tts_format
+                    )
+                )
+                audio_bytes = response.content
+            self.cache.put(key, audio_bytes)
+        
+        if self.tts_format == 'pcm':
+            return decode_audio(audio_bytes, 'pcm', TTS_SAMPLE_RATE)
+        return await asyncio.wrap_future(self.decoder.submit(audio_bytes, self.tts_format))
     
-    async def _play_audio(self, audio_data: np.ndarray):
-        """Play audio data through speakers."""
+    async def _play_audio(self, audio_data: np.ndarray, sample_rate: int = TTS_SAMPLE_RATE):
+        """
+        Queue audio behind the sentence currently playing.
+        
+        Returns once the previous sentence has finished, so the next one is
+        synthesized while this one plays and is queued before it ends.
+        """
         if self.should_stop:
             return
         
-        self.is_playing = True
-        
         try:
-            # Play audio
-            sd.play(audio_data, samplerate=24000)  # OpenAI TTS uses 24kHz
-            
-            # Wait for playback to complete or interruption
-            while sd.get_stream().active and not self.should_stop:
-                await asyncio.sleep(0.1)
-            
-            if self.should_stop:
-                sd.stop()
-                
+            queued_until = self.player.enqueue(audio_data, sample_rate)
+            await self._wait_played(self.playing_until)
+            self.playing_until = queued_until
         except Exception as e:
             logger.error(f"Playback error: {e}", exc_info=True)
-        finally:
-            self.is_playing = False
+    
+    async def _wait_played(self, position: int):
+        """Wait until the output stream has played up to ``position`` or playback is stopped."""
+        while self.player.buffer.played < position and not self.should_stop:
+            if self.player.stream is None or not self.player.stream.active:
+                break
+            await asyncio.sleep(0.02)
+    
+    def get_stats(self) -> dict:
+        """Get playback, decoding and TTS cache statistics."""
+        return {
+            **self.player.get_stats(),
+            'decode': self.decoder.get_stats(),
+            'cache': self.cache.get_stats()
+        }
     
     def cleanup(self):
         """Cleanup resources."""
-        sd.stop()
+        self.player.close()
+        self.decoder.shutdown()
         logger.info("AudioOutput cleanup completed")
@@ -4,8 +4,7 @@ Handles conversation with LLM and generates streaming responses.
 """
 
 import asyncio
-from openai import OpenAI
-from anthropic import Anthropic
+from providers.clients import get_anthropic_client, get_openai_client
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -23,9 +22,9 @@ class LLMEngine:
         
         # Initialize appropriate client
         if self.provider == 'openai':
-            self.client = OpenAI(api_key=config.get('OPENAI_API_KEY'))
+            self.client = get_openai_client(config.get('OPENAI_API_KEY'))
         elif self.provider == 'anthropic':
-            self.client = Anthropic(api_key=config.get('ANTHROPIC_API_KEY'))
+            self.client = get_anthropic_client(config.get('ANTHROPIC_API_KEY'))
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
         
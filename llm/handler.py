@@ -1,6 +1,6 @@
 """LLM integration module using Anthropic Claude."""
-from anthropic import Anthropic
 from typing import List, Dict, Iterator, Optional
+from providers.clients import get_anthropic_client
 import config
 
 
@@ -8,7 +8,7 @@ class LLMHandler:
     """Handles LLM interactions with streaming support."""
     
     def __init__(self):
-        self.client = Anthropic(api_key=config.ANTHROPIC_API_KEY)
+        self.client = get_anthropic_client(config.ANTHROPIC_API_KEY)
         self.system_prompt = self._build_system_prompt()
     
     def _build_system_prompt(self) -> str:
@@ -1,6 +1,5 @@
 """Main orchestration module for the Voice-First AI Assistant."""
-import time
-import threading
+import asyncio
 from pynput import keyboard
 from typing import Optional
 
@@ -8,13 +7,23 @@ from audio import AudioInput
 from audio.output import AudioOutput
 from speech.stt import SpeechToText
 from speech.tts import TextToSpeech
+from speech.pipeline import SpeechPipeline
 from llm.handler import LLMHandler
 from memory.manager import ConversationMemory
+from memory.summarizer import SummaryWorker
+from providers.clients import registry as clients
+from utils.metrics import metrics
 import config
 
 
 class VoiceAssistant:
-    """Main voice assistant orchestrator."""
+    """
+    Main voice assistant orchestrator.
+    
+    Runs on a single asyncio event loop. Keyboard callbacks only post events
+    to the loop; each utterance is handled by one turn task, and barge-in
+    cancels that task.
+    """
     
     def __init__(self):
         # Initialize components
@@ -24,12 +33,24 @@ class VoiceAssistant:
         self.tts = TextToSpeech()
         self.llm = LLMHandler()
         self.memory = ConversationMemory()
+        self.pipeline = SpeechPipeline(self.tts, self.audio_output)
+        self.summarizer = SummaryWorker(self.llm, self.memory)
+        
+        # Providers a turn calls: OpenAI for STT, Anthropic for the LLM, and the TTS providers
+        self.providers = ['openai', 'anthropic'] + [
+            provider for provider in (config.TTS_PROVIDER, config.TTS_FALLBACK_PROVIDER)
+            if provider and provider not in ('openai', 'local')
+        ]
         
-        # State management
-        self.is_speaking = False
+        # Open provider connections while the user gets ready to speak
+        clients.warm_up(self.providers)
+        
+        # State management (only touched from the event loop)
         self.is_listening = False
-        self.should_interrupt = False
-        self.running = True
+        self.stt_stream = None
+        self.turn_task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.events: Optional[asyncio.Queue] = None
         
         # Keyboard listener for push-to-talk
         self.listener: Optional[keyboard.Listener] = None
@@ -44,48 +65,87 @@ class VoiceAssistant:
         print("="*60 + "\n")
     
     def on_press(self, key) -> None:
-        """Handle key press events."""
-        try:
-            if key == keyboard.Key.space and not self.is_listening:
-                # Start listening
-                self.is_listening = True
-                
-                # If assistant is speaking, interrupt it
-                if self.is_speaking:
-                    self.should_interrupt = True
-                    self.audio_output.stop()
-                    print("\n[Interrupted]")
-                
-                print("\n🎤 Listening... (release SPACE when done)")
-                self.audio_input.start_recording()
-                
-            elif key == keyboard.Key.esc:
-                # Exit the assistant
-                self.running = False
-                return False
-                
-        except AttributeError:
-            pass
+        """Handle key press events (keyboard listener thread)."""
+        if key == keyboard.Key.space:
+            self.post_event("press")
+        elif key == keyboard.Key.esc:
+            # Exit the assistant
+            self.post_event("exit")
+            return False
     
     def on_release(self, key) -> None:
-        """Handle key release events."""
-        try:
-            if key == keyboard.Key.space and self.is_listening:
-                # Stop listening and process
-                self.is_listening = False
-                print("Processing...\n")
-                
-                # Get audio and transcribe
-                audio_data = self.audio_input.stop_recording()
-                threading.Thread(target=self.process_input, args=(audio_data,)).start()
-                
-        except AttributeError:
-            pass
+        """Handle key release events (keyboard listener thread)."""
+        if key == keyboard.Key.space:
+            self.post_event("release")
+    
+    def post_event(self, event: str) -> None:
+        """Hand an input event to the event loop from any thread."""
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+    
+    def start_listening(self) -> None:
+        """Start recording, interrupting the current turn if there is one."""
+        if self.is_listening:
+            return
+        self.is_listening = True
+        
+        # If assistant is busy with a turn, interrupt it
+        if self.turn_task and not self.turn_task.done():
+            self.turn_task.cancel()
+            print("\n[Interrupted]")
+        
+        print("\n🎤 Listening... (release SPACE when done)")
+        
+        # Upload audio to STT while the user is still speaking
+        self.stt_stream = self.stt.start_stream() if config.STT_STREAMING else None
+        self.audio_input.start_recording(stream_to=self.stt_stream)
+        
+        # STT, LLM and TTS requests follow within seconds, so warm the pools
+        clients.warm_up(self.providers)
+    
+    def stop_listening(self) -> None:
+        """Stop recording and start a turn for the captured audio."""
+        if not self.is_listening:
+            return
+        self.is_listening = False
+        print("Processing...\n")
+        
+        audio_data = self.audio_input.stop_recording()
+        clients.record_turn(self.providers)
+        
+        self.turn_task = asyncio.ensure_future(self.process_input(audio_data, self.stt_stream))
+        self.stt_stream = None
     
-    def process_input(self, audio_data) -> None:
+    async def process_input(self, audio_data, stt_stream=None) -> None:
         """Process user input and generate response."""
-        # Transcribe audio
-        user_text = self.stt.transcribe(audio_data)
+        loop = asyncio.get_event_loop()
+        
+        # Check for speech and encode the fallback upload while the
+        # streamed transcript finishes (None when there is no speech)
+        try:
+            encoded = await loop.run_in_executor(None, self.stt.encode, audio_data, stt_stream is not None)
+        except asyncio.CancelledError:
+            if stt_stream is not None:
+                stt_stream.cancel()
+            raise
+        
+        # Skip transcription when the speech gate found nothing to send
+        if encoded is None:
+            if stt_stream is not None:
+                stt_stream.cancel()
+            print("(No speech detected)\n")
+            return
+        
+        # Transcribe audio, preferring the upload made while recording
+        user_text = None
+        if stt_stream is not None:
+            try:
+                user_text = await loop.run_in_executor(None, stt_stream.finish)
+            except asyncio.CancelledError:
+                stt_stream.cancel()
+                raise
+        if user_text is None:
+            user_text = await loop.run_in_executor(None, self.stt.transcribe, audio_data, encoded)
         
         if not user_text:
             print("(No speech detected)\n")
@@ -96,93 +156,97 @@ class VoiceAssistant:
         # Check for exit commands
         if any(word in user_text.lower() for word in ['goodbye', 'exit', 'quit', 'bye']):
             print("Assistant: Goodbye! Have a great day!\n")
-            self.running = False
+            await self.pipeline.run(iter(["Goodbye! Have a great day!"]))
+            self.events.put_nowait("exit")
             return
         
         # Add user message to memory
         self.memory.add_message("user", user_text)
         
-        # Check if we should summarize for long-term memory
+        # Summarize for long-term memory in the background
         if self.memory.should_summarize():
-            print("[Updating long-term memory...]")
-            messages = self.memory.get_messages_for_llm()
-            summary = self.llm.generate_summary(messages)
-            self.memory.update_long_term_context(summary)
+            print("[Updating long-term memory in the background...]")
+            self.summarizer.submit(self.memory.get_messages_for_llm())
             self.memory.reset_message_count()
         
         # Generate response
-        self.generate_and_speak_response()
+        await self.generate_and_speak_response()
     
-    def generate_and_speak_response(self) -> None:
+    async def generate_and_speak_response(self) -> None:
         """Generate LLM response and speak it with streaming."""
-        self.should_interrupt = False
-        self.is_speaking = True
-        
         # Get messages and context
         messages = self.memory.get_messages_for_llm()
         context = self.memory.get_long_term_context()
         
-        # Generate streaming response
-        response_text = ""
-        text_buffer = []
-        
         print("Assistant: ", end="", flush=True)
         
         try:
-            # Stream tokens from LLM
-            for token in self.llm.generate_response_streaming(messages, context):
-                if self.should_interrupt:
-                    break
-                
-                response_text += token
-                text_buffer.append(token)
-                print(token, end="", flush=True)
-                
-                # When we have a sentence, synthesize it
-                if any(token.endswith(end) for end in ['.', '!', '?', '\n']):
-                    sentence = "".join(text_buffer).strip()
-                    if sentence:
-                        audio = self.tts.synthesize(sentence)
-                        if audio and not self.should_interrupt:
-                            self.audio_output.play_audio(audio)
-                            self.audio_output.wait_until_done()
-                    text_buffer = []
-            
-            # Speak any remaining text
-            if text_buffer and not self.should_interrupt:
-                sentence = "".join(text_buffer).strip()
-                if sentence:
-                    audio = self.tts.synthesize(sentence)
-                    if audio:
-                        self.audio_output.play_audio(audio)
-                        self.audio_output.wait_until_done()
+            # Stream tokens while earlier sentences are synthesized and played
+            response_text = await self.pipeline.run(
+                self.llm.generate_response_streaming(messages, context),
+                on_token=lambda token: print(token, end="", flush=True)
+            )
             
             print("\n")
             
-            # Add response to memory if not interrupted
-            if not self.should_interrupt and response_text:
+            # Interrupted turns are cancelled before reaching this point
+            if response_text:
                 self.memory.add_message("assistant", response_text)
                 self.memory.save_memory()
-            
+        
+        except asyncio.CancelledError:
+            report = self.pipeline.last_interrupt
+            for segment in report.segments if report else []:
+                if segment.played < segment.total:
+                    print(f"\n[Cut off {segment.played / self.audio_output.sample_rate:.2f}s into "
+                          f"\"{segment.label[:40]}\", {report.latency * 1000:.0f} ms to silence]")
+                    break
+            print("\n")
+            raise
+        
         except Exception as e:
             print(f"\nError generating response: {e}\n")
-        
-        finally:
-            self.is_speaking = False
     
-    def run(self) -> None:
-        """Run the assistant."""
+    async def main(self) -> None:
+        """Dispatch input events until the assistant exits."""
+        self.loop = asyncio.get_event_loop()
+        self.events = asyncio.Queue()
+        
         # Start keyboard listener
         self.listener = keyboard.Listener(
             on_press=self.on_press,
             on_release=self.on_release
         )
         self.listener.start()
+        self.summarizer.start()
         
-        # Keep running until exit
         try:
-            while self.running:
-                time.sleep(0.1)
+            while True:
+                event = await self.events.get()
+                
+                if event == "press":
+                    self.start_listening()
+                elif event == "release":
+                    self.stop_listening()
+                elif event == "exit":
+                    break
+        finally:
+            await self.cancel_turn()
+            await self.summarizer.stop()
+    
+    async def cancel_turn(self) -> None:
+        """Cancel the running turn, if any, and wait for it to unwind."""
+        if self.turn_task and not self.turn_task.done():
+            self.turn_task.cancel()
+            try:
+                await self.turn_task
+            except asyncio.CancelledError:
+                pass
+    
+    def run(self) -> None:
+        """Run the assistant."""
+        try:
+            asyncio.run(self.main())
         except KeyboardInterrupt:
             print("\n\nShutting down...")
         finally:
@@ -196,9 +260,54 @@ class VoiceAssistant:
             self.listener.stop()
         
         self.audio_input.cleanup()
+        
+        # Report playback before cleanup's own stop adds to it
+        playback = self.audio_output.get_stats()
+        print(f"  Playback: {playback['underruns']} underruns ({playback['underrun_ms']:.0f} ms of silence), "
+              f"{playback['late_callbacks']} late callbacks")
+        
+        interrupts = metrics.snapshot("playback.interrupt_latency").get("playback.interrupt_latency")
+        if interrupts and interrupts['count']:
+            print(f"  Barge-in: {interrupts['count']} interruptions, "
+                  f"p50 {interrupts['p50'] * 1000:.0f} ms, p90 {interrupts['p90'] * 1000:.0f} ms to silence")
+        
         self.audio_output.cleanup()
+        self.stt.close()
         self.memory.save_memory()
         
+        gate = self.stt.gate.get_stats()
+        print(f"  Speech gate: {gate['calls_saved']} transcriptions skipped, "
+              f"{gate['seconds_saved']:.1f}s of audio not uploaded")
+        
+        summaries = self.summarizer.get_stats()
+        if summaries['completed'] or summaries['failed']:
+            print(f"  Summaries: {summaries['completed']} completed, {summaries['failed']} failed, "
+                  f"avg {summaries['avg_latency']:.1f}s, max {summaries['max_latency']:.1f}s to update memory")
+        
+        if self.tts.cache:
+            cache = self.tts.cache.get_stats()
+            print(f"  TTS cache: {cache['memory_hits'] + cache['disk_hits']} hits, {cache['misses']} misses, "
+                  f"{cache['memory_evictions'] + cache['disk_evictions']} evictions")
+        
+        for voice, rate in self.pipeline.rate_model.get_stats().items():
+            print(f"  Speaking rate ({voice}): {rate['words_per_minute']:.0f} wpm over {rate['clips']} clips")
+        
+        for name, latency in metrics.snapshot("stt.").items():
+            if name.endswith(".latency") and latency['count']:
+                print(f"  {name}: {latency['count']} requests, "
+                      f"p50 {latency['p50'] * 1000:.0f} ms, p90 {latency['p90'] * 1000:.0f} ms")
+        
+        for name, first_byte in metrics.snapshot("tts.").items():
+            if name.endswith(".first_byte") and first_byte['count']:
+                print(f"  {name}: {first_byte['count']} requests, "
+                      f"p50 {first_byte['p50'] * 1000:.0f} ms, p90 {first_byte['p90'] * 1000:.0f} ms")
+        
+        for provider, stats in clients.get_stats().items():
+            print(f"  {provider}: {stats['requests']} requests, "
+                  f"{stats['reused']} on reused connections, "
+                  f"{stats['warm_turns']}/{stats['turns']} turns started warm")
+        clients.close()
+        
         print("Goodbye!\n")
 
 
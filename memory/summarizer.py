@@ -0,0 +1,107 @@
+"""Background summarization worker for long-term memory."""
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+
+class SummaryWorker:
+    """
+    Generates long-term memory summaries off the turn critical path.
+    
+    Summary requests are queued and processed one at a time on the event
+    loop's executor. Results are folded into the conversation memory with
+    ``update_long_term_context`` as soon as they are ready.
+    """
+    
+    def __init__(self, llm, memory):
+        self.llm = llm
+        self.memory = memory
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        
+        # Statistics
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.task = asyncio.ensure_future(self._run())
+    
+    def submit(self, messages: List[Dict[str, str]]) -> None:
+        """
+        Queue messages for summarization without waiting for the result.
+        
+        Args:
+            messages: Messages to summarize
+        """
+        self.queue.put_nowait((time.monotonic(), list(messages)))
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Let queued summaries finish, then stop the worker.
+        
+        Args:
+            timeout: Maximum seconds to wait for the backlog to drain
+        """
+        if self.task is None:
+            return
+        
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[Summarization] Dropping {self.get_stats()['backlog']} pending summaries")
+        
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+    
+    def get_stats(self) -> dict:
+        """Get summarization backlog and latency statistics (seconds)."""
+        return {
+            'backlog': (self.queue.qsize() if self.queue else 0) + self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_latency': self.last_latency,
+            'avg_latency': self.total_latency / self.completed if self.completed else 0.0,
+            'max_latency': self.max_latency
+        }
+    
+    async def _run(self) -> None:
+        """Process summary requests until cancelled."""
+        loop = asyncio.get_event_loop()
+        
+        while True:
+            submitted_at, messages = await self.queue.get()
+            self.in_flight += 1
+            
+            try:
+                summary = await loop.run_in_executor(None, self.llm.generate_summary, messages)
+                
+                if summary:
+                    self.memory.update_long_term_context(summary)
+                    self.memory.save_memory()
+                    self._record_latency(time.monotonic() - submitted_at)
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Summarization error: {e}")
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+    
+    def _record_latency(self, latency: float) -> None:
+        """Record the submit-to-update latency of a completed summary."""
+        self.completed += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
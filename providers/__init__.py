@@ -0,0 +1,13 @@
+"""
+Providers Module Initialization
+"""
+
+from .clients import ClientRegistry, registry, get_openai_client, get_anthropic_client
+from .stt import STTBackend, BackendRegistry, stt_backends, get_stt_backend
+from .tts import TTSBackend, HedgedTTS, TTSBackendRegistry, tts_backends, get_tts_backend
+
+__all__ = [
+    'ClientRegistry', 'registry', 'get_openai_client', 'get_anthropic_client',
+    'STTBackend', 'BackendRegistry', 'stt_backends', 'get_stt_backend',
+    'TTSBackend', 'HedgedTTS', 'TTSBackendRegistry', 'tts_backends', 'get_tts_backend'
+]
@@ -0,0 +1,279 @@
+"""
+Shared provider clients.
+Keeps one keep-alive HTTP connection pool per provider for the whole process,
+so every component reuses warm connections instead of opening its own.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import httpx
+from anthropic import Anthropic
+from openai import OpenAI
+
+import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Endpoints used to open connections ahead of the first real request
+PROVIDER_URLS = {
+    'openai': 'https://api.openai.com/v1',
+    'anthropic': 'https://api.anthropic.com/v1',
+    'elevenlabs': 'https://api.elevenlabs.io/v1',
+}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PoolStats:
+    """Request and connection counters for one provider pool."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.warmups = 0
+        self.turns = 0
+        self.warm_turns = 0
+        self.last_activity: Optional[float] = None
+    
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.last_activity = time.monotonic()
+    
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+    
+    def record_warmup(self) -> None:
+        with self._lock:
+            self.warmups += 1
+    
+    def record_turn(self, warm: bool) -> None:
+        with self._lock:
+            self.turns += 1
+            if warm:
+                self.warm_turns += 1
+    
+    def as_dict(self) -> dict:
+        """Snapshot of the counters."""
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'reused': reused,
+                'reuse_ratio': reused / self.requests if self.requests else 0.0,
+                'warmups': self.warmups,
+                'turns': self.turns,
+                'warm_turns': self.warm_turns,
+                'warm_ratio': self.warm_turns / self.turns if self.turns else 0.0,
+            }
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """Wraps a transport to count requests and newly opened connections."""
+    
+    def __init__(self, stats: PoolStats, transport: httpx.BaseTransport):
+        self.stats = stats
+        self.transport = transport
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.record_request()
+        request.extensions["trace"] = self._trace
+        return self.transport.handle_request(request)
+    
+    def close(self) -> None:
+        self.transport.close()
+    
+    def has_idle_connection(self) -> bool:
+        """Whether the pool holds an open connection ready for a request."""
+        # httpcore's pool is internal; without one there is nothing to reuse
+        connections = getattr(getattr(self.transport, "_pool", None), "connections", None)
+        if not connections:
+            return False
+        return any(
+            connection.is_available() and not connection.has_expired()
+            for connection in list(connections)
+        )
+    
+    def _trace(self, event_name: str, info: dict) -> None:
+        """httpcore trace hook; fires once per new TCP connection."""
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.record_connection()
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of provider HTTP pools and SDK clients.
+    
+    Each provider gets one ``httpx.Client`` (keep-alive, HTTP/2 when ``h2``
+    is installed) that every SDK client for that provider is built on.
+    ``transport`` builds each pool's transport from ``http2`` and
+    ``limits`` keyword arguments (``httpx.HTTPTransport`` by default).
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = config.HTTP_MAX_CONNECTIONS,
+        keepalive_expiry: float = config.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = config.HTTP2,
+        transport: Callable[..., httpx.BaseTransport] = httpx.HTTPTransport
+    ):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and _http2_available()
+        self.transport = transport
+        
+        self._lock = threading.Lock()
+        self._http_clients: Dict[str, httpx.Client] = {}
+        self._transports: Dict[str, _CountingTransport] = {}
+        self._warming = set()
+        self._sdk_clients: Dict[tuple, object] = {}
+        self._stats: Dict[str, PoolStats] = {}
+    
+    def http_client(self, provider: str) -> httpx.Client:
+        """Get the shared HTTP client for a provider, creating it on first use."""
+        with self._lock:
+            client = self._http_clients.get(provider)
+            if client is None:
+                stats = self._stats.setdefault(provider, PoolStats())
+                limits = httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+                transport = _CountingTransport(stats, self.transport(http2=self.http2, limits=limits))
+                client = httpx.Client(
+                    transport=transport,
+                    timeout=httpx.Timeout(600.0, connect=5.0),
+                    follow_redirects=True
+                )
+                self._http_clients[provider] = client
+                self._transports[provider] = transport
+            return client
+    
+    def openai(self, api_key: Optional[str] = None) -> OpenAI:
+        """Get an OpenAI client that uses the shared OpenAI pool."""
+        return self._sdk_client('openai', api_key, OpenAI)
+    
+    def anthropic(self, api_key: Optional[str] = None) -> Anthropic:
+        """Get an Anthropic client that uses the shared Anthropic pool."""
+        return self._sdk_client('anthropic', api_key, Anthropic)
+    
+    def _sdk_client(self, provider: str, api_key: Optional[str], factory):
+        """Build (once per API key) an SDK client on the provider's pool."""
+        http_client = self.http_client(provider)
+        key = (provider, api_key)
+        with self._lock:
+            client = self._sdk_clients.get(key)
+            if client is None:
+                client = factory(api_key=api_key, http_client=http_client)
+                self._sdk_clients[key] = client
+            return client
+    
+    def warm_up(self, providers: Optional[Iterable[str]] = None, background: bool = True) -> list:
+        """
+        Open connections to providers ahead of the first real request.
+        
+        Providers that already have an idle connection, or a warm-up in
+        progress, are skipped, so this is cheap to call on every keypress.
+        
+        Args:
+            providers: Providers to warm (defaults to every provider that
+                already has a pool)
+            background: Warm on daemon threads instead of blocking
+        
+        Returns:
+            The warm-up threads (empty when not running in the background)
+        """
+        if providers is None:
+            with self._lock:
+                providers = list(self._http_clients) or ['openai', 'anthropic']
+        providers = [p for p in providers if p in PROVIDER_URLS and not self.is_warm(p)]
+        with self._lock:
+            providers = [p for p in providers if p not in self._warming]
+            self._warming.update(providers)
+        
+        if not background:
+            for provider in providers:
+                self._warm(provider)
+            return []
+        
+        threads = []
+        for provider in providers:
+            thread = threading.Thread(target=self._warm, args=(provider,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+    
+    def _warm(self, provider: str) -> None:
+        """Issue a cheap request so a connection to the provider is pooled."""
+        try:
+            self.http_client(provider).head(PROVIDER_URLS[provider], timeout=5.0)
+            self._stats[provider].record_warmup()
+        except httpx.HTTPError as e:
+            logger.debug(f"Warm-up for {provider} failed: {e}")
+        finally:
+            with self._lock:
+                self._warming.discard(provider)
+    
+    def is_warm(self, provider: str) -> bool:
+        """Whether the provider's pool has an idle, unexpired connection."""
+        with self._lock:
+            transport = self._transports.get(provider)
+        return transport is not None and transport.has_idle_connection()
+    
+    def record_turn(self, providers: Iterable[str]) -> None:
+        """
+        Count a turn and whether it found a warm connection per provider.
+        
+        Call just before the turn's first request (e.g. on push-to-talk
+        release) so ``warm_ratio`` shows how often warm-up paid off.
+        
+        Args:
+            providers: Providers the turn is about to call
+        """
+        for provider in providers:
+            warm = self.is_warm(provider)
+            with self._lock:
+                stats = self._stats.setdefault(provider, PoolStats())
+            stats.record_turn(warm)
+    
+    def get_stats(self) -> dict:
+        """Get pool reuse statistics per provider."""
+        with self._lock:
+            return {provider: stats.as_dict() for provider, stats in self._stats.items()}
+    
+    def close(self) -> None:
+        """Close every pool."""
+        with self._lock:
+            for client in self._http_clients.values():
+                client.close()
+            self._http_clients.clear()
+            self._transports.clear()
+            self._sdk_clients.clear()
+
+
+# Process-wide registry
+registry = ClientRegistry()
+
+
+def get_openai_client(api_key: Optional[str] = None) -> OpenAI:
+    """Get a shared-pool OpenAI client."""
+    return registry.openai(api_key)
+
+
+def get_anthropic_client(api_key: Optional[str] = None) -> Anthropic:
+    """Get a shared-pool Anthropic client."""
+    return registry.anthropic(api_key)
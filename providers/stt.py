@@ -0,0 +1,267 @@
+"""
+Speech-to-text backends.
+A common interface over hosted and in-process transcription, with a registry
+that picks a backend by name and capability and records its latency.
+"""
+
+import inspect
+import threading
+import time
+from typing import BinaryIO, Dict, FrozenSet, List, NamedTuple, Optional, Type
+
+import soundfile as sf
+
+from providers.clients import get_openai_client, registry as clients
+from providers.transcription import StreamingTranscription
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+
+class Capabilities(NamedTuple):
+    """What a backend can do."""
+    streaming: bool  # Accepts audio while it is being recorded
+    batch: bool  # Transcribes complete recordings
+    languages: Optional[FrozenSet[str]] = None  # None means any language
+
+
+class STTBackend:
+    """
+    Base class for speech-to-text backends.
+    
+    Subclasses implement ``_transcribe`` (and ``start_stream`` if they can
+    stream). ``transcribe`` wraps it to record request counts, errors and
+    latency under ``stt.<name>.*`` in the metrics registry.
+    """
+    
+    name = "base"
+    capabilities = Capabilities(streaming=False, batch=True)
+    
+    def available(self) -> bool:
+        """Whether the backend can be used in this environment."""
+        return True
+    
+    def supports(self, language: Optional[str] = None, streaming: bool = False, batch: bool = False) -> bool:
+        """Whether the backend has the requested capabilities."""
+        caps = self.capabilities
+        if streaming and not caps.streaming:
+            return False
+        if batch and not caps.batch:
+            return False
+        return language is None or caps.languages is None or language in caps.languages
+    
+    def transcribe(self, audio_file: BinaryIO, language: Optional[str] = None) -> str:
+        """
+        Transcribe a complete recording.
+        
+        Args:
+            audio_file: Encoded audio (WAV, FLAC or Ogg) with a ``name``
+            language: Language code, or None to detect
+        
+        Returns:
+            Transcribed text
+        """
+        metrics.counter(f"stt.{self.name}.requests").inc()
+        started = time.perf_counter()
+        try:
+            text = self._transcribe(audio_file, language)
+        except Exception:
+            metrics.counter(f"stt.{self.name}.errors").inc()
+            raise
+        metrics.histogram(f"stt.{self.name}.latency").observe(time.perf_counter() - started)
+        return text.strip()
+    
+    def start_stream(self, sample_rate: int, language: Optional[str] = None, timeout: float = 30.0):
+        """Start a transcription fed while recording (streaming backends only)."""
+        raise NotImplementedError(f"{self.name} backend does not support streaming")
+    
+    def _transcribe(self, audio_file: BinaryIO, language: Optional[str]) -> str:
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(STTBackend):
+    """Hosted Whisper through the shared OpenAI connection pool."""
+    
+    name = "openai"
+    capabilities = Capabilities(streaming=True, batch=True)
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "whisper-1",
+        base_url: str = "https://api.openai.com/v1"
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.client = get_openai_client(api_key)
+    
+    def start_stream(self, sample_rate: int, language: Optional[str] = None, timeout: float = 30.0) -> StreamingTranscription:
+        return StreamingTranscription(
+            clients.http_client('openai'),
+            self.api_key,
+            base_url=self.base_url,
+            model=self.model,
+            language=language,
+            sample_rate=sample_rate,
+            timeout=timeout,
+            backend=self.name
+        ).start()
+    
+    def _transcribe(self, audio_file: BinaryIO, language: Optional[str]) -> str:
+        kwargs = {'language': language} if language else {}
+        transcript = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=audio_file,
+            **kwargs
+        )
+        return transcript.text
+
+
+class LocalWhisperBackend(STTBackend):
+    """
+    In-process Whisper on the CPU, for when the network is slow or down.
+    
+    Uses the optional ``faster-whisper`` package; the model is loaded once,
+    on the first request, even when segments are transcribed concurrently.
+    Audio must be 16 kHz.
+    """
+    
+    name = "local"
+    capabilities = Capabilities(streaming=False, batch=True)
+    
+    def __init__(self, local_model: str = "base.en", device: str = "cpu", compute_type: str = "int8"):
+        self.local_model = local_model
+        self.device = device
+        self.compute_type = compute_type
+        self.model = None
+        self._load_lock = threading.Lock()
+    
+    def available(self) -> bool:
+        return WhisperModel is not None
+    
+    def _transcribe(self, audio_file: BinaryIO, language: Optional[str]) -> str:
+        if WhisperModel is None:
+            raise RuntimeError("faster-whisper is not installed")
+        if self.model is None:
+            with self._load_lock:
+                if self.model is None:
+                    logger.info(f"Loading local Whisper model '{self.local_model}'")
+                    self.model = WhisperModel(self.local_model, device=self.device, compute_type=self.compute_type)
+        
+        audio, _ = sf.read(audio_file, dtype='float32', always_2d=True)
+        segments, _ = self.model.transcribe(audio.mean(axis=1), language=language)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+class StubBackend(STTBackend):
+    """
+    Deterministic backend for tests.
+    
+    Returns ``text`` if given, otherwise a description of the audio's
+    duration, after an optional fixed ``latency``. Requests are kept in
+    ``calls`` as (duration seconds, language).
+    """
+    
+    name = "stub"
+    capabilities = Capabilities(streaming=False, batch=True)
+    
+    def __init__(self, text: Optional[str] = None, latency: float = 0.0):
+        self.text = text
+        self.latency = latency
+        self.calls: List[tuple] = []
+    
+    def _transcribe(self, audio_file: BinaryIO, language: Optional[str]) -> str:
+        info = sf.info(audio_file)
+        self.calls.append((info.duration, language))
+        if self.latency:
+            time.sleep(self.latency)
+        return self.text if self.text is not None else f"[{info.duration:.2f} seconds of audio]"
+
+
+class BackendRegistry:
+    """Registered STT backend classes, selected by name and capability."""
+    
+    def __init__(self):
+        self._backends: Dict[str, Type[STTBackend]] = {}
+    
+    def register(self, backend_class: Type[STTBackend]) -> Type[STTBackend]:
+        """Register a backend class (usable as a decorator)."""
+        self._backends[backend_class.name] = backend_class
+        return backend_class
+    
+    def names(self) -> List[str]:
+        return list(self._backends)
+    
+    def create(
+        self,
+        preferred: Optional[str] = None,
+        language: Optional[str] = None,
+        streaming: bool = False,
+        batch: bool = True,
+        fallback: bool = True,
+        **options
+    ) -> STTBackend:
+        """
+        Build the preferred backend, or the first registered one that is
+        available and has the requested capabilities.
+        
+        Args:
+            preferred: Backend name to try first
+            language: Language that must be supported
+            streaming: Require streaming support
+            batch: Require batch support
+            fallback: Try other backends if the preferred one does not qualify
+            **options: Constructor arguments; each backend gets the ones
+                its constructor accepts
+        
+        Returns:
+            Backend instance
+        
+        Raises:
+            ValueError: If no registered backend qualifies
+        """
+        names = self.names()
+        if preferred in self._backends:
+            names.remove(preferred)
+            names.insert(0, preferred)
+        elif preferred:
+            logger.warning(f"Unknown STT backend '{preferred}'")
+        
+        if not fallback:
+            names = names[:1] if preferred in self._backends else []
+        
+        for name in names:
+            # The stub only runs when asked for by name
+            if name == StubBackend.name and name != preferred:
+                continue
+            
+            backend_class = self._backends[name]
+            accepted = inspect.signature(backend_class.__init__).parameters
+            backend = backend_class(**{k: v for k, v in options.items() if k in accepted})
+            
+            if backend.available() and backend.supports(language, streaming, batch):
+                if name != preferred and preferred:
+                    logger.warning(f"STT backend '{preferred}' unavailable, using '{name}'")
+                metrics.counter(f"stt.selected.{name}").inc()
+                return backend
+        
+        raise ValueError("No STT backend with the requested capabilities is available")
+
+
+# Process-wide backend registry
+stt_backends = BackendRegistry()
+stt_backends.register(OpenAIWhisperBackend)
+stt_backends.register(LocalWhisperBackend)
+stt_backends.register(StubBackend)
+
+
+def get_stt_backend(preferred: Optional[str] = None, **kwargs) -> STTBackend:
+    """Create an STT backend from the process-wide registry."""
+    return stt_backends.create(preferred, **kwargs)
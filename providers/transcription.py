@@ -0,0 +1,171 @@
+"""
+Streaming transcription upload.
+Sends audio to an OpenAI-compatible transcription endpoint while it is still
+being recorded, so only the tail of the upload and inference remain once the
+user stops speaking.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from typing import Optional
+
+import httpx
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+from utils.wav import to_pcm16, wav_header
+
+logger = setup_logger(__name__)
+
+# Sentinel marking the end of the audio
+_END = object()
+
+
+class UploadCancelled(Exception):
+    """Raised inside the request body to abort an upload."""
+
+
+class StreamingTranscription:
+    """
+    One transcription request whose audio is uploaded as it is recorded.
+    
+    The request body is a chunked ``multipart/form-data`` upload: the form
+    fields and a streaming WAV header go out as soon as ``start`` is called,
+    then each chunk passed to ``feed`` is converted to 16-bit PCM and sent.
+    ``finish`` closes the body and waits for the transcript.
+    
+    Finished requests are recorded in the ``stt.<backend>.*`` metrics like
+    batch requests; latency runs from ``finish`` to the transcript, the
+    wait left once recording stops.
+    """
+    
+    def __init__(
+        self,
+        http_client: httpx.Client,
+        api_key: Optional[str],
+        base_url: str = "https://api.openai.com/v1",
+        model: str = "whisper-1",
+        language: Optional[str] = "en",
+        sample_rate: int = 16000,
+        timeout: float = 30.0,
+        backend: str = "openai"
+    ):
+        self.http_client = http_client
+        self.api_key = api_key
+        self.url = base_url.rstrip('/') + '/audio/transcriptions'
+        self.model = model
+        self.language = language
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+        self.backend = backend
+        
+        self.boundary = uuid.uuid4().hex
+        self.chunks: queue.Queue = queue.Queue()
+        self.bytes_sent = 0
+        self.cancelled = False
+        
+        self.text: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "StreamingTranscription":
+        """Open the upload on a background thread."""
+        self.thread = threading.Thread(target=self._upload, daemon=True)
+        self.thread.start()
+        return self
+    
+    def feed(self, audio_chunk: np.ndarray) -> None:
+        """
+        Queue recorded audio for upload.
+        
+        Args:
+            audio_chunk: Float samples in [-1, 1] or int16 samples
+        """
+        self.chunks.put(to_pcm16(audio_chunk).tobytes())
+    
+    def finish(self) -> Optional[str]:
+        """
+        End the audio and wait for the transcript.
+        
+        Returns:
+            Transcribed text, or None if the upload failed
+        """
+        metrics.counter(f"stt.{self.backend}.requests").inc()
+        started = time.perf_counter()
+        
+        self.chunks.put(_END)
+        if self.thread:
+            self.thread.join(self.timeout)
+            if self.thread.is_alive():
+                logger.warning("Streaming transcription timed out")
+                metrics.counter(f"stt.{self.backend}.errors").inc()
+                self.cancel()
+                return None
+        
+        if self.error:
+            logger.error(f"Streaming transcription error: {self.error}")
+            metrics.counter(f"stt.{self.backend}.errors").inc()
+            return None
+        metrics.histogram(f"stt.{self.backend}.latency").observe(time.perf_counter() - started)
+        return self.text
+    
+    def cancel(self) -> None:
+        """Abort the upload without waiting for a transcript."""
+        self.cancelled = True
+        self.chunks.put(_END)
+    
+    def _upload(self) -> None:
+        """Send the request and store the transcript."""
+        headers = {'Content-Type': f'multipart/form-data; boundary={self.boundary}'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        
+        try:
+            response = self.http_client.post(
+                self.url,
+                content=self._body(),
+                headers=headers,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            self.text = json.loads(response.content)['text'].strip()
+        except UploadCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+    
+    def _body(self):
+        """Yield the multipart body, blocking on recorded audio."""
+        yield self._field('model', self.model)
+        if self.language:
+            yield self._field('language', self.language)
+        
+        yield (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="audio.wav"\r\n'
+            f'Content-Type: audio/wav\r\n\r\n'
+        ).encode()
+        yield wav_header(self.sample_rate)
+        
+        while True:
+            chunk = self.chunks.get()
+            if self.cancelled:
+                raise UploadCancelled()
+            if chunk is _END:
+                break
+            self.bytes_sent += len(chunk)
+            yield chunk
+        
+        yield f'\r\n--{self.boundary}--\r\n'.encode()
+    
+    def _field(self, name: str, value: str) -> bytes:
+        """Encode a simple form field."""
+        return (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f'{value}\r\n'
+        ).encode()
@@ -0,0 +1,399 @@
+"""
+Text-to-speech backends.
+A common streaming interface over TTS providers, with hedging: when the
+primary provider is slow to start speaking, the same sentence is requested
+from a secondary one and whichever answers first is played.
+"""
+
+import inspect
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Type
+
+import numpy as np
+
+from providers.clients import get_openai_client, registry as clients
+from utils.helpers import calculate_speaking_time
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Every backend streams 16-bit mono PCM at this rate
+SAMPLE_RATE = 24000
+
+
+class TTSStream:
+    """
+    Audio chunks from one TTS request.
+    
+    ``backend`` is the backend the audio comes from. For a hedged request
+    it is the backend that won, set when the first chunk arrives.
+    """
+    
+    def __init__(self, backend: "TTSBackend", chunks: Optional[Iterator[bytes]] = None):
+        self.backend = backend
+        self.chunks = chunks
+    
+    def __iter__(self) -> "TTSStream":
+        return self
+    
+    def __next__(self) -> bytes:
+        return next(self.chunks)
+    
+    def close(self) -> None:
+        """Abandon the request."""
+        self.chunks.close()
+
+
+class TTSBackend:
+    """
+    Base class for text-to-speech backends.
+    
+    Subclasses implement ``_stream``. ``stream`` wraps it to record request
+    counts, errors, time to the first audio byte and total time under
+    ``tts.<name>.*`` in the metrics registry.
+    """
+    
+    name = "base"
+    model = ""
+    voice = ""
+    
+    @property
+    def candidates(self) -> List["TTSBackend"]:
+        """Backends whose audio ``stream`` may return."""
+        return [self]
+    
+    def available(self) -> bool:
+        """Whether the backend can be used in this environment."""
+        return True
+    
+    def stream(self, text: str) -> TTSStream:
+        """
+        Synthesize text, yielding audio as it arrives.
+        
+        Args:
+            text: Text to speak
+        
+        Returns:
+            Stream of 16-bit mono PCM chunks at SAMPLE_RATE; chunks may end
+            mid-sample
+        """
+        return TTSStream(self, self._measure(self._stream(text)))
+    
+    def _measure(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Record request metrics around a stream of chunks."""
+        metrics.counter(f"tts.{self.name}.requests").inc()
+        started = time.perf_counter()
+        first = True
+        try:
+            for chunk in chunks:
+                if first and chunk:
+                    metrics.histogram(f"tts.{self.name}.first_byte").observe(time.perf_counter() - started)
+                    first = False
+                yield chunk
+        except Exception:
+            metrics.counter(f"tts.{self.name}.errors").inc()
+            raise
+        metrics.histogram(f"tts.{self.name}.latency").observe(time.perf_counter() - started)
+    
+    def _stream(self, text: str) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+class OpenAITTSBackend(TTSBackend):
+    """OpenAI speech through the shared OpenAI connection pool."""
+    
+    name = "openai"
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "tts-1", voice: str = "alloy", chunk_bytes: int = 4096):
+        self.model = model
+        self.voice = voice
+        self.chunk_bytes = chunk_bytes
+        self.client = get_openai_client(api_key)
+    
+    def _stream(self, text: str) -> Iterator[bytes]:
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+            response_format="pcm"
+        ) as response:
+            yield from response.iter_bytes(self.chunk_bytes)
+
+
+class ElevenLabsTTSBackend(TTSBackend):
+    """ElevenLabs streaming speech over the shared ElevenLabs connection pool."""
+    
+    name = "elevenlabs"
+    
+    def __init__(
+        self,
+        elevenlabs_api_key: Optional[str] = None,
+        elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM",
+        elevenlabs_model: str = "eleven_turbo_v2_5",
+        chunk_bytes: int = 4096,
+        base_url: str = "https://api.elevenlabs.io/v1"
+    ):
+        self.api_key = elevenlabs_api_key
+        self.voice = elevenlabs_voice_id
+        self.model = elevenlabs_model
+        self.chunk_bytes = chunk_bytes
+        self.base_url = base_url
+    
+    def available(self) -> bool:
+        return bool(self.api_key)
+    
+    def _stream(self, text: str) -> Iterator[bytes]:
+        with clients.http_client('elevenlabs').stream(
+            "POST",
+            f"{self.base_url}/text-to-speech/{self.voice}/stream",
+            params={'output_format': f"pcm_{SAMPLE_RATE}"},
+            headers={'xi-api-key': self.api_key},
+            json={'text': text, 'model_id': self.model}
+        ) as response:
+            response.raise_for_status()
+            yield from response.iter_bytes(self.chunk_bytes)
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    Deterministic in-process backend for tests and offline runs.
+    
+    Speaks a quiet tone lasting as long as the text would take to say,
+    after a fixed ``first_byte`` delay and ``chunk_interval`` between
+    chunks. If ``fail`` is set, the request raises instead of producing
+    audio; if ``fail_after`` is set, it raises after that many chunks.
+    Requests are kept in ``calls``.
+    """
+    
+    name = "local"
+    model = "tone"
+    voice = "local"
+    
+    def __init__(
+        self,
+        first_byte: float = 0.0,
+        chunk_interval: float = 0.0,
+        chunk_bytes: int = 4096,
+        fail: bool = False,
+        fail_after: Optional[int] = None,
+        words_per_minute: float = 150.0
+    ):
+        self.first_byte = first_byte
+        self.chunk_interval = chunk_interval
+        self.chunk_bytes = chunk_bytes
+        self.fail = fail
+        self.fail_after = fail_after
+        self.words_per_minute = words_per_minute
+        self.calls: List[str] = []
+    
+    def _stream(self, text: str) -> Iterator[bytes]:
+        self.calls.append(text)
+        if self.first_byte:
+            time.sleep(self.first_byte)
+        if self.fail:
+            raise RuntimeError("local TTS backend set to fail")
+        
+        frames = int(calculate_speaking_time(text, self.words_per_minute) * SAMPLE_RATE)
+        tone = 0.1 * np.sin(2 * np.pi * 220 * np.arange(frames) / SAMPLE_RATE)
+        audio = (tone * 32767).astype('<i2').tobytes()
+        
+        for index, offset in enumerate(range(0, len(audio), self.chunk_bytes)):
+            if index == self.fail_after:
+                raise RuntimeError("local TTS backend set to fail mid-stream")
+            if offset and self.chunk_interval:
+                time.sleep(self.chunk_interval)
+            yield audio[offset:offset + self.chunk_bytes]
+
+
+class HedgedTTS(TTSBackend):
+    """
+    Requests speech from a primary backend, hedging with a secondary one.
+    
+    If the primary's first audio byte has not arrived within ``deadline``
+    seconds (or the primary fails first), the same text is requested from
+    the secondary. Audio comes from whichever backend produces its first
+    byte first (see ``TTSStream.backend``); the other request is
+    cancelled, and its connection closed when its stream next yields. Once a backend has won, its errors are
+    raised rather than replaced by the other backend's audio, so a clip cut
+    short never looks complete. Hedges and wins are counted under
+    ``tts.hedged.*``.
+    """
+    
+    name = "hedged"
+    
+    def __init__(self, primary: TTSBackend, secondary: TTSBackend, deadline: float = 0.6):
+        self.primary = primary
+        self.secondary = secondary
+        self.deadline = deadline
+        self.model = f"{primary.model}+{secondary.model}"
+        self.voice = f"{primary.voice}+{secondary.voice}"
+    
+    @property
+    def candidates(self) -> List[TTSBackend]:
+        return self.primary.candidates + self.secondary.candidates
+    
+    def stream(self, text: str) -> TTSStream:
+        stream = TTSStream(self)
+        stream.chunks = self._measure(self._race(text, stream))
+        return stream
+    
+    def _race(self, text: str, result: TTSStream) -> Iterator[bytes]:
+        """Run the hedged request, setting ``result.backend`` to the winner."""
+        events = queue.Queue()
+        launched = []  # (backend, cancel event)
+        streams = {}  # backend -> its TTSStream
+        
+        def pump(backend: TTSBackend, cancel: threading.Event) -> None:
+            # Worker thread: forward chunks until done or cancelled
+            stream = streams[backend]
+            try:
+                for chunk in stream:
+                    if cancel.is_set():
+                        break
+                    events.put((backend, chunk))
+            except Exception as e:
+                logger.warning(f"TTS backend '{backend.name}' failed: {e}")
+                events.put((backend, e))
+            else:
+                events.put((backend, None))
+            finally:
+                stream.close()
+        
+        def launch(backend: TTSBackend) -> None:
+            cancel = threading.Event()
+            launched.append((backend, cancel))
+            streams[backend] = backend.stream(text)
+            threading.Thread(target=pump, args=(backend, cancel), daemon=True).start()
+        
+        launch(self.primary)
+        deadline = time.perf_counter() + self.deadline
+        winner = None
+        ended = 0
+        error = None
+        
+        try:
+            # Race for the first byte
+            while winner is None:
+                hedged = len(launched) > 1
+                try:
+                    backend, chunk = events.get(timeout=None if hedged else max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    chunk = backend = None
+                
+                if isinstance(chunk, Exception):
+                    error, chunk = chunk, None
+                if chunk is None:
+                    if backend is not None:
+                        ended += 1
+                    if not hedged:
+                        # Primary is late or failed without audio
+                        metrics.counter("tts.hedged.hedges").inc()
+                        launch(self.secondary)
+                    elif ended == len(launched):
+                        if error is not None:
+                            raise error
+                        return
+                    continue
+                
+                winner = backend
+                result.backend = streams[winner].backend
+                for backend, cancel in launched:
+                    if backend is not winner:
+                        cancel.set()
+                metrics.counter(f"tts.hedged.wins.{winner.name}").inc()
+                yield chunk
+            
+            while True:
+                backend, chunk = events.get()
+                if backend is not winner:
+                    continue
+                if chunk is None:
+                    return
+                if isinstance(chunk, Exception):
+                    # Failed part-way through: the audio is incomplete
+                    raise chunk
+                yield chunk
+        
+        finally:
+            for _, cancel in launched:
+                cancel.set()
+
+
+class TTSBackendRegistry:
+    """Registered TTS backend classes, built by name."""
+    
+    def __init__(self):
+        self._backends: Dict[str, Type[TTSBackend]] = {}
+    
+    def register(self, backend_class: Type[TTSBackend]) -> Type[TTSBackend]:
+        """Register a backend class (usable as a decorator)."""
+        self._backends[backend_class.name] = backend_class
+        return backend_class
+    
+    def names(self) -> List[str]:
+        return list(self._backends)
+    
+    def create(self, name: str, **options) -> TTSBackend:
+        """
+        Build a backend by name.
+        
+        Args:
+            name: Registered backend name
+            **options: Constructor arguments; the backend gets the ones its
+                constructor accepts
+        
+        Raises:
+            ValueError: If no backend is registered under ``name``
+        """
+        backend_class = self._backends.get(name)
+        if backend_class is None:
+            raise ValueError(f"Unknown TTS backend '{name}'")
+        accepted = inspect.signature(backend_class.__init__).parameters
+        return backend_class(**{k: v for k, v in options.items() if k in accepted})
+
+
+# Process-wide backend registry
+tts_backends = TTSBackendRegistry()
+tts_backends.register(OpenAITTSBackend)
+tts_backends.register(ElevenLabsTTSBackend)
+tts_backends.register(LocalTTSBackend)
+
+
+def get_tts_backend(
+    provider: str = "openai",
+    fallback: Optional[str] = None,
+    hedge_deadline: float = 0.6,
+    **options
+) -> TTSBackend:
+    """
+    Create the configured TTS backend, hedged with ``fallback`` if given.
+    
+    An unavailable provider (such as ElevenLabs without an API key) is
+    replaced by OpenAI; a fallback that is unavailable or the same as the
+    provider is skipped.
+    
+    Args:
+        provider: Primary backend name
+        fallback: Secondary backend for hedged requests, or None
+        hedge_deadline: Seconds to wait for the primary's first byte
+        **options: Constructor arguments for the backends
+    
+    Returns:
+        Backend instance
+    """
+    primary = tts_backends.create(provider, **options)
+    if not primary.available():
+        logger.warning(f"TTS backend '{provider}' unavailable, using 'openai'")
+        primary = tts_backends.create("openai", **options)
+    metrics.counter(f"tts.selected.{primary.name}").inc()
+    
+    if not fallback or fallback == primary.name:
+        return primary
+    secondary = tts_backends.create(fallback, **options)
+    if not secondary.available():
+        logger.warning(f"TTS fallback backend '{fallback}' unavailable, not hedging")
+        return primary
+    return HedgedTTS(primary, secondary, hedge_deadline)
@@ -0,0 +1,306 @@
+"""Staged LLM -> TTS -> playback pipeline for streaming responses."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from providers.tts import SAMPLE_RATE as TTS_SAMPLE_RATE
+from utils.scheduler import SpeakingRateModel, SynthesisScheduler
+from utils.segmenter import SentenceSegmenter
+import config
+
+# Sentinel passed down the queues when an upstream stage has finished
+_END = object()
+
+
+class SpeechPipeline:
+    """
+    Speaks a streaming LLM response with overlapping stages.
+    
+    LLM streaming, TTS synthesis and playback run as tasks on the caller's
+    event loop, connected by bounded queues, so synthesis runs at most
+    ``lookahead`` sentences ahead of the sentence currently playing, with
+    up to ``concurrency`` TTS requests overlapping. Within those limits
+    each request starts just in time: once the unplayed speech ahead of
+    the listener, estimated by a speaking-rate model calibrated on earlier
+    output, drops to the expected time to first audio plus a margin.
+    Audio is always played in sentence order.
+    Cancelling ``run`` stops every stage and the audio output; how much of
+    each sentence was heard is then in ``last_interrupt``.
+    """
+    
+    def __init__(
+        self,
+        tts,
+        audio_output,
+        lookahead: int = config.TTS_LOOKAHEAD,
+        concurrency: int = config.TTS_CONCURRENCY
+    ):
+        self.tts = tts
+        self.audio_output = audio_output
+        self.lookahead = max(1, lookahead)
+        self.concurrency = max(1, concurrency)
+        self.rate_model = SpeakingRateModel()
+        self.scheduler = SynthesisScheduler(
+            self.rate_model,
+            voice=tts.backend.voice,
+            speed=config.TTS_SPEED,
+            margin=config.TTS_SCHEDULE_MARGIN
+        )
+        self.last_interrupt = None
+        # Held while audio is queued or stopped, so no chunk lands after a stop
+        self._output_lock = threading.Lock()
+        # Stops never queue behind synthesis and playback waits on the default executor
+        self._stop_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playback-stop")
+    
+    async def run(
+        self,
+        token_stream: Iterator[str],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Synthesize and play a token stream until it ends.
+        
+        Args:
+            token_stream: Iterator of LLM text tokens
+            on_token: Optional callback invoked with every token
+        
+        Returns:
+            The complete response text
+        """
+        loop = asyncio.get_event_loop()
+        sentence_queue = asyncio.Queue(maxsize=self.lookahead)
+        audio_queue = asyncio.Queue(maxsize=self.lookahead)
+        self.scheduler.speed = self.audio_output.speed
+        self.scheduler.reset(self.audio_output.played_seconds)
+        stopped = threading.Event()
+        
+        def stop_output():
+            # Set first, so no chunk that has not started queuing waits for the lock
+            stopped.set()
+            with self._output_lock:
+                return self.audio_output.stop()
+        
+        tasks = [
+            asyncio.ensure_future(self._llm_stage(token_stream, sentence_queue, on_token)),
+            asyncio.ensure_future(self._tts_stage(sentence_queue, audio_queue)),
+            asyncio.ensure_future(self._playback_stage(audio_queue, stopped)),
+        ]
+        
+        try:
+            response_text, _, _ = await asyncio.gather(*tasks)
+            return response_text
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Stopping waits up to one audio block for the output to go
+            # silent, so it runs off the event loop
+            self.last_interrupt = await loop.run_in_executor(self._stop_executor, stop_output)
+            raise
+    
+    async def _llm_stage(
+        self,
+        token_stream: Iterator[str],
+        sentence_queue: asyncio.Queue,
+        on_token: Optional[Callable[[str], None]]
+    ) -> str:
+        """Collect tokens into segments for the TTS stage."""
+        response_text = ""
+        segmenter = SentenceSegmenter(
+            first_min_chars=config.SEGMENT_FIRST_MIN_CHARS,
+            min_chars=config.SEGMENT_MIN_CHARS,
+            max_chars=config.SEGMENT_MAX_CHARS,
+            deadline=config.SEGMENT_DEADLINE
+        )
+        
+        async for token in self._stream_tokens(token_stream, segmenter.time_to_deadline):
+            if token is None:
+                # Stream is idle, so check whether pending text is overdue
+                segments = segmenter.poll()
+            else:
+                response_text += token
+                if on_token:
+                    on_token(token)
+                segments = segmenter.push(token)
+            
+            for segment in segments:
+                await sentence_queue.put(segment)
+        
+        # Flush any remaining text
+        for segment in segmenter.flush():
+            await sentence_queue.put(segment)
+        await sentence_queue.put(_END)
+        
+        return response_text
+    
+    async def _tts_stage(self, sentence_queue: asyncio.Queue, audio_queue: asyncio.Queue) -> None:
+        """
+        Synthesize segments ahead of playback, several at once.
+        
+        Each segment is handed to the playback stage as its own chunk queue,
+        in order, before its synthesis starts, so the current sentence plays
+        while it is still downloading and later ones download behind it.
+        A segment is requested once the scheduler says playback is about to
+        need it, with at most ``concurrency`` requests in flight; cancelling
+        the stage abandons every one of them at its next chunk.
+        """
+        loop = asyncio.get_event_loop()
+        cancelled = threading.Event()
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        
+        def stream_sentence(sentence: str, segment: int, chunks: asyncio.Queue) -> None:
+            # Worker thread: read the response and pass chunks to the event loop as they arrive
+            failed = False
+            try:
+                if cancelled.is_set():
+                    return
+                # A cached clip arrives at once, so it must not calibrate the time to first audio
+                cached = self.tts.lookup(sentence)
+                audio = [cached] if cached is not None else self.tts.stream(sentence, use_cache=False, raise_errors=True)
+                for chunk in audio:
+                    if cancelled.is_set():
+                        break
+                    # 16-bit mono, synthesized at normal speed; playback time-stretches it
+                    seconds = len(chunk) / (2 * TTS_SAMPLE_RATE) / self.scheduler.speed
+                    self.scheduler.received(segment, seconds, calibrate=cached is None)
+                    loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            except Exception as e:
+                # Play what arrived, but a clip cut short must not calibrate the speaking rate
+                failed = True
+                print(f"TTS error: {e}")
+            finally:
+                self.scheduler.finish(segment, complete=not (cancelled.is_set() or failed))
+                loop.call_soon_threadsafe(chunks.put_nowait, _END)
+        
+        async def synthesize(sentence: str, segment: int, chunks: asyncio.Queue) -> None:
+            try:
+                await loop.run_in_executor(None, stream_sentence, sentence, segment, chunks)
+            finally:
+                slots.release()
+        
+        async def until_needed() -> None:
+            # Re-check periodically: estimates firm up as audio arrives
+            delay = self.scheduler.delay(self.audio_output.played_seconds)
+            while delay > 0:
+                await asyncio.sleep(min(delay, 0.1))
+                delay = self.scheduler.delay(self.audio_output.played_seconds)
+        
+        try:
+            while True:
+                sentence = await sentence_queue.get()
+                if sentence is _END:
+                    break
+                
+                chunks = asyncio.Queue()
+                await audio_queue.put((sentence, chunks))
+                await until_needed()
+                await slots.acquire()
+                segment = self.scheduler.start(sentence)
+                task = asyncio.ensure_future(synthesize(sentence, segment, chunks))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            
+            await asyncio.gather(*in_flight)
+        finally:
+            cancelled.set()
+            for task in list(in_flight):
+                task.cancel()
+        
+        await audio_queue.put(_END)
+    
+    async def _playback_stage(self, audio_queue: asyncio.Queue, stopped: threading.Event) -> None:
+        """
+        Play synthesized sentences back to back.
+        
+        Chunks are queued on the output stream as they arrive, and each
+        sentence is queued while the previous one is still playing, so
+        there is no gap between them. Queuing time-stretches the audio and
+        waits when the output buffer is full, so it runs on a worker
+        thread; nothing is queued once ``stopped`` is set.
+        """
+        loop = asyncio.get_event_loop()
+        playing_until = None
+        
+        def play(chunk: bytes, sentence: str) -> Optional[int]:
+            with self._output_lock:
+                if stopped.is_set():
+                    return None
+                return self.audio_output.play_audio(chunk, final=False, label=sentence)
+        
+        def finish() -> None:
+            with self._output_lock:
+                if not stopped.is_set():
+                    self.audio_output.finish_stream()
+        
+        while True:
+            item = await audio_queue.get()
+            if item is _END:
+                break
+            
+            sentence, chunks = item
+            queued_until = None
+            while True:
+                chunk = await chunks.get()
+                if chunk is _END:
+                    break
+                queued_until = await loop.run_in_executor(None, play, chunk, sentence)
+            
+            if queued_until is None:
+                # Synthesis failed; nothing to play
+                continue
+            await loop.run_in_executor(None, finish)
+            
+            if playing_until is not None:
+                await loop.run_in_executor(None, self.audio_output.wait_until_done, playing_until)
+            playing_until = queued_until
+        
+        await loop.run_in_executor(None, self.audio_output.wait_until_done)
+    
+    async def _stream_tokens(
+        self,
+        token_stream: Iterator[str],
+        idle_timeout: Callable[[], Optional[float]]
+    ) -> AsyncIterator[Optional[str]]:
+        """
+        Iterate a blocking token iterator from the event loop.
+        
+        The iterator is consumed on a single worker thread so the underlying
+        HTTP stream is read and closed on the thread that owns it. Yields None
+        whenever no token arrives within ``idle_timeout()`` seconds.
+        """
+        loop = asyncio.get_event_loop()
+        tokens = asyncio.Queue()
+        cancelled = threading.Event()
+        errors = []
+        
+        def produce():
+            try:
+                for token in token_stream:
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(tokens.put_nowait, token)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if hasattr(token_stream, "close"):
+                    token_stream.close()
+                loop.call_soon_threadsafe(tokens.put_nowait, _END)
+        
+        loop.run_in_executor(None, produce)
+        
+        try:
+            while True:
+                try:
+                    token = await asyncio.wait_for(tokens.get(), idle_timeout())
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if token is _END:
+                    break
+                yield token
+        finally:
+            cancelled.set()
+        
+        if errors:
+            raise errors[0]
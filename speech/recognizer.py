@@ -5,22 +5,26 @@ Handles real-time microphone input and Whisper-based speech-to-text conversion
 
 import sounddevice as sd
 import numpy as np
-import queue
-import threading
-from openai import OpenAI
+import time
 import os
 from dotenv import load_dotenv
 import webrtcvad
-import collections
-import wave
-import tempfile
+from providers.clients import registry as clients
+from providers.stt import get_stt_backend
+from utils.endpointer import Endpointer
+from utils.ring_buffer import CallbackStats, SPSCRingBuffer
+from utils.wav import encode_wav
 
 load_dotenv()
 
 
 class SpeechRecognizer:
     def __init__(self, sample_rate=16000, chunk_duration_ms=30):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.stt = get_stt_backend(
+            os.getenv('STT_BACKEND', 'openai'),
+            language='en',
+            api_key=os.getenv('OPENAI_API_KEY')
+        )
         self.sample_rate = sample_rate
         self.chunk_duration_ms = chunk_duration_ms
         self.chunk_size = int(sample_rate * chunk_duration_ms / 1000)
@@ -28,30 +32,31 @@ class SpeechRecognizer:
         # Voice Activity Detection
         self.vad = webrtcvad.Vad(int(os.getenv('VAD_AGGRESSIVENESS', 3)))
         
-        # Audio buffers
-        self.audio_queue = queue.Queue()
+        # Lock-free handoff from the audio callback, holding a few seconds of audio
+        self.audio_ring = SPSCRingBuffer(sample_rate * 2, dtype=np.int16)
+        self.callback_stats = CallbackStats(sample_rate)
         self.is_listening = False
         self.stream = None
         
-        # Ring buffer for VAD
-        self.ring_buffer = collections.deque(maxlen=50)
-        self.triggered = False
+        # Streaming endpointer; webrtcvad confirms blocks above the noise floor
+        self.endpointer = Endpointer(
+            sample_rate=sample_rate,
+            pre_roll_ms=int(os.getenv('VAD_PRE_ROLL_MS', 300)),
+            hangover_ms=int(os.getenv('VAD_HANGOVER_MS', 500)),
+            classifier=lambda frame: self.vad.is_speech(frame.tobytes(), self.sample_rate)
+        )
         self.voiced_frames = []
-        
-        # Speech detection parameters
-        self.num_padding_frames = 10
-        self.num_window_frames = 10
-        self.ratio = 0.75
-        
+    
     def start_listening(self):
         """Start listening to microphone input"""
         self.is_listening = True
         
-        def audio_callback(indata, frames, time, status):
-            if status:
-                print(f"Audio callback status: {status}")
+        def audio_callback(indata, frames, time_info, status):
+            # Runs on the PortAudio thread: copy into the ring and count, nothing else
+            started = time.perf_counter()
             if self.is_listening:
-                self.audio_queue.put(bytes(indata))
+                self.audio_ring.write(np.frombuffer(indata, dtype=np.int16))
+            self.callback_stats.record(frames, started, status)
         
         self.stream = sd.RawInputStream(
             samplerate=self.sample_rate,
@@ -62,7 +67,7 @@ class SpeechRecognizer:
         )
         self.stream.start()
         print("🎤 Listening...")
-        
+    
     def stop_listening(self):
         """Stop listening to microphone input"""
         self.is_listening = False
@@ -70,85 +75,65 @@ class SpeechRecognizer:
             self.stream.stop()
             self.stream.close()
         print("🛑 Stopped listening")
-        
+    
     def detect_speech(self, timeout=10):
         """
         Detect speech using VAD and return when speech ends
         Returns: audio data (bytes) or None if timeout
         """
-        num_voiced = 0
-        num_unvoiced = 0
-        
-        start_time = threading.Timer(timeout, lambda: None)
-        start_time.start()
+        deadline = time.monotonic() + timeout
+        self.endpointer.reset()
+        self.voiced_frames = []
         
         while self.is_listening:
-            try:
-                chunk = self.audio_queue.get(timeout=0.1)
-                
-                # Check if chunk contains voice
-                is_speech = self.vad.is_speech(chunk, self.sample_rate)
-                
-                if not self.triggered:
-                    self.ring_buffer.append((chunk, is_speech))
-                    num_voiced = len([f for f, speech in self.ring_buffer if speech])
-                    
-                    if num_voiced > self.ratio * self.ring_buffer.maxlen:
-                        self.triggered = True
-                        print("🗣️  Speech detected")
-                        # Add buffered audio
-                        for frame, _ in self.ring_buffer:
-                            self.voiced_frames.append(frame)
-                        self.ring_buffer.clear()
-                else:
-                    self.voiced_frames.append(chunk)
-                    self.ring_buffer.append((chunk, is_speech))
-                    num_unvoiced = len([f for f, speech in self.ring_buffer if not speech])
-                    
-                    if num_unvoiced > self.ratio * self.ring_buffer.maxlen:
-                        self.triggered = False
-                        print("🔇 Speech ended")
-                        audio_data = b''.join(self.voiced_frames)
-                        self.voiced_frames = []
-                        self.ring_buffer.clear()
-                        return audio_data
-                        
-            except queue.Empty:
+            if self.audio_ring.available < self.chunk_size:
+                if not self.endpointer.in_speech and time.monotonic() > deadline:
+                    return None
+                time.sleep(self.chunk_duration_ms / 1000)
                 continue
-                
-        return None
+            
+            # webrtcvad needs whole 10/20/30 ms frames
+            chunk = self.audio_ring.read(self.chunk_size)[:, 0]
+            event = self.endpointer.process(chunk)
+            
+            if event == Endpointer.START:
+                print("🗣️  Speech detected")
+                # Transcription follows when speech ends, so warm the pool
+                clients.warm_up(['openai'])
+                # Add buffered audio
+                self.voiced_frames = self.endpointer.pre_roll_frames()
+            elif self.endpointer.in_speech:
+                self.voiced_frames.append(chunk)
+            elif event == Endpointer.END:
+                print("🔇 Speech ended")
+                self.voiced_frames.append(chunk)
+                audio_data = b''.join(self.voiced_frames)
+                self.voiced_frames = []
+                return audio_data
+            elif time.monotonic() > deadline:
+                return None
         
+        return None
+    
+    def get_stats(self):
+        """Audio callback timing and overflow counts"""
+        return {'dropped_frames': self.audio_ring.dropped_frames, **self.callback_stats.as_dict()}
+    
     def transcribe(self, audio_data):
         """
         Transcribe audio data using Whisper
         """
         if not audio_data:
             return ""
-            
-        # Save to temporary WAV file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-            temp_path = temp_audio.name
-            
-            # Write WAV file
-            with wave.open(temp_path, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(audio_data)
         
-        try:
-            # Transcribe with Whisper
-            with open(temp_path, 'rb') as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en"
-                )
-            return transcript.text
-        finally:
-            # Clean up temp file
-            os.unlink(temp_path)
-            
+        clients.record_turn(['openai'])
+        
+        # Serve the PCM bytes as a WAV file, no temp file needed
+        audio_file = encode_wav(audio_data, self.sample_rate)
+        
+        # Transcribe with the configured backend (Whisper by default)
+        return self.stt.transcribe(audio_file, language="en")
+    
     def listen_and_transcribe(self):
         """
         Main method: listen for speech and transcribe it
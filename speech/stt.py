@@ -1,61 +1,192 @@
-"""Speech-to-text module using OpenAI Whisper."""
-import io
+"""Speech-to-text module (Whisper by default, see providers.stt for backends)."""
 import numpy as np
-from openai import OpenAI
-import soundfile as sf
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+from providers.stt import get_stt_backend
+from providers.transcription import StreamingTranscription
+from utils.codecs import AudioEncoder
+from utils.helpers import merge_transcripts
+from utils.speech_gate import SpeechGate
 import config
 
 
+class Upload(NamedTuple):
+    """One encoded segment of a recording."""
+    file: Future  # Resolves to the encoded file
+    overlaps_previous: bool  # Starts inside the previous segment
+
+
 class SpeechToText:
-    """Handles speech recognition using Whisper API."""
+    """Handles speech recognition through the configured STT backend."""
     
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self.backend = get_stt_backend(
+            config.STT_BACKEND,
+            language=config.STT_LANGUAGE,
+            api_key=config.OPENAI_API_KEY,
+            model=config.WHISPER_MODEL,
+            base_url=config.STT_BASE_URL,
+            local_model=config.STT_LOCAL_MODEL
+        )
+        
+        # Used when the primary backend fails (e.g. the network is down)
+        self.fallback = None
+        if config.STT_FALLBACK_BACKEND and config.STT_FALLBACK_BACKEND != self.backend.name:
+            try:
+                self.fallback = get_stt_backend(
+                    config.STT_FALLBACK_BACKEND,
+                    language=config.STT_LANGUAGE,
+                    fallback=False,
+                    local_model=config.STT_LOCAL_MODEL
+                )
+            except ValueError:
+                print(f"STT fallback '{config.STT_FALLBACK_BACKEND}' is not available")
+        
+        self.encoder = AudioEncoder(config.STT_UPLOAD_CODEC, config.SAMPLE_RATE)
+        self.gate = SpeechGate(
+            sample_rate=config.SAMPLE_RATE,
+            min_voiced_seconds=config.SPEECH_MIN_VOICED_SECONDS,
+            min_level=config.SPEECH_MIN_LEVEL,
+            padding_seconds=config.SPEECH_PADDING_SECONDS
+        )
+        
+        # Segments of long recordings are transcribed concurrently
+        self.pool = ThreadPoolExecutor(max_workers=config.STT_MAX_PARALLEL, thread_name_prefix="stt")
     
-    def transcribe(self, audio_data: np.ndarray) -> str:
+    def encode(self, audio_data: np.ndarray, streamed: bool = False) -> Optional[List[Upload]]:
+        """
+        Check audio for speech, trim silence and start encoding it for upload.
+        
+        Recordings longer than ``STT_SEGMENT_SECONDS`` are split at pauses
+        into segments that are encoded (and later transcribed) separately.
+        
+        Args:
+            audio_data: NumPy array of audio samples
+            streamed: The audio was already uploaded by a streaming
+                transcription; this upload is only its fallback
+        
+        Returns:
+            Uploads to pass to ``transcribe`` (one for short recordings), or
+            None if the recording contains no speech
+        """
+        if config.SPEECH_GATE:
+            audio_data = self.gate.trim(audio_data, streamed)
+            if audio_data is None:
+                return None
+        elif len(audio_data) == 0:
+            return None
+        
+        if not config.STT_SEGMENT_SECONDS:
+            return [Upload(self.encoder.submit(audio_data), False)]
+        
+        uploads = []
+        previous_end = 0
+        for start, end in self.gate.split(audio_data, config.STT_SEGMENT_SECONDS, config.STT_SEGMENT_OVERLAP):
+            uploads.append(Upload(self.encoder.submit(audio_data[start:end]), start < previous_end))
+            previous_end = end
+        return uploads
+    
+    def transcribe(
+        self,
+        audio_data: np.ndarray,
+        encoded: Optional[List[Upload]] = None,
+        raise_errors: bool = False
+    ) -> str:
         """
         Transcribe audio data to text.
         
         Args:
             audio_data: NumPy array of audio samples
-            
+            encoded: Uploads already started with ``encode`` (optional)
+            raise_errors: Raise encoding and transcription failures instead
+                of printing them and returning "" (for batch jobs)
+        
         Returns:
-            Transcribed text
+            Transcribed text, or "" if no speech was found
         """
-        if len(audio_data) == 0:
+        if encoded is None:
+            encoded = self.encode(audio_data)
+            if encoded is None:
+                return ""
+        
+        if len(encoded) == 1:
+            return self._transcribe_file(encoded[0].file, raise_errors)
+        
+        # Long recording: transcribe the segments concurrently, then stitch
+        texts = list(self.pool.map(lambda upload: self._transcribe_file(upload.file, raise_errors), encoded))
+        
+        text = texts[0]
+        for upload, part in zip(encoded[1:], texts[1:]):
+            if upload.overlaps_previous:
+                text = merge_transcripts([text, part])
+            else:
+                text = f"{text} {part}".strip()
+        return text
+    
+    def _transcribe_file(self, encoded: Future, raise_errors: bool = False) -> str:
+        """Send one encoded file to the STT backend."""
+        try:
+            audio_file = encoded.result()
+        except Exception as e:
+            # Nothing to send to either backend
+            if raise_errors:
+                raise
+            print(f"Audio encoding error: {e}")
             return ""
         
-        # Convert numpy array to audio file in memory
-        audio_buffer = io.BytesIO()
-        sf.write(
-            audio_buffer,
-            audio_data,
-            config.SAMPLE_RATE,
-            format='WAV',
-            subtype='PCM_16'
-        )
-        audio_buffer.seek(0)
-        audio_buffer.name = "audio.wav"
+        try:
+            return self.backend.transcribe(audio_file, config.STT_LANGUAGE)
+        
+        except Exception as e:
+            if self.fallback is None:
+                if raise_errors:
+                    raise
+                print(f"Transcription error: {e}")
+                return ""
+            print(f"Transcription error ({self.backend.name}): {e}, retrying with {self.fallback.name}")
         
         try:
-            # Call Whisper API
-            transcript = self.client.audio.transcriptions.create(
-                model=config.WHISPER_MODEL,
-                file=audio_buffer,
-                language=config.STT_LANGUAGE
-            )
-            
-            return transcript.text.strip()
-            
+            audio_file.seek(0)
+            return self.fallback.transcribe(audio_file, config.STT_LANGUAGE)
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Transcription error: {e}")
             return ""
     
-    def transcribe_streaming(self, audio_stream):
+    def start_stream(self) -> Optional[StreamingTranscription]:
         """
-        Transcribe streaming audio (future enhancement).
-        Currently processes complete audio chunks.
+        Start a transcription whose audio is uploaded while it is recorded.
+        
+        Feed chunks with ``feed`` as they are captured, then call ``finish``
+        for the transcript.
+        
+        Returns:
+            The running streaming transcription, or None if the backend
+            cannot stream
+        """
+        if not self.backend.capabilities.streaming:
+            return None
+        return self.backend.start_stream(config.SAMPLE_RATE, config.STT_LANGUAGE, config.STT_TIMEOUT)
+    
+    def transcribe_streaming(self, audio_stream) -> str:
+        """
+        Transcribe audio chunks, uploading each one as it arrives.
+        
+        Args:
+            audio_stream: Iterator of NumPy audio chunks
+        
+        Returns:
+            Transcribed text
         """
-        # This is a placeholder for future streaming implementation
-        # Whisper API doesn't support true streaming yet
-        pass
+        stream = self.start_stream()
+        if stream is None:
+            return self.transcribe(np.concatenate(list(audio_stream)))
+        for chunk in audio_stream:
+            stream.feed(chunk)
+        return stream.finish() or ""
+    
+    def close(self) -> None:
+        """Stop the encoder and transcription workers."""
+        self.encoder.shutdown()
+        self.pool.shutdown(wait=False)
@@ -4,25 +4,30 @@ Handles streaming text-to-speech synthesis with interrupt capability
 """
 
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
-import sounddevice as sd
-import numpy as np
-import threading
-import queue
-import io
+from audio.playback import PlaybackStream
+from providers.clients import get_openai_client
+from providers.tts import SAMPLE_RATE as TTS_SAMPLE_RATE
 
 load_dotenv()
 
 
 class TextToSpeech:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        self.is_playing = False
+        self.client = get_openai_client(os.getenv('OPENAI_API_KEY'))
         self.should_stop = False
-        self.audio_queue = queue.Queue()
-        self.playback_thread = None
         
+        # One output stream for every sentence, so sentences play without gaps
+        self.player = PlaybackStream(
+            sample_rate=TTS_SAMPLE_RATE,
+            target_ms=int(os.getenv('PLAYBACK_TARGET_MS', 80))
+        )
+        self.queued_until = 0
+    
+    @property
+    def is_playing(self):
+        return self.player.playing
+    
     def synthesize_streaming(self, text, voice="alloy"):
         """
         Synthesize text to speech with streaming
@@ -40,40 +45,26 @@ class TextToSpeech:
         except Exception as e:
             print(f"TTS Error: {e}")
             return None
-            
-    def play_audio(self, audio_data, sample_rate=24000):
-        """Play audio data with interrupt capability"""
+    
+    def play_audio(self, audio_data, sample_rate=TTS_SAMPLE_RATE):
+        """Queue PCM audio behind anything already playing (returns immediately)"""
         if not audio_data:
             return
-            
-        self.is_playing = True
-        self.should_stop = False
-        
-        # Convert bytes to numpy array
-        audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        def playback():
-            try:
-                sd.play(audio_array, sample_rate, blocking=False)
-                while sd.get_stream().active and not self.should_stop:
-                    sd.sleep(100)
-                if self.should_stop:
-                    sd.stop()
-            finally:
-                self.is_playing = False
-                
-        self.playback_thread = threading.Thread(target=playback)
-        self.playback_thread.start()
         
+        self.should_stop = False
+        self.queued_until = self.player.enqueue(audio_data, sample_rate)
+    
+    def wait_until_done(self):
+        """Wait until queued audio has played or playback is stopped"""
+        self.player.wait(self.queued_until, lambda: self.should_stop)
+    
     def stop(self):
         """Stop current playback"""
         self.should_stop = True
-        if self.playback_thread:
-            self.playback_thread.join(timeout=1)
-        sd.stop()
-        self.is_playing = False
-        print("⏸️  Audio stopped")
-        
+        report = self.player.stop()
+        print(f"⏸️  Audio stopped ({report.latency * 1000:.0f} ms)")
+        return report
+    
     def speak(self, text, voice="alloy"):
         """
         Complete speak method: synthesize and play
@@ -83,5 +74,4 @@ class TextToSpeech:
         if audio_data:
             self.play_audio(audio_data)
             # Wait for playback to complete
-            if self.playback_thread:
-                self.playback_thread.join()
+            self.wait_until_done()
@@ -1,6 +1,11 @@
-"""Text-to-speech module using OpenAI TTS."""
-from openai import OpenAI
-from typing import Iterator
+"""Text-to-speech module over the configured TTS providers."""
+import queue
+import threading
+from collections import deque
+from typing import Iterator, Optional
+from providers.tts import get_tts_backend
+from utils.segmenter import SentenceSegmenter
+from utils.tts_cache import TTSCache, cache_key
 import config
 
 
@@ -8,7 +13,27 @@ class TextToSpeech:
     """Handles text-to-speech synthesis."""
     
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self.backend = get_tts_backend(
+            config.TTS_PROVIDER,
+            fallback=config.TTS_FALLBACK_PROVIDER,
+            hedge_deadline=config.TTS_HEDGE_DEADLINE,
+            api_key=config.OPENAI_API_KEY,
+            model=config.TTS_MODEL,
+            voice=config.TTS_VOICE,
+            chunk_bytes=config.TTS_STREAM_CHUNK_BYTES,
+            elevenlabs_api_key=config.ELEVENLABS_API_KEY,
+            elevenlabs_voice_id=config.ELEVENLABS_VOICE_ID,
+            elevenlabs_model=config.ELEVENLABS_MODEL
+        )
+        
+        # Repeated sentences are served locally, without a request
+        self.cache = None
+        if config.TTS_CACHE:
+            self.cache = TTSCache(
+                memory_bytes=int(config.TTS_CACHE_MEMORY_MB * 2**20),
+                disk_dir=config.TTS_CACHE_DIR,
+                disk_bytes=int(config.TTS_CACHE_DISK_MB * 2**20)
+            )
     
     def synthesize(self, text: str) -> bytes:
         """
@@ -16,59 +41,163 @@ class TextToSpeech:
         
         Args:
             text: Text to synthesize
-            
+        
         Returns:
-            Audio data as bytes
+            16-bit mono PCM at 24 kHz
         """
         if not text:
             return b""
         
+        return b"".join(self.stream(text))
+    
+    def lookup(self, text: str) -> Optional[bytes]:
+        """
+        Get cached audio for text without making a request.
+        
+        Returns:
+            The whole clip, or None if it is not cached
+        """
+        if not text or not self.cache:
+            return None
+        
+        # Audio is cached under the backend that produced it, and a hedged
+        # backend may have produced it from either of its providers
+        for backend in self.backend.candidates:
+            cached = self.cache.get(self._cache_key(text, backend))
+            if cached is not None:
+                return cached
+        return None
+    
+    def stream(self, text: str, use_cache: bool = True, raise_errors: bool = False) -> Iterator[bytes]:
+        """
+        Convert text to speech, yielding audio as it arrives.
+        
+        Audio is raw 16-bit mono PCM at 24 kHz, so playback can start on
+        the first chunk without decoding. Chunks may end mid-sample; the
+        playback buffer realigns them. Cached sentences are yielded whole
+        without a request; others are cached once fully received.
+        
+        Args:
+            text: Text to synthesize
+            use_cache: False to skip the cache lookup (for callers that
+                already called ``lookup``); the result is still cached
+            raise_errors: Raise a failed request instead of printing it
+                and ending the audio early
+        
+        Yields:
+            PCM chunks of up to TTS_STREAM_CHUNK_BYTES
+        """
+        if not text:
+            return
+        
+        if use_cache:
+            cached = self.lookup(text)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = []
+        stream = self.backend.stream(text)
         try:
-            response = self.client.audio.speech.create(
-                model=config.TTS_MODEL,
-                voice=config.TTS_VOICE,
-                input=text,
-                speed=config.TTS_SPEED
-            )
-            
-            return response.content
-            
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"TTS error: {e}")
-            return b""
+            return
+        
+        # Only complete responses are cached (an abandoned stream never gets here)
+        if self.cache:
+            self.cache.put(self._cache_key(text, stream.backend), b"".join(chunks))
+    
+    @staticmethod
+    def _cache_key(text: str, backend) -> str:
+        """Cache key for audio of ``text`` from ``backend``."""
+        # Speed is applied at playback, so one clip serves every speed
+        return cache_key(text, f"{backend.name}:{backend.model}", backend.voice)
     
     def synthesize_streaming(self, text_stream: Iterator[str]) -> Iterator[bytes]:
         """
         Synthesize speech from streaming text tokens.
-        Buffers tokens into sentences for natural speech.
+        Buffers tokens into segments with the streaming sentence segmenter.
+        
+        Up to TTS_CONCURRENCY segments are synthesized at once, each on its
+        own thread. Audio is yielded strictly in segment order: the oldest
+        segment streams as it arrives while later ones buffer behind it.
+        Closing the generator abandons every request in flight.
         
         Args:
             text_stream: Iterator of text tokens
-            
+        
         Yields:
-            Audio chunks as bytes
+            PCM audio chunks in order
         """
-        buffer = ""
-        sentence_endings = {'.', '!', '?', '\n'}
+        segmenter = SentenceSegmenter(
+            first_min_chars=config.SEGMENT_FIRST_MIN_CHARS,
+            min_chars=config.SEGMENT_MIN_CHARS,
+            max_chars=config.SEGMENT_MAX_CHARS,
+            deadline=config.SEGMENT_DEADLINE
+        )
+        slots = threading.BoundedSemaphore(max(1, config.TTS_CONCURRENCY))
+        cancelled = threading.Event()
+        pending = deque()  # One chunk queue per segment, oldest first
+        
+        def fetch(segment: str, chunks: queue.Queue) -> None:
+            try:
+                for chunk in self.stream(segment):
+                    if cancelled.is_set():
+                        break
+                    chunks.put(chunk)
+            finally:
+                slots.release()
+                chunks.put(None)
+        
+        def drain() -> Iterator[bytes]:
+            # Yield the oldest segment to its end
+            chunks = pending.popleft()
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    return
+                yield chunk
+        
+        def ready() -> Iterator[bytes]:
+            # Yield whatever has arrived, in order, without waiting
+            while pending:
+                try:
+                    chunk = pending[0].get_nowait()
+                except queue.Empty:
+                    return
+                if chunk is None:
+                    pending.popleft()
+                else:
+                    yield chunk
+        
+        def start(segment: str) -> Iterator[bytes]:
+            # A slot frees up once the oldest segment has fully downloaded
+            while not slots.acquire(blocking=False):
+                yield from drain()
+            chunks = queue.Queue()
+            pending.append(chunks)
+            threading.Thread(target=fetch, args=(segment, chunks), daemon=True).start()
         
         try:
             for token in text_stream:
-                buffer += token
-                
-                # Check if we have a complete sentence
-                if any(buffer.rstrip().endswith(end) for end in sentence_endings):
-                    # Synthesize the complete sentence
-                    if buffer.strip():
-                        audio = self.synthesize(buffer.strip())
-                        if audio:
-                            yield audio
-                    buffer = ""
+                for segment in segmenter.push(token):
+                    yield from start(segment)
+                yield from ready()
             
             # Synthesize any remaining text
-            if buffer.strip():
-                audio = self.synthesize(buffer.strip())
-                if audio:
-                    yield audio
-                    
+            for segment in segmenter.flush():
+                yield from start(segment)
+            while pending:
+                yield from drain()
+        
         except Exception as e:
             print(f"Streaming TTS error: {e}")
+        
+        finally:
+            cancelled.set()
@@ -0,0 +1,41 @@
+"""Shared test fixtures."""
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    """Clock the test advances by hand."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at zero."""
+    return FakeClock()
+
+
+@pytest.fixture
+def load_module():
+    """
+    Load a repository module by path, e.g. ``load_module("speech/tts.py")``.
+    
+    Modules in speech/ can't be imported normally here: the package's
+    ``__init__`` imports sounddevice, which needs an audio device. The module
+    is named after its path (``speech_tts``) unless ``name`` is given.
+    """
+    def load(path, name=None):
+        name = name or os.path.splitext(path)[0].replace("/", "_")
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, *path.split("/")))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
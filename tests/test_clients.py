@@ -0,0 +1,109 @@
+"""Test suite for the shared provider connection pools."""
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from providers.clients import ClientRegistry
+
+
+class FakeConnection:
+    """Stand-in for a pooled keep-alive connection."""
+    
+    def __init__(self):
+        self.expired = False
+    
+    def is_available(self):
+        return True
+    
+    def has_expired(self):
+        return self.expired
+
+
+class PooledMockTransport(httpx.MockTransport):
+    """MockTransport that opens one stand-in keep-alive connection on its first request."""
+    
+    def __init__(self, **options):
+        super().__init__(self.respond)
+        self._pool = SimpleNamespace(connections=[])
+        self.requests = []
+    
+    def respond(self, request):
+        self.requests.append((request.method, request.url.host))
+        if not self._pool.connections:
+            self._pool.connections.append(FakeConnection())
+            request.extensions["trace"]("connection.connect_tcp.complete", {})
+        return httpx.Response(200)
+
+
+def test_pool_is_shared_and_reused():
+    """One client per provider; requests after the first reuse its connection."""
+    registry = ClientRegistry(transport=PooledMockTransport)
+    client = registry.http_client("openai")
+    assert registry.http_client("openai") is client
+    assert registry.http_client("anthropic") is not client
+    
+    for _ in range(4):
+        client.get("https://api.openai.com/v1/models")
+    stats = registry.get_stats()["openai"]
+    assert stats['requests'] == 4
+    assert stats['connections_opened'] == 1
+    assert stats['reuse_ratio'] == pytest.approx(0.75)
+    
+    sdk = registry.openai("key")
+    assert registry.openai("key") is sdk
+    assert registry.openai("other key") is not sdk
+    assert sdk._client is client
+
+
+def test_turns_count_warm_connections():
+    """A turn is warm when the pool holds an idle, unexpired connection."""
+    registry = ClientRegistry(transport=PooledMockTransport)
+    registry.record_turn(["openai"])
+    registry.http_client("openai").get("https://api.openai.com/v1/models")
+    registry.record_turn(["openai"])
+    
+    stats = registry.get_stats()["openai"]
+    assert (stats['turns'], stats['warm_turns']) == (2, 1)
+    assert stats['warm_ratio'] == pytest.approx(0.5)
+    
+    registry._transports["openai"].transport._pool.connections[0].expired = True
+    assert not registry.is_warm("openai")
+    
+    registry.close()
+    assert registry._transports == {} and registry._sdk_clients == {}
+    assert not registry.is_warm("openai")
+
+
+def test_idle_check_without_a_connection_pool():
+    """Transports without httpcore's pool never count as warm."""
+    registry = ClientRegistry(transport=lambda **options: httpx.MockTransport(lambda request: httpx.Response(200)))
+    registry.http_client("openai").get("https://api.openai.com/v1/models")
+    assert not registry.is_warm("openai")
+    assert registry.get_stats()["openai"]['requests'] == 1
+
+
+def test_keypress_warm_up_opens_each_pool_once():
+    """Warm-up opens a connection per provider in the background and skips pools already warm."""
+    registry = ClientRegistry(transport=PooledMockTransport)
+    threads = registry.warm_up(["openai", "anthropic", "unknown"])
+    assert len(threads) == 2
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    for provider, host in (("openai", "api.openai.com"), ("anthropic", "api.anthropic.com")):
+        assert registry.is_warm(provider)
+        assert registry._transports[provider].transport.requests == [("HEAD", host)]
+        assert registry.get_stats()[provider]['warmups'] == 1
+    
+    # Pressing again while the connections are idle costs nothing
+    assert registry.warm_up(["openai", "anthropic"]) == []
+    registry.warm_up(["openai"], background=False)
+    assert registry.get_stats()["openai"]['warmups'] == 1
+    
+    registry.record_turn(["openai", "anthropic"])
+    assert all(stats['warm_turns'] == 1 for stats in registry.get_stats().values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
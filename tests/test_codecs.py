@@ -0,0 +1,89 @@
+"""Test suite for speech upload and download codecs."""
+
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+from utils.codecs import AudioDecoder, AudioEncoder, codec_available, decode_audio, encode_audio
+from utils.wav import to_pcm16
+
+
+def speech_like(seconds=1.0, sample_rate=16000):
+    """A decaying harmonic tone with a little noise."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    rng = np.random.default_rng(0)
+    audio = 0.3 * np.sin(2 * np.pi * 150 * t) * np.exp(-t) + rng.normal(0, 0.002, len(t))
+    return audio.astype(np.float32).reshape(-1, 1)
+
+
+def test_flac_is_lossless_and_smaller():
+    """FLAC decodes to exactly the samples a WAV upload would carry."""
+    audio = speech_like()
+    flac = encode_audio(audio, 16000, 'flac')
+    wav = encode_audio(audio, 16000, 'wav')
+    
+    assert flac.name == "audio.flac"
+    decoded, _ = sf.read(flac, dtype='int16')
+    assert np.array_equal(decoded, to_pcm16(audio)[:, 0])
+    assert flac.getbuffer().nbytes < len(wav)
+
+
+@pytest.mark.skipif(not codec_available('opus'), reason="libsndfile without Opus")
+def test_opus_round_trip():
+    """Opus uploads are Ogg files of the same duration."""
+    opus = encode_audio(speech_like(), 16000, 'opus')
+    info = sf.info(opus)
+    assert opus.name == "audio.ogg"
+    assert info.samplerate == 16000 and abs(info.duration - 1.0) < 0.05
+
+
+def test_encoder_runs_off_calling_thread():
+    """Encoding happens on the encoder thread and is counted."""
+    encoder = AudioEncoder('flac', 16000)
+    threads = []
+    original = encoder._encode
+    encoder._encode = lambda audio: threads.append(threading.current_thread()) or original(audio)
+    
+    audio_file = encoder.submit(speech_like(2.0)).result(timeout=5)
+    stats = encoder.get_stats()
+    encoder.shutdown()
+    
+    assert audio_file.name == "audio.flac"
+    assert threads and threads[0] is not threading.current_thread()
+    assert stats['encoded'] == 1 and stats['audio_seconds'] == pytest.approx(2.0)
+    assert stats['bytes_saved'] > 0
+
+
+def test_unknown_codec_falls_back_to_wav():
+    """An unsupported codec setting still produces uploads."""
+    encoder = AudioEncoder('mp9', 16000)
+    assert encoder.codec == 'wav'
+    assert encoder.submit(speech_like()).result(timeout=5).name == "audio.wav"
+    encoder.shutdown()
+
+
+
+def test_decodes_tts_responses_in_process():
+    """PCM and compressed responses decode to float32 frames with their own rate."""
+    audio = speech_like(1.0, 24000)
+    pcm = to_pcm16(audio).tobytes()
+    
+    samples, rate = decode_audio(pcm + b'\x00', 'pcm', 24000)
+    assert rate == 24000 and samples.shape == (24000, 1)
+    assert np.abs(samples - audio).max() < 1e-4
+    
+    flac = encode_audio(audio, 24000, 'flac').getvalue()
+    decoder = AudioDecoder(workers=2)
+    decoded, rate = decoder.submit(flac, 'flac').result(timeout=5)
+    decoder.shutdown()
+    assert rate == 24000 and decoded.dtype == np.float32
+    assert np.abs(decoded - audio).max() < 1e-3
+    assert decoder.get_stats()['decoded'] == 1
+    
+    with pytest.raises(ValueError):
+        decode_audio(flac, 'aac')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+"""Test suite for the streaming speech endpointer."""
+
+import numpy as np
+import pytest
+from utils.endpointer import Endpointer, frame_energy
+
+SAMPLE_RATE = 16000
+BLOCK = 480
+
+
+def make_audio(segments, seed=0):
+    """Build noise with loud tone bursts; segments are (start, end) seconds."""
+    rng = np.random.default_rng(seed)
+    length = int(max(end for _, end in segments) * SAMPLE_RATE) + SAMPLE_RATE
+    audio = rng.normal(0.0, 0.003, length).astype(np.float32)
+    t = np.arange(length) / SAMPLE_RATE
+    for start, end in segments:
+        mask = (t >= start) & (t < end)
+        audio[mask] += 0.2 * np.sin(2 * np.pi * 180 * t[mask]).astype(np.float32)
+    return audio
+
+
+def run(endpointer, audio):
+    """Feed audio block by block and collect (event, sample position) pairs."""
+    events = []
+    for i in range(0, len(audio) - BLOCK + 1, BLOCK):
+        event = endpointer.process(audio[i:i + BLOCK])
+        if event:
+            events.append((event, endpointer.position))
+    return events
+
+
+def test_detects_start_and_end():
+    """Speech start and end are reported shortly after the true boundaries."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE, hangover_ms=400)
+    events = run(endpointer, make_audio([(1.0, 2.5)]))
+    
+    assert [event for event, _ in events] == [Endpointer.START, Endpointer.END]
+    start, end = events[0][1] / SAMPLE_RATE, events[1][1] / SAMPLE_RATE
+    assert 1.0 < start < 1.3
+    assert 2.9 <= end < 3.1
+    
+    # Reported speech includes the pre-roll before the start event
+    assert endpointer.speech_start / SAMPLE_RATE < 1.0
+
+
+def test_short_pause_is_bridged_by_hangover():
+    """A pause shorter than the hangover does not end the utterance."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE, hangover_ms=500)
+    events = run(endpointer, make_audio([(1.0, 1.8), (2.1, 3.0)]))
+    assert [event for event, _ in events] == [Endpointer.START, Endpointer.END]
+
+
+def test_noise_floor_adapts():
+    """The voicing threshold follows the background level."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE)
+    rng = np.random.default_rng(1)
+    
+    run(endpointer, rng.normal(0.0, 0.003, SAMPLE_RATE * 3).astype(np.float32))
+    quiet = endpointer.threshold
+    run(endpointer, rng.normal(0.0, 0.005, SAMPLE_RATE * 10).astype(np.float32))
+    
+    assert endpointer.threshold > quiet * 2
+    assert not endpointer.in_speech
+
+
+def test_step_in_noise_does_not_hold_capture_open():
+    """Noise that jumps far above the floor ends capture within the noise window."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE, noise_window_ms=4000)
+    rng = np.random.default_rng(2)
+    quiet = rng.normal(0.0, 0.003, SAMPLE_RATE * 3)
+    fan = rng.normal(0.0, 0.03, SAMPLE_RATE * 8)
+    events = run(endpointer, np.concatenate([quiet, fan]).astype(np.float32))
+    
+    # The louder noise looks like speech at first, but not for long
+    assert [event for event, _ in events] == [Endpointer.START, Endpointer.END]
+    assert events[1][1] / SAMPLE_RATE < 3 + 4.5 + 0.5
+    assert endpointer.threshold > frame_energy(fan)
+    
+    # Speech over the new background is still detected
+    burst = make_audio([(1.0, 2.0)], seed=3) + rng.normal(0.0, 0.03, SAMPLE_RATE * 3).astype(np.float32)
+    assert [event for event, _ in run(endpointer, burst)] == [Endpointer.START, Endpointer.END]
+
+
+def test_pre_roll_and_int16_blocks():
+    """Integer PCM works, and pre-roll blocks cover the configured time."""
+    endpointer = Endpointer(sample_rate=SAMPLE_RATE, pre_roll_ms=300)
+    audio = (make_audio([(1.0, 2.0)]) * 32767).astype(np.int16)
+    assert frame_energy(audio[:BLOCK]) == pytest.approx(frame_energy(audio[:BLOCK] / 32768.0), rel=1e-4)
+    
+    for i in range(0, len(audio), BLOCK):
+        if endpointer.process(audio[i:i + BLOCK]) == Endpointer.START:
+            break
+    
+    frames = endpointer.pre_roll_frames()
+    assert sum(len(frame) for frame in frames) >= 0.3 * SAMPLE_RATE
+    
+    # The window holds a bounded number of blocks however long the stream
+    assert len(endpointer.window) <= 0.3 * SAMPLE_RATE / BLOCK + 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
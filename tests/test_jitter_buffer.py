@@ -0,0 +1,82 @@
+"""Test suite for the playback jitter buffer."""
+
+import numpy as np
+import pytest
+from utils.jitter_buffer import JitterBuffer
+
+
+def pcm(start, count):
+    """int16 PCM bytes counting up from ``start``."""
+    return np.arange(start, start + count, dtype=np.int16).tobytes()
+
+
+def play(buffer, blocks, size=64):
+    """Run the output callback for a number of blocks and collect what it played."""
+    out = np.empty((size, buffer.channels), dtype=np.float32)
+    played = []
+    for _ in range(blocks):
+        buffer.read_into(out)
+        played.append(out[:, 0].copy())
+    return np.round(np.concatenate(played) * 32768).astype(int)
+
+
+def test_clips_play_gaplessly_across_odd_chunk_boundaries():
+    """PCM cut mid-sample is realigned and consecutive clips play back to back."""
+    buffer = JitterBuffer(sample_rate=8000, target_ms=10)
+    data = pcm(1, 300)
+    for offset in range(0, len(data), 37):
+        buffer.append(data[offset:offset + 37])
+    end = buffer.append(pcm(301, 100))
+    buffer.mark_end()
+    
+    assert end == 400
+    samples = play(buffer, 8)
+    assert np.array_equal(samples[:400], np.arange(1, 401))
+    assert not samples[400:].any()
+    assert buffer.played == 400
+    assert buffer.underruns == 0
+
+
+def test_waits_for_target_depth_and_counts_underruns():
+    """Playback starts at the target depth; running dry mid-stream is an underrun."""
+    buffer = JitterBuffer(sample_rate=8000, target_ms=20)  # 160 frames
+    buffer.append(pcm(1, 100))
+    assert not play(buffer, 1).any()
+    
+    buffer.append(pcm(101, 100))
+    samples = play(buffer, 4)
+    assert np.array_equal(samples[:200], np.arange(1, 201))
+    assert buffer.underruns == 1
+    assert buffer.underrun_frames == 56
+    
+    # Once the producer says it is done, short audio plays out without counting
+    buffer.append(pcm(201, 10))
+    buffer.mark_end()
+    assert np.array_equal(play(buffer, 1)[:10], np.arange(201, 211))
+    assert buffer.underruns == 1
+
+
+def test_flush_silences_queued_audio_at_the_next_block():
+    """A flush takes effect at the next block and records the exact cut position."""
+    buffer = JitterBuffer(sample_rate=8000, target_ms=0)
+    end = buffer.append(pcm(1, 500))
+    play(buffer, 1)
+    generation = buffer.flush()
+    assert buffer.applied_generation < generation
+    
+    assert not play(buffer, 2).any()
+    assert buffer.applied_generation == generation
+    assert buffer.cut_position == 64
+    assert buffer.played == end
+    assert buffer.buffered == 0
+    
+    # Flushing an idle buffer cuts at the current position
+    buffer.append(pcm(1, 10))
+    play(buffer, 1)
+    buffer.flush()
+    play(buffer, 1)
+    assert buffer.cut_position == end + 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
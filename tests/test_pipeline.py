@@ -0,0 +1,231 @@
+"""Test suite for concurrent TTS synthesis and the staged speech pipeline."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import config
+from providers.tts import SAMPLE_RATE, LocalTTSBackend
+
+SENTENCES = ["First one here.", "Second one.", "Third one.", "Fourth one.", "Fifth one."]
+
+
+class TrackingBackend(LocalTTSBackend):
+    """Local backend whose earlier requests answer later, recording overlap and abandoned streams."""
+    
+    def __init__(self, delays, **options):
+        super().__init__(chunk_bytes=2400, **options)
+        self.delays = delays
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.abandoned = []
+    
+    def _stream(self, text):
+        with self.lock:
+            delay = self.delays[len(self.calls) % len(self.delays)]
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        finished = False
+        try:
+            time.sleep(delay)
+            yield from super()._stream(text)
+            finished = True
+        finally:
+            with self.lock:
+                self.active -= 1
+                if not finished:
+                    self.abandoned.append(text)
+
+
+class FakeOutput:
+    """Audio output that plays instantly, recording what was queued and stopped."""
+    
+    def __init__(self):
+        self.speed = 1.0
+        self.frames = 0
+        self.labels = []
+        self.stopped = []
+        self.played_after_stop = 0
+        self.release = threading.Event()
+        self.release.set()
+    
+    @property
+    def played_seconds(self):
+        return self.frames / SAMPLE_RATE
+    
+    def play_audio(self, chunk, final=True, label=None):
+        if self.stopped:
+            self.played_after_stop += 1
+        if not self.labels or self.labels[-1] != label:
+            self.labels.append(label)
+        self.frames += len(chunk) // 2
+        return self.frames
+    
+    def finish_stream(self):
+        pass
+    
+    def wait_until_done(self, position=None):
+        self.release.wait()
+    
+    def stop(self):
+        self.stopped.append(self.frames)
+        # Like the real output, a stop ends waits for playback
+        self.release.set()
+        return f"stopped at {self.frames}"
+
+
+@pytest.fixture
+def speech(monkeypatch, load_module):
+    """Short segments, no TTS cache, and the speech modules loaded."""
+    monkeypatch.setattr(config, "SEGMENT_FIRST_MIN_CHARS", 5)
+    monkeypatch.setattr(config, "SEGMENT_MIN_CHARS", 5)
+    monkeypatch.setattr(config, "TTS_PROVIDER", "local")
+    monkeypatch.setattr(config, "TTS_FALLBACK_PROVIDER", None)
+    monkeypatch.setattr(config, "TTS_CACHE", False)
+    monkeypatch.setattr(config, "TTS_CONCURRENCY", 3)
+    return load_module("speech/tts.py"), load_module("speech/pipeline.py")
+
+
+def tokens(sentences):
+    """Word-by-word tokens for a list of sentences."""
+    return iter([word + " " for word in " ".join(sentences).split()])
+
+
+def make_pipeline(speech, backend, output, **options):
+    """A SpeechPipeline over a TextToSpeech using ``backend``, requesting as early as its limits allow."""
+    tts_module, pipeline_module = speech
+    tts = tts_module.TextToSpeech()
+    tts.backend = backend
+    pipeline = pipeline_module.SpeechPipeline(tts, output, **options)
+    # Output plays instantly here, so just-in-time scheduling would never overlap requests
+    pipeline.scheduler.margin = 60.0
+    return pipeline
+
+
+def test_pipeline_plays_in_order_with_concurrent_synthesis(speech):
+    """Later sentences synthesize alongside earlier ones but play strictly in order."""
+    backend = TrackingBackend([0.3, 0.1, 0.0])
+    output = FakeOutput()
+    pipeline = make_pipeline(speech, backend, output, lookahead=4, concurrency=3)
+    
+    text = asyncio.run(pipeline.run(tokens(SENTENCES)))
+    assert text.split() == " ".join(SENTENCES).split()
+    assert output.labels == SENTENCES
+    assert sorted(backend.calls) == sorted(SENTENCES)
+    assert 1 < backend.peak <= 3
+    assert output.frames == sum(len(b"".join(LocalTTSBackend().stream(s))) // 2 for s in SENTENCES)
+
+
+def test_pipeline_bounds_work_ahead_of_playback(speech):
+    """While playback is stuck, the bounded queues stop synthesis running ahead."""
+    backend = TrackingBackend([0.0])
+    output = FakeOutput()
+    output.release.clear()
+    pipeline = make_pipeline(speech, backend, output, lookahead=1, concurrency=3)
+    sentences = [f"Sentence number {n}." for n in range(10)]
+    
+    async def scenario():
+        task = asyncio.ensure_future(pipeline.run(tokens(sentences)))
+        await asyncio.sleep(0.5)
+        requested = len(backend.calls)
+        output.release.set()
+        await task
+        return requested
+    
+    # Two sentences with the playback stage and one queued for it; the
+    # rest wait in the sentence queue and the segmenter
+    assert asyncio.run(scenario()) <= 3
+    assert output.labels == sentences
+
+
+def test_cancelling_the_turn_stops_playback(speech):
+    """Barge-in: cancelling the task running the pipeline stops output and abandons synthesis."""
+    backend = TrackingBackend([0.0], chunk_interval=0.05)
+    output = FakeOutput()
+    pipeline = make_pipeline(speech, backend, output, lookahead=3, concurrency=3)
+    
+    async def turn():
+        await pipeline.run(tokens(SENTENCES))
+    
+    async def scenario():
+        task = asyncio.ensure_future(turn())
+        while not output.frames:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+    
+    asyncio.run(scenario())
+    assert len(output.stopped) == 1
+    assert pipeline.last_interrupt == f"stopped at {output.stopped[0]}"
+    assert output.played_after_stop == 0
+    assert backend.active == 0 and backend.abandoned
+    assert len(output.labels) < len(SENTENCES)
+
+
+def test_stop_does_not_queue_behind_busy_workers(speech):
+    """Barge-in stops output even when every default executor worker is waiting on playback."""
+    backend = TrackingBackend([0.0])
+    output = FakeOutput()
+    output.release.clear()
+    pipeline = make_pipeline(speech, backend, output, lookahead=3, concurrency=1)
+    
+    async def scenario():
+        # The only worker ends up in wait_until_done, which returns once output is stopped
+        asyncio.get_event_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        task = asyncio.ensure_future(pipeline.run(tokens(SENTENCES)))
+        while len(output.labels) < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 2.0)
+    
+    asyncio.run(scenario())
+    assert len(output.stopped) == 1
+
+
+def test_failed_synthesis_plays_what_arrived_without_calibrating(speech, capsys):
+    """A clip cut short by a TTS error is played but not used to learn the speaking rate."""
+    backend = LocalTTSBackend(chunk_bytes=2400, fail_after=2)
+    output = FakeOutput()
+    pipeline = make_pipeline(speech, backend, output, lookahead=2, concurrency=1)
+    
+    asyncio.run(pipeline.run(tokens(SENTENCES[:2])))
+    # Two chunks of 1200 samples from each sentence
+    assert output.frames == 2 * 2 * 1200
+    assert output.labels == SENTENCES[:2]
+    assert pipeline.rate_model.get_stats() == {}
+    assert capsys.readouterr().out.count("TTS error:") == 2
+
+
+def test_synthesize_streaming_yields_audio_in_order(speech):
+    """Concurrent requests are reassembled in segment order."""
+    tts = speech[0].TextToSpeech()
+    tts.backend = TrackingBackend([0.3, 0.1, 0.0])
+    
+    audio = b"".join(tts.synthesize_streaming(tokens(SENTENCES)))
+    assert audio == b"".join(b"".join(LocalTTSBackend().stream(s)) for s in SENTENCES)
+    assert 1 < tts.backend.peak <= config.TTS_CONCURRENCY
+
+
+def test_closing_synthesize_streaming_abandons_requests(speech):
+    """Closing the generator stops every request still in flight."""
+    tts = speech[0].TextToSpeech()
+    tts.backend = TrackingBackend([0.0], chunk_interval=0.05)
+    
+    stream = tts.synthesize_streaming(tokens(SENTENCES))
+    assert next(stream)
+    stream.close()
+    time.sleep(0.2)
+    assert tts.backend.active == 0
+    assert tts.backend.abandoned
+    assert len(tts.backend.calls) <= config.TTS_CONCURRENCY
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,43 @@
+"""Test suite for the per-provider rate limiter."""
+
+import pytest
+from utils.rate_limit import RateLimiter
+
+
+class FakeTime:
+    """Clock that only advances when slept on."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def clock(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_burst_then_steady_rate():
+    """A full bucket allows a burst, then requests are spaced at the rate."""
+    fake = FakeTime()
+    limiter = RateLimiter(rate=2.0, burst=3, clock=fake.clock, sleep=fake.sleep)
+    
+    waits = [limiter.acquire("openai") for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.5)
+    assert fake.now == pytest.approx(1.0)
+
+
+def test_buckets_are_per_provider():
+    """One provider's usage does not slow another down."""
+    fake = FakeTime()
+    limiter = RateLimiter(rate=1.0, burst=1, clock=fake.clock, sleep=fake.sleep)
+    
+    limiter.acquire("openai")
+    assert limiter.acquire("local") == 0.0
+    assert limiter.acquire("openai", tokens=2) == pytest.approx(2.0)
+    assert limiter.waited == {"openai": pytest.approx(2.0), "local": 0.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
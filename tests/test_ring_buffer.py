@@ -0,0 +1,137 @@
+"""Test suite for preallocated recording buffers."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from utils.ring_buffer import CallbackStats, RecordingBuffer, SPSCRingBuffer
+
+
+def blocks(count, size, channels=1):
+    """Generate numbered blocks of audio frames."""
+    for i in range(count):
+        start = i * size
+        yield np.arange(start, start + size, dtype=np.float32).reshape(-1, 1).repeat(channels, axis=1)
+
+
+def test_view_is_zero_copy():
+    """Recorded audio is returned without copying the storage."""
+    buffer = RecordingBuffer(1024)
+    for block in blocks(4, 256):
+        buffer.write(block)
+    
+    view = buffer.view()
+    assert view.shape == (1024, 1)
+    assert np.shares_memory(view, buffer.storage)
+    assert np.array_equal(view[:, 0], np.arange(1024))
+
+
+def test_grows_when_unbounded():
+    """Without a maximum the buffer grows and keeps every frame."""
+    buffer = RecordingBuffer(100, channels=2)
+    for block in blocks(10, 64, channels=2):
+        buffer.write(block)
+    
+    assert buffer.capacity >= 640
+    assert buffer.overflow_frames == 0
+    assert np.array_equal(buffer.view()[:, 1], np.arange(640))
+
+
+def test_ring_keeps_latest_audio():
+    """With a maximum duration the oldest frames are overwritten and counted."""
+    buffer = RecordingBuffer(100, max_frames=300)
+    for block in blocks(5, 100):
+        buffer.write(block)
+    
+    assert buffer.capacity == 300
+    assert buffer.overflow_frames == 200
+    assert buffer.overflow_events == 2
+    assert np.array_equal(buffer.view()[:, 0], np.arange(200, 500))
+    
+    # Blocks larger than the ring keep only their newest frames
+    buffer.write(np.arange(1000, 1400, dtype=np.float32))
+    assert buffer.overflow_frames == 600
+    assert np.array_equal(buffer.view()[:, 0], np.arange(1100, 1400))
+
+
+def test_read_since_returns_new_frames():
+    """Incremental reads see each frame once."""
+    buffer = RecordingBuffer(50, max_frames=200)
+    position = 0
+    received = []
+    for block in blocks(8, 30):
+        buffer.write(block)
+        chunk, position = buffer.read_since(position)
+        received.append(chunk[:, 0].copy())
+    
+    assert np.array_equal(np.concatenate(received), np.arange(240))
+    assert np.array_equal(buffer.tail(10)[:, 0], np.arange(230, 240))
+
+
+
+def test_spsc_wraps_and_drops_when_full():
+    """The handoff ring wraps around and drops whole blocks it cannot fit."""
+    ring = SPSCRingBuffer(100)
+    assert ring.write(np.arange(60, dtype=np.float32))
+    assert np.array_equal(ring.read(50)[:, 0], np.arange(50))
+    
+    # Wraps past the end of the storage
+    assert ring.write(np.arange(60, 120, dtype=np.float32))
+    assert ring.available == 70
+    
+    # No room for another 40 frames until the reader catches up
+    assert not ring.write(np.zeros(40, dtype=np.float32))
+    assert ring.dropped_frames == 40 and ring.dropped_blocks == 1
+    assert np.array_equal(ring.read()[:, 0], np.arange(50, 120))
+    assert ring.available == 0 and len(ring.read()) == 0
+
+
+def test_spsc_handoff_between_threads():
+    """Frames cross from a producer thread to a consumer thread intact and in order."""
+    ring = SPSCRingBuffer(512, channels=2)
+    total = 64 * 200
+    
+    def produce():
+        for block in blocks(200, 64, channels=2):
+            while not ring.write(block):
+                time.sleep(0.0005)
+    
+    producer = threading.Thread(target=produce)
+    producer.start()
+    received = []
+    count = 0
+    while count < total:
+        chunk = ring.read()
+        count += len(chunk)
+        received.append(chunk)
+    producer.join()
+    
+    audio = np.concatenate(received)
+    assert np.array_equal(audio[:, 0], np.arange(total))
+    assert np.array_equal(audio[:, 1], np.arange(total))
+
+
+def test_callback_stats_counts_flags_and_late_callbacks():
+    """Callback statistics count status flags and callbacks slower than their block."""
+    class Flags:
+        input_overflow = True
+        
+        def __bool__(self):
+            return True
+    
+    stats = CallbackStats(16000)
+    stats.record(160, time.perf_counter())
+    stats.record(160, time.perf_counter(), Flags())
+    stats.record(16, time.perf_counter() - 0.01)
+    
+    result = stats.as_dict()
+    assert result['callbacks'] == 3
+    assert result['input_overflow'] == 1
+    assert result['input_underflow'] == 0
+    assert result['late_callbacks'] == 1
+    assert result['max_callback_ms'] >= 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+"""Test suite for just-in-time TTS scheduling."""
+import pytest
+
+from utils.scheduler import SpeakingRateModel, SynthesisScheduler
+
+
+def test_rate_model_calibrates_per_voice_and_speed():
+    """Observed clip lengths replace the default rate, and scale to other speeds."""
+    model = SpeakingRateModel(words_per_minute=150, smoothing=0.5)
+    assert model.estimate("one two three four five", "alloy") == pytest.approx(2.0)
+    assert model.words_per_minute("alloy", 1.5) == pytest.approx(225)
+    
+    # 10 words in 3 seconds is 200 words per minute
+    model.observe("a b c d e f g h i j", "alloy", 1.0, 3.0)
+    assert model.words_per_minute("alloy", 1.0) == pytest.approx(200)
+    assert model.words_per_minute("alloy", 2.0) == pytest.approx(400)
+    assert model.words_per_minute("nova", 1.0) == pytest.approx(150)
+    
+    # Later clips move the estimate part of the way
+    model.observe("a b c d e f g h i j", "alloy", 1.0, 6.0)
+    assert model.words_per_minute("alloy", 1.0) == pytest.approx(150)
+    assert model.get_stats()["alloy@1"]['clips'] == 2
+
+
+def test_scheduler_starts_next_segment_just_in_time(clock):
+    """The next request waits until the unplayed speech falls to the lead time."""
+    scheduler = SynthesisScheduler(
+        SpeakingRateModel(words_per_minute=120), "alloy",
+        first_audio=0.5, margin=0.5, smoothing=1.0, clock=clock
+    )
+    scheduler.reset(played=10.0)
+    assert scheduler.delay(played=10.0) == 0
+    
+    # Eight words estimated at 4 seconds
+    segment = scheduler.start("one two three four five six seven eight")
+    assert scheduler.delay(played=10.0) == pytest.approx(3.0)
+    
+    # Audio arrives after 0.3 s, and turns out to be 3 seconds long
+    clock.now = 0.3
+    scheduler.received(segment, 2.0)
+    assert scheduler.first_audio == pytest.approx(0.3)
+    scheduler.received(segment, 1.0)
+    scheduler.finish(segment)
+    assert scheduler.queued_seconds() == pytest.approx(3.0)
+    
+    # With 1.5 s played, 1.5 s remain against a lead time of 0.8 s
+    assert scheduler.delay(played=11.5) == pytest.approx(0.7)
+    assert scheduler.delay(played=12.5) == 0
+    
+    # The finished clip calibrated the model: 8 words in 3 seconds
+    assert scheduler.model.words_per_minute("alloy") == pytest.approx(160)
+
+
+def test_abandoned_segment_does_not_calibrate():
+    """Audio cut short by an interrupt is not used as a speaking-rate sample."""
+    model = SpeakingRateModel()
+    scheduler = SynthesisScheduler(model, "alloy")
+    segment = scheduler.start("this sentence was interrupted halfway")
+    scheduler.received(segment, 0.4)
+    scheduler.finish(segment, complete=False)
+    assert model.get_stats() == {}
+
+
+def test_cached_audio_does_not_calibrate_first_audio(clock):
+    """A clip served from the cache arrives at once and leaves the first-audio estimate alone."""
+    scheduler = SynthesisScheduler(SpeakingRateModel(), "alloy", first_audio=0.5, smoothing=1.0, clock=clock)
+    segment = scheduler.start("a sentence that was cached earlier")
+    scheduler.received(segment, 2.0, calibrate=False)
+    scheduler.finish(segment)
+    assert scheduler.first_audio == pytest.approx(0.5)
+    assert scheduler.queued_seconds() == pytest.approx(2.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
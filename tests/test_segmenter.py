@@ -0,0 +1,91 @@
+"""Test suite for the streaming sentence segmenter."""
+
+import pytest
+from utils.helpers import chunk_text, find_sentence_ends
+from utils.segmenter import SentenceSegmenter
+
+
+def stream(segmenter, text, clock=None, interval=0.0):
+    """Feed text word by word and collect every segment."""
+    segments = []
+    for i, word in enumerate(text.split(" ")):
+        if clock:
+            clock.now += interval
+        segments += segmenter.push(word if i == 0 else " " + word)
+    return segments + segmenter.flush()
+
+
+def test_abbreviations_and_decimals_do_not_split():
+    """Test that abbreviations and decimals are not sentence ends."""
+    text = "Dr. Smith paid 3.5 dollars. Then he left."
+    ends = find_sentence_ends(text)
+    
+    assert [text[:end] for end in ends] == [
+        "Dr. Smith paid 3.5 dollars.",
+        "Dr. Smith paid 3.5 dollars. Then he left."
+    ]
+
+
+def test_trailing_digit_period_waits_for_more_text():
+    """Test that '3.' at the end of the buffer is not a boundary yet."""
+    assert find_sentence_ends("The answer is 3.") == []
+    assert find_sentence_ends("The answer is 3. Done") == [16]
+
+
+def test_ordinary_words_end_sentences():
+    """Words that only look like abbreviations ("no", "co") still end a sentence."""
+    assert find_sentence_ends("The answer is no. Let us move on.") == [17, 33]
+    assert find_sentence_ends("Ask Dr. Lee. It is a co-op.") == [12, 27]
+
+
+def test_chunk_text_splits_long_sentences_at_words():
+    """Test that chunk_text respects max_length."""
+    chunks = chunk_text("one two three four five six seven eight", max_length=10)
+    
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert " ".join(chunks) == "one two three four five six seven eight"
+
+
+def test_first_segment_is_short_clause():
+    """Test that the first segment is cut at an early clause."""
+    segmenter = SentenceSegmenter(first_min_chars=10, min_chars=60, max_chars=250)
+    segments = stream(segmenter, "Well, that is a great question, and the answer is long. It goes on.")
+    
+    assert segments[0] == "Well, that is a great question,"
+    assert segments[1:] == ["and the answer is long. It goes on."]
+
+
+def test_later_segments_pack_sentences():
+    """Test that later segments group whole sentences."""
+    segmenter = SentenceSegmenter(first_min_chars=5, min_chars=40, max_chars=250)
+    text = "Hello there. One two. Three four. Five six seven eight nine. Ten."
+    segments = stream(segmenter, text)
+    
+    assert segments[0] == "Hello there."
+    assert segments[1] == "One two. Three four. Five six seven eight nine."
+    assert " ".join(segments) == text
+
+
+def test_max_chars_is_enforced():
+    """Test that text without boundaries is split at max_chars."""
+    segmenter = SentenceSegmenter(max_chars=30)
+    segments = stream(segmenter, "word " * 40)
+    
+    assert len(segments) > 1
+    assert all(len(segment) <= 30 for segment in segments)
+
+
+def test_deadline_cuts_pending_text(clock):
+    """Test that pending text is released once the deadline passes."""
+    segmenter = SentenceSegmenter(deadline=0.5, clock=clock)
+    
+    assert segmenter.push("I think that") == []
+    assert segmenter.time_to_deadline() == pytest.approx(0.5)
+    
+    clock.now = 0.6
+    assert segmenter.poll() == ["I think"]
+    assert segmenter.flush() == ["that"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
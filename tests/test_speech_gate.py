@@ -0,0 +1,129 @@
+"""Test suite for the local speech-presence gate and segmented transcription helpers."""
+
+import time
+
+import numpy as np
+import pytest
+from utils.helpers import merge_transcripts
+from utils.speech_gate import SpeechGate
+
+SAMPLE_RATE = 16000
+
+
+def recording(seconds, speech=None, noise=0.002, seed=0):
+    """Background noise with an optional voiced burst at (start, end) seconds."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = rng.normal(0.0, noise, len(t))
+    if speech:
+        start, end = speech
+        mask = (t >= start) & (t < end)
+        phase = 2 * np.pi * np.cumsum(130 + 15 * np.sin(2 * np.pi * t[mask])) / SAMPLE_RATE
+        audio[mask] += 0.1 * sum(np.sin(k * phase) / k for k in range(1, 8))
+    return audio.astype(np.float32).reshape(-1, 1)
+
+
+def test_rejects_silence_and_taps():
+    """Silent recordings and a key click are not sent for transcription."""
+    gate = SpeechGate(SAMPLE_RATE)
+    
+    assert not gate.check(np.zeros((SAMPLE_RATE, 1), dtype=np.float32)).has_speech
+    assert not gate.check(recording(2.0)).has_speech
+    
+    click = recording(0.4)
+    click[3000:3100] += 0.8
+    assert gate.trim(click) is None
+    
+    stats = gate.get_stats()
+    assert stats['calls_saved'] == 3
+    assert stats['seconds_saved'] == pytest.approx(3.4)
+
+
+def test_streamed_recordings_save_nothing():
+    """Skipping or trimming audio that was already uploaded is not counted as saved."""
+    gate = SpeechGate(SAMPLE_RATE)
+    
+    assert gate.trim(recording(2.0), streamed=True) is None
+    assert gate.trim(recording(3.0, speech=(1.0, 2.0)), streamed=True) is not None
+    
+    stats = gate.get_stats()
+    assert stats['checked'] == 2
+    assert stats['seconds_checked'] == pytest.approx(5.0)
+    assert stats['calls_saved'] == 0
+    assert stats['seconds_saved'] == 0.0
+
+
+def test_trims_to_speech_with_padding():
+    """Leading and trailing silence are cut, keeping a little padding."""
+    gate = SpeechGate(SAMPLE_RATE, padding_seconds=0.2)
+    audio = recording(5.0, speech=(1.5, 3.0))
+    
+    result = gate.check(audio)
+    assert result.has_speech
+    assert 1.2 <= result.start / SAMPLE_RATE <= 1.35
+    assert 3.15 <= result.end / SAMPLE_RATE <= 3.3
+    
+    trimmed = gate.trim(audio)
+    assert np.shares_memory(trimmed, audio)
+    assert gate.get_stats()['seconds_trimmed'] > 6.0
+
+
+def test_is_fast():
+    """Checking a long recording costs far less than a network round trip."""
+    gate = SpeechGate(SAMPLE_RATE)
+    audio = recording(30.0, speech=(2.0, 25.0))
+    
+    started = time.perf_counter()
+    assert gate.check(audio).has_speech
+    assert time.perf_counter() - started < 0.1
+
+
+def test_accepts_continuous_speech():
+    """A recording that is speech from end to end is kept whole."""
+    gate = SpeechGate(SAMPLE_RATE, padding_seconds=0.2)
+    audio = recording(4.0, speech=(0.0, 4.0))
+    
+    result = gate.check(audio)
+    assert result.has_speech
+    assert result.voiced_seconds > 3.5
+    assert result.start == 0 and result.end == len(audio)
+
+
+def test_split_cuts_long_recordings_at_pauses():
+    """Long recordings are split inside pauses, without overlap."""
+    gate = SpeechGate(SAMPLE_RATE)
+    audio = recording(35.0, speech=(0.5, 34.5))
+    # Pauses at 9-9.6 s and 22-22.6 s
+    audio[9 * SAMPLE_RATE:int(9.6 * SAMPLE_RATE)] = 0.001
+    audio[22 * SAMPLE_RATE:int(22.6 * SAMPLE_RATE)] = 0.001
+    
+    segments = gate.split(audio, max_seconds=15.0)
+    cuts = [end / SAMPLE_RATE for _, end in segments[:-1]]
+    assert len(cuts) == 2
+    assert 9.0 <= cuts[0] <= 9.6 and 22.0 <= cuts[1] <= 22.6
+    assert all(a[1] == b[0] for a, b in zip(segments, segments[1:]))
+    assert segments[-1][1] == len(audio)
+    assert all(end - start <= 15 * SAMPLE_RATE for start, end in segments)
+
+
+def test_split_overlaps_without_pauses():
+    """Continuous audio is cut at the limit with overlapping segments."""
+    gate = SpeechGate(SAMPLE_RATE)
+    audio = recording(20.0, speech=(0.0, 20.0))
+    
+    segments = gate.split(audio, max_seconds=8.0, overlap_seconds=0.5)
+    assert segments[0] == (0, 8 * SAMPLE_RATE)
+    assert segments[1][0] == int(7.5 * SAMPLE_RATE)
+    assert gate.split(audio[:SAMPLE_RATE], max_seconds=8.0) == [(0, SAMPLE_RATE)]
+
+
+def test_merge_transcripts_drops_repeated_words():
+    """Words transcribed twice in an overlap appear once."""
+    assert merge_transcripts(["So the main idea is", "Idea is that we ship today."]) == \
+        "So the main idea is that we ship today."
+    assert merge_transcripts(["One two.", "Three four."]) == "One two. Three four."
+    assert merge_transcripts(["", "Hello.", ""]) == "Hello."
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
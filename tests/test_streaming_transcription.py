@@ -0,0 +1,106 @@
+"""Test suite for streaming transcription uploads against a local endpoint."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import numpy as np
+import pytest
+from providers.transcription import StreamingTranscription
+from utils.metrics import metrics
+
+
+class TranscriptionHandler(BaseHTTPRequestHandler):
+    """Stand-in for /audio/transcriptions that reads a chunked multipart body."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_POST(self):
+        body = b""
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                break
+            body += self.rfile.read(size)
+            self.rfile.readline()
+            self.server.received = len(body)
+        
+        boundary = self.headers['Content-Type'].split('boundary=')[1].encode()
+        parts = body.split(b'--' + boundary)
+        fields = {}
+        for part in parts[1:-1]:
+            head, _, value = part.partition(b'\r\n\r\n')
+            name = head.split(b'name="')[1].split(b'"')[0].decode()
+            fields[name] = value[:-2]
+        
+        wav = fields['file']
+        samples = np.frombuffer(wav[44:], dtype=np.int16)
+        self.server.fields = fields
+        
+        payload = json.dumps({'text': f" {fields['model'].decode()} {len(samples)} "}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Run the stand-in endpoint on a free local port."""
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), TranscriptionHandler)
+    httpd.daemon_threads = True
+    httpd.received = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def test_audio_is_uploaded_before_finish(server):
+    """Test that chunks reach the endpoint while recording continues."""
+    client = httpx.Client()
+    latency = metrics.histogram("stt.openai.latency").count
+    stream = StreamingTranscription(
+        client, "test-key", base_url=f"http://127.0.0.1:{server.server_port}/v1"
+    ).start()
+    
+    stream.feed(np.zeros(1024, dtype=np.float32))
+    stream.feed(np.full(1024, 0.5, dtype=np.float32))
+    
+    # The first chunks arrive without finishing the request
+    deadline = time.monotonic() + 5
+    while server.received < 2048 * 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.received >= 2048 * 2
+    
+    stream.feed(np.zeros(512, dtype=np.int16))
+    assert stream.finish() == "whisper-1 2560"
+    assert server.fields['language'] == b'en'
+    assert stream.bytes_sent == 2560 * 2
+    assert metrics.histogram("stt.openai.latency").count == latency + 1
+    client.close()
+
+
+def test_failed_upload_returns_none():
+    """Test that an unreachable endpoint reports failure instead of text."""
+    client = httpx.Client()
+    requests = metrics.counter("stt.local.requests").value
+    errors = metrics.counter("stt.local.errors").value
+    stream = StreamingTranscription(client, None, base_url="http://127.0.0.1:1/v1", backend="local").start()
+    stream.feed(np.zeros(160, dtype=np.float32))
+    
+    assert stream.finish() is None
+    assert metrics.counter("stt.local.requests").value == requests + 1
+    assert metrics.counter("stt.local.errors").value == errors + 1
+    client.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,157 @@
+"""Test suite for the STT backend registry."""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import config
+import providers.stt as stt_module
+from providers.stt import (
+    BackendRegistry, Capabilities, LocalWhisperBackend, OpenAIWhisperBackend,
+    StubBackend, STTBackend, stt_backends
+)
+from utils.metrics import metrics
+from utils.wav import encode_wav
+
+
+def one_second():
+    """One second of silence as an uploadable WAV file."""
+    return encode_wav(np.zeros(16000, dtype=np.float32), 16000)
+
+
+def test_stub_is_deterministic_and_measured():
+    """The stub answers from the audio alone and records latency metrics."""
+    backend = stt_backends.create("stub")
+    before = metrics.histogram("stt.stub.latency").count
+    
+    assert backend.transcribe(one_second(), "en") == "[1.00 seconds of audio]"
+    assert backend.transcribe(one_second(), "en") == "[1.00 seconds of audio]"
+    assert backend.calls == [(1.0, "en"), (1.0, "en")]
+    assert metrics.histogram("stt.stub.latency").count == before + 2
+    
+    fixed = stt_backends.create("stub", text="hello there")
+    assert fixed.transcribe(one_second()) == "hello there"
+
+
+def test_selection_by_capability():
+    """Backends are chosen by name first, then by capability."""
+    registry = BackendRegistry()
+    registry.register(LocalWhisperBackend)
+    registry.register(OpenAIWhisperBackend)
+    registry.register(StubBackend)
+    
+    @registry.register
+    class FrenchOnly(STTBackend):
+        name = "french"
+        capabilities = Capabilities(streaming=False, batch=True, languages=frozenset({"fr"}))
+        
+        def _transcribe(self, audio_file, language):
+            return "bonjour"
+    
+    assert isinstance(registry.create("french", language="fr"), FrenchOnly)
+    assert isinstance(registry.create("french", language="en", api_key="test"), OpenAIWhisperBackend)
+    assert isinstance(registry.create(streaming=True, api_key="test"), OpenAIWhisperBackend)
+    
+    # Options only reach backends that accept them
+    openai = registry.create("openai", api_key="test", model="whisper-large", text="ignored")
+    assert openai.model == "whisper-large"
+
+
+def test_unavailable_backend():
+    """The CPU slot is skipped without its model package, unless fallback is off."""
+    registry = BackendRegistry()
+    registry.register(LocalWhisperBackend)
+    registry.register(StubBackend)
+    
+    if LocalWhisperBackend().available():
+        pytest.skip("faster-whisper is installed")
+    
+    with pytest.raises(ValueError):
+        registry.create("local", fallback=False)
+    with pytest.raises(ValueError):
+        # The stub is never picked implicitly
+        registry.create("local")
+
+
+def test_local_model_loads_once_under_concurrency(monkeypatch):
+    """Segments transcribed in parallel share one model load."""
+    loads = []
+    
+    class SlowModel:
+        """Stands in for faster-whisper's model, taking a while to load."""
+        
+        def __init__(self, *args, **kwargs):
+            loads.append(args)
+            time.sleep(0.1)
+        
+        def transcribe(self, audio, language=None):
+            return [SimpleNamespace(text=" hello ")], None
+    
+    monkeypatch.setattr(stt_module, "WhisperModel", SlowModel)
+    backend = LocalWhisperBackend()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(lambda _: backend.transcribe(one_second(), "en"), range(4)))
+    
+    assert texts == ["hello"] * 4
+    assert loads == [("base.en",)]
+
+
+@pytest.fixture
+def speech_stt(monkeypatch, load_module):
+    """The speech.stt module, configured for the stub backend without a fallback."""
+    monkeypatch.setattr(config, "STT_BACKEND", "stub")
+    monkeypatch.setattr(config, "STT_FALLBACK_BACKEND", None)
+    return load_module("speech/stt.py")
+
+
+def test_failed_encoding_is_not_retried(speech_stt, capsys):
+    """An upload whose encoding failed yields no transcript, on either backend."""
+    stt = speech_stt.SpeechToText()
+    stt.fallback = StubBackend()
+    
+    failed = Future()
+    failed.set_exception(RuntimeError("encoder crashed"))
+    try:
+        assert stt.transcribe(np.zeros(16000, dtype=np.float32), [speech_stt.Upload(failed, False)]) == ""
+        assert stt.backend.calls == [] and stt.fallback.calls == []
+    finally:
+        stt.close()
+    assert capsys.readouterr().out == "Audio encoding error: encoder crashed\n"
+
+
+class FailingBackend(StubBackend):
+    """Stub whose requests always fail."""
+    
+    def _transcribe(self, audio_file, language):
+        raise ConnectionError("provider unreachable")
+
+
+def test_batch_callers_see_transcription_errors(speech_stt, capsys):
+    """With raise_errors, a failed request raises instead of reading as an empty transcript."""
+    stt = speech_stt.SpeechToText()
+    stt.backend = FailingBackend()
+    
+    def upload():
+        done = Future()
+        done.set_result(one_second())
+        return speech_stt.Upload(done, False)
+    
+    try:
+        assert stt.transcribe(None, [upload()]) == ""
+        with pytest.raises(ConnectionError):
+            stt.transcribe(None, [upload()], raise_errors=True)
+        
+        # Also after the fallback fails, and for segmented recordings
+        stt.fallback = FailingBackend()
+        with pytest.raises(ConnectionError):
+            stt.transcribe(None, [upload(), upload()], raise_errors=True)
+    finally:
+        stt.close()
+    assert capsys.readouterr().out.startswith("Transcription error: provider unreachable\n")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""Test suite for the background summarization worker."""
+import asyncio
+import threading
+
+import pytest
+
+from memory.summarizer import SummaryWorker
+
+
+class StubLLM:
+    """Summarizer that returns, fails or blocks according to the first message."""
+    
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+    
+    def generate_summary(self, messages):
+        self.calls.append(messages[0]['content'])
+        self.release.wait(timeout=5)
+        content = messages[0]['content']
+        if content == "fail":
+            raise RuntimeError("model unavailable")
+        if content == "empty":
+            return ""
+        return f"summary of {content}"
+
+
+class StubMemory:
+    """Records long-term context updates and saves."""
+    
+    def __init__(self):
+        self.contexts = []
+        self.saves = 0
+    
+    def update_long_term_context(self, summary):
+        self.contexts.append(summary)
+    
+    def save_memory(self):
+        self.saves += 1
+
+
+def message(content):
+    """One user message with the given content."""
+    return [{"role": "user", "content": content}]
+
+
+def test_summaries_update_memory_in_order():
+    """Submitted summaries are applied one at a time, in submission order."""
+    llm, memory = StubLLM(), StubMemory()
+    worker = SummaryWorker(llm, memory)
+    
+    async def scenario():
+        worker.start()
+        for content in ("first", "second", "third"):
+            worker.submit(message(content))
+        await worker.stop()
+    
+    asyncio.run(scenario())
+    
+    assert llm.calls == ["first", "second", "third"]
+    assert memory.contexts == ["summary of first", "summary of second", "summary of third"]
+    assert memory.saves == 3
+    
+    stats = worker.get_stats()
+    assert (stats['completed'], stats['failed'], stats['backlog']) == (3, 0, 0)
+    assert stats['max_latency'] >= stats['avg_latency'] > 0
+    assert worker.task is None
+
+
+def test_submit_does_not_wait_for_the_summary():
+    """Submitting returns immediately while the summary is still being generated."""
+    llm, memory = StubLLM(), StubMemory()
+    llm.release.clear()
+    worker = SummaryWorker(llm, memory)
+    
+    async def scenario():
+        worker.start()
+        worker.submit(message("first"))
+        worker.submit(message("second"))
+        await asyncio.sleep(0.05)
+        backlog = worker.get_stats()['backlog']
+        llm.release.set()
+        await worker.stop()
+        return backlog
+    
+    assert asyncio.run(scenario()) == 2
+    assert memory.contexts == ["summary of first", "summary of second"]
+
+
+def test_errors_and_empty_summaries_count_as_failed(capsys):
+    """A failing or empty summary leaves memory alone and the worker keeps going."""
+    llm, memory = StubLLM(), StubMemory()
+    worker = SummaryWorker(llm, memory)
+    
+    async def scenario():
+        worker.start()
+        for content in ("fail", "empty", "last"):
+            worker.submit(message(content))
+        await worker.stop()
+    
+    asyncio.run(scenario())
+    
+    assert memory.contexts == ["summary of last"]
+    assert memory.saves == 1
+    stats = worker.get_stats()
+    assert (stats['completed'], stats['failed']) == (1, 2)
+    assert "Summarization error: model unavailable" in capsys.readouterr().out
+
+
+def test_stop_drops_backlog_after_timeout(capsys):
+    """Stopping gives up on summaries that do not finish within the timeout."""
+    llm, memory = StubLLM(), StubMemory()
+    llm.release.clear()
+    worker = SummaryWorker(llm, memory)
+    
+    async def scenario():
+        worker.start()
+        worker.submit(message("first"))
+        worker.submit(message("second"))
+        await asyncio.sleep(0.05)
+        await worker.stop(timeout=0.1)
+        llm.release.set()
+    
+    asyncio.run(scenario())
+    
+    assert "Dropping 2 pending summaries" in capsys.readouterr().out
+    assert llm.calls == ["first"]
+    assert worker.task is None
+
+
+def test_stop_without_start():
+    """Stopping a worker that never started is a no-op."""
+    worker = SummaryWorker(StubLLM(), StubMemory())
+    asyncio.run(worker.stop())
+    assert worker.get_stats()['backlog'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
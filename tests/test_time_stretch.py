@@ -0,0 +1,62 @@
+"""Test suite for playback time-stretching."""
+import numpy as np
+import pytest
+
+from utils.time_stretch import TimeStretcher, time_stretch
+
+SAMPLE_RATE = 24000
+
+
+def tone(seconds: float, frequency: float = 220.0) -> np.ndarray:
+    """A steady sine tone at the TTS sample rate."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def peak_frequency(audio: np.ndarray) -> float:
+    """Frequency of the strongest spectral peak."""
+    spectrum = np.abs(np.fft.rfft(audio * np.hanning(len(audio))))
+    return np.argmax(spectrum) * SAMPLE_RATE / len(audio)
+
+
+@pytest.mark.parametrize("rate", [0.5, 0.8, 1.25, 2.0])
+def test_changes_duration_but_not_pitch(rate):
+    """Output length scales with 1/rate and the tone keeps its frequency."""
+    audio = tone(2.0)
+    stretched = time_stretch(audio, rate, SAMPLE_RATE)
+    
+    assert len(stretched) == round(len(audio) / rate)
+    assert peak_frequency(stretched[1000:-1000]) == pytest.approx(220.0, abs=2.0)
+    assert np.abs(stretched[1000:-1000]).max() == pytest.approx(0.5, abs=0.02)
+
+
+def test_chunked_matches_single_call():
+    """Feeding odd-sized chunks gives the same audio as one call."""
+    audio = tone(1.0, 310.0)
+    stretcher = TimeStretcher(SAMPLE_RATE, 1.5)
+    parts = [stretcher.process(audio[i:i + 1001]) for i in range(0, len(audio), 1001)]
+    parts.append(stretcher.flush())
+    
+    assert np.allclose(np.concatenate(parts)[:, 0], time_stretch(audio, 1.5, SAMPLE_RATE))
+    assert not stretcher.active
+
+
+def test_normal_speed_is_transparent():
+    """At rate 1.0 audio passes through; switching back mid-clip keeps the tone intact."""
+    audio = tone(0.5)
+    stretcher = TimeStretcher(SAMPLE_RATE, 1.0)
+    assert np.array_equal(stretcher.process(audio)[:, 0], audio)
+    assert not stretcher.active
+    
+    stretcher.rate = 1.25
+    first = stretcher.process(audio[:4000])
+    stretcher.rate = 1.0
+    rest = np.concatenate([stretcher.process(audio[4000:]), stretcher.flush()])[:, 0]
+    
+    assert len(first) + len(rest) == 4000 / 1.25 + len(audio) - 4000
+    assert peak_frequency(rest[:-1000]) == pytest.approx(220.0, abs=2.0)
+    assert np.abs(rest[:-1000]).max() == pytest.approx(0.5, abs=0.02)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""Test suite for the batch transcription script."""
+
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import config
+from utils.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def batch(monkeypatch, load_module):
+    """The transcribe_batch module, transcribing with the stub backend."""
+    monkeypatch.setattr(config, "STT_BACKEND", "stub")
+    monkeypatch.setattr(config, "STT_FALLBACK_BACKEND", None)
+    monkeypatch.setitem(sys.modules, "speech.stt", load_module("speech/stt.py", name="speech.stt"))
+    return load_module("transcribe_batch.py")
+
+
+def write_speech(path, seconds=1.5):
+    """A WAV file with a voiced burst in low background noise."""
+    t = np.arange(int(seconds * config.SAMPLE_RATE)) / config.SAMPLE_RATE
+    audio = np.random.default_rng(0).normal(0.0, 0.002, len(t))
+    voiced = (t >= 0.3) & (t < seconds - 0.3)
+    phase = 2 * np.pi * np.cumsum(130 + 15 * np.sin(2 * np.pi * t[voiced])) / config.SAMPLE_RATE
+    audio[voiced] += 0.1 * sum(np.sin(k * phase) / k for k in range(1, 8))
+    sf.write(path, audio.astype(np.float32), config.SAMPLE_RATE)
+
+
+def read_records(path):
+    """Output records by file name, skipping lines that are not JSON."""
+    records = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        records.setdefault(record["file"], []).append(record)
+    return records
+
+
+def test_transcribes_directory_and_resumes(batch, tmp_path):
+    """A second run transcribes only files that did not finish the first time."""
+    recordings = tmp_path / "recordings"
+    (recordings / "day2").mkdir(parents=True)
+    write_speech(recordings / "hello.wav")
+    sf.write(recordings / "silence.wav", np.zeros(config.SAMPLE_RATE, dtype=np.float32), config.SAMPLE_RATE)
+    (recordings / "day2" / "broken.wav").write_bytes(b"not a wav file")
+    (recordings / "notes.txt").write_text("ignored")
+    output = tmp_path / "transcripts.jsonl"
+    
+    assert batch.main([str(recordings), "--output", str(output), "--rate", "0"]) == 0
+    
+    records = read_records(output)
+    assert sorted(records) == [os.path.join("day2", "broken.wav"), "hello.wav", "silence.wav"]
+    hello, = records["hello.wav"]
+    assert hello["status"] == "ok" and hello["backend"] == "stub"
+    assert hello["text"].endswith("seconds of audio]")
+    assert hello["seconds"] == pytest.approx(1.5)
+    assert hello["elapsed"] >= 0
+    assert records["silence.wav"][0]["status"] == "no_speech"
+    broken, = records[os.path.join("day2", "broken.wav")]
+    assert broken["status"] == "error" and broken["error"]
+    
+    # Fix the broken file, record an empty transcript for a new one and cut the last line short
+    write_speech(recordings / "day2" / "broken.wav")
+    write_speech(recordings / "quiet.wav")
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"file": "quiet.wav", "status": "empty", "text": ""}) + "\n")
+        f.write('{"file": "hello.wav", "sta')
+    
+    assert batch.main([str(recordings), "--output", str(output), "--rate", "0"]) == 0
+    
+    records = read_records(output)
+    assert len(records["hello.wav"]) == len(records["silence.wav"]) == 1
+    assert [r["status"] for r in records[os.path.join("day2", "broken.wav")]] == ["error", "ok"]
+    assert [r["status"] for r in records["quiet.wav"]] == ["empty", "ok"]
+
+
+def test_nothing_left_to_transcribe(batch, tmp_path, capsys):
+    """A finished output is left untouched, unless restarting."""
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    write_speech(recordings / "hello.wav")
+    output = tmp_path / "transcripts.jsonl"
+    output.write_text(json.dumps({"file": "hello.wav", "status": "ok", "text": "hi"}) + "\n", encoding="utf-8")
+    
+    assert batch.main([str(recordings), "--output", str(output)]) == 0
+    assert "1 already done, 0 to transcribe" in capsys.readouterr().out
+    assert read_records(output)["hello.wav"][0]["text"] == "hi"
+    
+    assert batch.main([str(recordings), "--output", str(output), "--restart", "--rate", "0"]) == 0
+    restarted, = read_records(output)["hello.wav"]
+    assert restarted["status"] == "ok" and restarted["text"] != "hi"
+    
+    assert batch.main([str(tmp_path / "missing"), "--output", str(output)]) == 1
+
+
+class SlowSTT:
+    """SpeechToText stand-in whose every request takes a while."""
+    
+    def __init__(self):
+        self.backend = SimpleNamespace(name="stub")
+        self.requests = 0
+    
+    def encode(self, audio):
+        return [None]
+    
+    def transcribe(self, audio, uploads, raise_errors=False):
+        self.requests += 1
+        time.sleep(0.05)
+        return "hello"
+
+
+def test_interrupt_cancels_queued_files(batch, tmp_path):
+    """Files still queued when the run is interrupted are never sent."""
+    paths = []
+    for i in range(10):
+        paths.append(tmp_path / f"{i}.wav")
+        write_speech(paths[-1], seconds=0.5)
+    
+    stt = SlowSTT()
+    with open(tmp_path / "out.jsonl", "w") as output_file:
+        transcriber = batch.BatchTranscriber(stt, RateLimiter(0), output_file)
+        
+        def interrupt(record):
+            raise KeyboardInterrupt
+        
+        # Ctrl-C arrives while the first result is being written
+        transcriber.write = interrupt
+        with pytest.raises(KeyboardInterrupt):
+            transcriber.run(paths, tmp_path, workers=2)
+    
+    # Only requests already running finish
+    time.sleep(0.2)
+    assert stt.requests <= 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,142 @@
+"""Test suite for TTS backends and hedged requests."""
+import time
+
+import pytest
+
+import config
+from providers.tts import (
+    ElevenLabsTTSBackend, HedgedTTS, LocalTTSBackend, OpenAITTSBackend,
+    get_tts_backend, tts_backends
+)
+from utils.metrics import metrics
+
+SENTENCE = "This sentence takes a couple of seconds to say."
+
+
+@pytest.fixture
+def local_tts(monkeypatch, tmp_path, load_module):
+    """A TextToSpeech on the local backend, caching under tmp_path."""
+    monkeypatch.setattr(config, "TTS_PROVIDER", "local")
+    monkeypatch.setattr(config, "TTS_FALLBACK_PROVIDER", None)
+    monkeypatch.setattr(config, "TTS_CACHE", True)
+    monkeypatch.setattr(config, "TTS_CACHE_DIR", str(tmp_path))
+    return load_module("speech/tts.py").TextToSpeech()
+
+
+def test_local_backend_is_deterministic_and_measured():
+    """The stand-in speaks for as long as the text would take and records first-byte latency."""
+    backend = tts_backends.create("local", chunk_bytes=1000)
+    before = metrics.histogram("tts.local.first_byte").count
+    
+    audio = b"".join(backend.stream(SENTENCE))
+    assert len(audio) == 2 * int(9 / 150 * 60 * 24000)
+    assert audio == b"".join(backend.stream(SENTENCE))
+    assert backend.calls == [SENTENCE, SENTENCE]
+    assert metrics.histogram("tts.local.first_byte").count == before + 2
+
+
+def test_fast_primary_is_not_hedged():
+    """A primary that answers within the deadline is used alone."""
+    primary = LocalTTSBackend(first_byte=0.01)
+    secondary = LocalTTSBackend()
+    hedged = HedgedTTS(primary, secondary, deadline=0.2)
+    
+    assert b"".join(hedged.stream(SENTENCE)) == b"".join(LocalTTSBackend().stream(SENTENCE))
+    assert secondary.calls == []
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    """A late primary triggers the secondary, which wins; the primary is abandoned."""
+    primary = LocalTTSBackend(first_byte=0.3, chunk_interval=0.05)
+    secondary = LocalTTSBackend(first_byte=0.02)
+    hedged = HedgedTTS(primary, secondary, deadline=0.05)
+    expected = b"".join(LocalTTSBackend().stream(SENTENCE))
+    hedges = metrics.counter("tts.hedged.hedges").value
+    completed = metrics.histogram("tts.local.latency").count
+    
+    started = time.perf_counter()
+    chunks = hedged.stream(SENTENCE)
+    first = next(chunks)
+    assert time.perf_counter() - started < 0.2
+    assert first and b"".join([first, *chunks]) == expected
+    assert secondary.calls == [SENTENCE] and primary.calls == [SENTENCE]
+    assert metrics.counter("tts.hedged.hedges").value == hedges + 1
+    
+    # Only the secondary completes; the primary stops at its first chunk
+    time.sleep(0.4)
+    assert metrics.histogram("tts.local.latency").count == completed + 1
+
+
+def test_failed_primary_falls_back_immediately():
+    """A primary that fails before any audio is hedged without waiting for the deadline."""
+    hedged = HedgedTTS(LocalTTSBackend(fail=True), LocalTTSBackend(), deadline=5.0)
+    
+    started = time.perf_counter()
+    audio = b"".join(hedged.stream(SENTENCE))
+    assert audio and time.perf_counter() - started < 1.0
+    
+    both_failing = HedgedTTS(LocalTTSBackend(fail=True), LocalTTSBackend(fail=True), deadline=0.05)
+    with pytest.raises(RuntimeError):
+        b"".join(both_failing.stream(SENTENCE))
+
+
+def test_winner_failing_mid_stream_raises(local_tts):
+    """A winner that fails after its first chunks raises instead of ending early, and is not cached."""
+    hedged = HedgedTTS(LocalTTSBackend(fail_after=3, chunk_bytes=1000), LocalTTSBackend(), deadline=5.0)
+    received = []
+    with pytest.raises(RuntimeError):
+        for chunk in hedged.stream(SENTENCE):
+            received.append(chunk)
+    assert len(received) == 3
+    assert hedged.secondary.calls == []
+    
+    tts = local_tts
+    tts.backend = hedged
+    assert len(tts.synthesize(SENTENCE)) == 3000
+    stats = tts.cache.get_stats()
+    assert stats['memory_bytes'] == 0 and stats['disk_bytes'] == 0
+
+
+def test_hedged_audio_is_cached_under_the_winner(local_tts):
+    """The stream names the backend that won, and the cache is keyed by it."""
+    primary = LocalTTSBackend(first_byte=0.3)
+    secondary = LocalTTSBackend()
+    secondary.name, secondary.voice = "backup", "other"
+    hedged = HedgedTTS(primary, secondary, deadline=0.05)
+    
+    stream = hedged.stream(SENTENCE)
+    assert stream.backend is hedged
+    next(stream)
+    assert stream.backend is secondary
+    stream.close()
+    assert hedged.candidates == [primary, secondary]
+    
+    tts = local_tts
+    tts.backend = hedged
+    audio = tts.synthesize(SENTENCE)
+    assert tts.cache.get(tts._cache_key(SENTENCE, secondary)) == audio
+    assert tts.cache.get(tts._cache_key(SENTENCE, primary)) is None
+    
+    # Served from the cache whichever backend would win next time
+    tts.backend = HedgedTTS(primary, secondary, deadline=5.0)
+    calls = len(primary.calls) + len(secondary.calls)
+    assert tts.synthesize(SENTENCE) == audio
+    assert len(primary.calls) + len(secondary.calls) == calls
+
+
+def test_backend_selection():
+    """Unavailable providers are replaced, and a fallback enables hedging."""
+    assert isinstance(get_tts_backend("elevenlabs", api_key="test"), OpenAITTSBackend)
+    
+    hedged = get_tts_backend("openai", fallback="elevenlabs", api_key="test", elevenlabs_api_key="key")
+    assert isinstance(hedged, HedgedTTS)
+    assert isinstance(hedged.secondary, ElevenLabsTTSBackend)
+    assert hedged.voice == "alloy+21m00Tcm4TlvDq8ikWAM"
+    
+    assert isinstance(get_tts_backend("local", fallback="local"), LocalTTSBackend)
+    with pytest.raises(ValueError):
+        get_tts_backend("missing")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
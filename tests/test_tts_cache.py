@@ -0,0 +1,77 @@
+"""Test suite for the synthesized speech cache."""
+import os
+
+import pytest
+
+from utils.tts_cache import TTSCache, cache_key
+
+
+def test_key_ignores_whitespace_and_covers_voice():
+    """Equivalent text shares a key; a different voice or speed does not."""
+    key = cache_key("Hello  there.\n", "tts-1", "alloy")
+    assert key == cache_key(" Hello there.", "tts-1", "alloy")
+    assert key != cache_key("Hello there.", "tts-1", "nova")
+    assert key != cache_key("Hello there.", "tts-1", "alloy", speed=1.25)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    """Reading a clip keeps it; the oldest untouched clip is evicted."""
+    cache = TTSCache(memory_bytes=2000)
+    cache.put("a", b"\x01" * 800)
+    cache.put("b", b"\x02" * 800)
+    assert cache.get("a") == b"\x01" * 800
+    
+    cache.put("c", b"\x03" * 800)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    
+    stats = cache.get_stats()
+    assert stats['memory_evictions'] == 1
+    assert stats['memory_hits'] == 3 and stats['misses'] == 1
+    assert stats['memory_bytes'] == 1600
+
+
+def test_disk_tier_survives_restart_and_evicts(tmp_path):
+    """Clips are read back from disk by a new cache and bounded in size."""
+    cache = TTSCache(disk_dir=str(tmp_path), disk_bytes=2500)
+    cache.put("a" * 64, b"\x01" * 1000)
+    cache.put("b" * 64, b"\x02" * 1000)
+    
+    reopened = TTSCache(disk_dir=str(tmp_path), disk_bytes=2500)
+    clip = reopened.get("a" * 64)
+    assert clip == b"\x01" * 1000
+    assert reopened.get_stats()['disk_hits'] == 1
+    assert isinstance(clip, bytes)
+    assert reopened.get("a" * 64) is clip
+    assert reopened.get_stats()['memory_hits'] == 1
+    
+    # "b" is now the least recently used file
+    os.utime(tmp_path / "bb" / f"{'b' * 64}.pcm", (0, 0))
+    reopened.put("c" * 64, b"\x03" * 1000)
+    assert reopened.get_stats()['disk_evictions'] == 1
+    assert not (tmp_path / "bb" / f"{'b' * 64}.pcm").exists()
+    assert (tmp_path / "aa" / f"{'a' * 64}.pcm").exists()
+
+
+
+def test_disk_errors_fall_back_to_memory(tmp_path):
+    """An unusable cache directory leaves a working memory-only cache."""
+    (tmp_path / "file").write_bytes(b"")
+    cache = TTSCache(disk_dir=str(tmp_path / "file" / "cache"))
+    assert cache.disk_dir is None
+    cache.put("a" * 64, b"\x01" * 100)
+    assert cache.get("a" * 64) == b"\x01" * 100
+    
+    # A write that fails later, e.g. on a full disk
+    cache = TTSCache(disk_dir=str(tmp_path / "cache"))
+    (tmp_path / "cache" / "aa").write_bytes(b"")
+    cache.put("a" * 64, b"\x01" * 100)
+    assert cache.disk_dir is None
+    assert cache.get("a" * 64) == b"\x01" * 100
+    cache.put("b" * 64, b"\x02" * 100)
+    assert not (tmp_path / "cache" / "bb").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
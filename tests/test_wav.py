@@ -0,0 +1,53 @@
+"""Test suite for the in-memory WAV encoder."""
+
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from utils.wav import encode_wav, to_pcm16
+
+
+def test_round_trip_float_audio():
+    """Float recordings decode back to the same 16-bit samples."""
+    audio = np.linspace(-1.2, 1.2, 40000, dtype=np.float32).reshape(-1, 1)
+    wav = encode_wav(audio, 16000)
+    
+    decoded, sample_rate = sf.read(io.BytesIO(wav.read()), dtype='int16')
+    assert sample_rate == 16000
+    assert np.array_equal(decoded, to_pcm16(audio)[:, 0])
+    assert decoded.min() == -32768 and decoded.max() == 32767
+
+
+def test_int16_input_is_not_copied():
+    """int16 arrays and PCM bytes are served straight from their memory."""
+    pcm = np.arange(-500, 500, dtype=np.int16)
+    wav = encode_wav(pcm, 8000)
+    assert np.shares_memory(wav.pcm, pcm)
+    
+    from_bytes = encode_wav(pcm.tobytes(), 8000)
+    assert from_bytes.read() == wav.read()
+
+
+def test_chunked_reads_and_seek():
+    """Reads of any size return the same file, and seeking rewinds for retries."""
+    wav = encode_wav(np.zeros((1000, 2), dtype=np.float32) + 0.25, 16000)
+    assert wav.name == "audio.wav"
+    whole = wav.read()
+    assert len(whole) == len(wav) == 44 + 1000 * 2 * 2
+    
+    wav.seek(0)
+    parts = []
+    while True:
+        part = wav.read(37)
+        if not part:
+            break
+        parts.append(part)
+    assert b"".join(parts) == whole
+    
+    info = sf.info(io.BytesIO(whole))
+    assert info.channels == 2 and info.frames == 1000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
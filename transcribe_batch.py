@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Batch transcription for archived recordings.
+Walks a directory of WAV files and transcribes them concurrently through
+SpeechToText, writing one JSON line per file as results arrive.
+
+Usage:
+    python transcribe_batch.py recordings/ --output transcripts.jsonl --workers 8 --rate 3
+
+Re-running with the same output file resumes: files already transcribed
+(or found to contain no speech) are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from math import gcd
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from speech.stt import SpeechToText
+from utils.rate_limit import RateLimiter
+import config
+
+# Statuses that count as done when resuming
+DONE_STATUSES = {"ok", "no_speech"}
+
+
+def find_recordings(input_dir: Path) -> list:
+    """All WAV files under a directory, in a stable order."""
+    return sorted(path for path in input_dir.rglob("*") if path.suffix.lower() == ".wav")
+
+
+def load_checkpoint(output: Path) -> set:
+    """Files already finished according to an existing output file."""
+    done = set()
+    if not output.exists():
+        return done
+    
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run
+                continue
+            if record.get("status") in DONE_STATUSES:
+                done.add(record["file"])
+    return done
+
+
+def end_partial_line(output: Path) -> None:
+    """Terminate a line cut short by an interrupted run, so appended records start on a new line."""
+    if not output.exists() or output.stat().st_size == 0:
+        return
+    
+    with open(output, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def load_audio(path: Path) -> np.ndarray:
+    """Read a recording as float32 at the assistant's sample rate."""
+    audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+    if sample_rate != config.SAMPLE_RATE:
+        factor = gcd(sample_rate, config.SAMPLE_RATE)
+        audio = resample_poly(audio, config.SAMPLE_RATE // factor, sample_rate // factor, axis=0)
+        audio = audio.astype(np.float32)
+    return audio
+
+
+class BatchTranscriber:
+    """Transcribes many recordings with bounded concurrency and per-provider rate limits."""
+    
+    def __init__(self, stt: SpeechToText, limiter: RateLimiter, output_file):
+        self.stt = stt
+        self.limiter = limiter
+        self.output_file = output_file
+        self.write_lock = threading.Lock()
+        
+        # Progress
+        self.files_done = 0
+        self.audio_seconds = 0.0
+        self.errors = 0
+    
+    def transcribe_file(self, path: Path, name: str) -> dict:
+        """Transcribe one recording and return its output record."""
+        started = time.perf_counter()
+        record = {"file": name, "backend": self.stt.backend.name}
+        
+        try:
+            audio = load_audio(path)
+            record["seconds"] = round(len(audio) / config.SAMPLE_RATE, 3)
+            
+            uploads = self.stt.encode(audio)
+            if uploads is None:
+                record.update(status="no_speech", text="")
+            else:
+                # One request per uploaded segment
+                self.limiter.acquire(self.stt.backend.name, len(uploads))
+                text = self.stt.transcribe(audio, uploads, raise_errors=True)
+                record.update(status="ok" if text else "empty", text=text)
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+        return record
+    
+    def write(self, record: dict) -> None:
+        """Append a record and flush it, so progress survives interruption."""
+        with self.write_lock:
+            self.output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.output_file.flush()
+            
+            self.files_done += 1
+            self.audio_seconds += record.get("seconds", 0.0)
+            if record["status"] == "error":
+                self.errors += 1
+    
+    def run(self, recordings: list, input_dir: Path, workers: int) -> None:
+        """Transcribe recordings on a thread pool, writing results as they finish."""
+        started = time.perf_counter()
+        
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                pool.submit(self.transcribe_file, path, str(path.relative_to(input_dir))): path
+                for path in recordings
+            }
+            for future in as_completed(futures):
+                record = future.result()
+                self.write(record)
+                
+                elapsed = time.perf_counter() - started
+                print(f"[{self.files_done}/{len(recordings)}] {record['file']}: {record['status']} "
+                      f"({self.audio_seconds / elapsed:.1f} audio-s/s)")
+        except BaseException:
+            # Don't send queued files to the provider once the run is abandoned
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+        
+        elapsed = time.perf_counter() - started
+        print("\n" + "="*60)
+        print(f"Transcribed {self.files_done} files, {self.audio_seconds:.1f}s of audio in {elapsed:.1f}s")
+        print(f"Throughput: {self.audio_seconds / elapsed if elapsed else 0.0:.2f} audio-seconds per second")
+        print(f"Errors: {self.errors}")
+        for provider, waited in self.limiter.waited.items():
+            print(f"Rate limit wait ({provider}): {waited:.1f}s")
+        print("="*60)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe a directory of WAV recordings to JSONL.")
+    parser.add_argument("input_dir", type=Path, help="Directory searched recursively for .wav files")
+    parser.add_argument("--output", type=Path, default=Path("transcripts.jsonl"), help="JSONL output (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Files transcribed concurrently")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second per provider (0 = unlimited)")
+    parser.add_argument("--burst", type=float, default=None, help="Requests allowed at once before rate limiting")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing output and start over")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    
+    if not args.input_dir.is_dir():
+        print(f"Not a directory: {args.input_dir}")
+        return 1
+    
+    recordings = find_recordings(args.input_dir)
+    done = set() if args.restart else load_checkpoint(args.output)
+    pending = [path for path in recordings if str(path.relative_to(args.input_dir)) not in done]
+    
+    print(f"Found {len(recordings)} recordings, {len(done)} already done, {len(pending)} to transcribe")
+    if not pending:
+        return 0
+    
+    stt = SpeechToText()
+    limiter = RateLimiter(args.rate, args.burst)
+    if not args.restart:
+        end_partial_line(args.output)
+    
+    try:
+        with open(args.output, "w" if args.restart else "a", encoding="utf-8") as output_file:
+            BatchTranscriber(stt, limiter, output_file).run(pending, args.input_dir, args.workers)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run again with the same output to resume.")
+        return 130
+    finally:
+        stt.close()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
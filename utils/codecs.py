@@ -0,0 +1,236 @@
+"""
+Audio codecs for speech uploads and downloads.
+Encodes recordings as WAV, FLAC or Opus before they are sent for transcription,
+and decodes synthesized speech in process.
+"""
+
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from utils.wav import encode_wav, to_pcm16
+
+# codec -> (soundfile format, subtype, upload file name)
+CODECS = {
+    'wav': ('WAV', 'PCM_16', 'audio.wav'),
+    'flac': ('FLAC', 'PCM_16', 'audio.flac'),
+    'opus': ('OGG', 'OPUS', 'audio.ogg'),
+}
+
+# TTS response format -> (soundfile format, subtype) needed to decode it
+RESPONSE_FORMATS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'mp3': ('MP3', 'MPEG_LAYER_III'),
+    'opus': ('OGG', 'OPUS'),
+}
+
+
+def codec_available(codec: str) -> bool:
+    """Whether the installed libsndfile can write a codec."""
+    if codec not in CODECS:
+        return False
+    file_format, subtype, _ = CODECS[codec]
+    return subtype in sf.available_subtypes(file_format)
+
+
+def decode_available(response_format: str) -> bool:
+    """Whether a TTS response format can be decoded in process."""
+    if response_format == 'pcm':
+        return True
+    if response_format not in RESPONSE_FORMATS:
+        return False
+    file_format, subtype = RESPONSE_FORMATS[response_format]
+    return file_format in sf.available_formats() and subtype in sf.available_subtypes(file_format)
+
+
+def decode_audio(data: bytes, response_format: str = 'pcm', sample_rate: int = 24000) -> Tuple[np.ndarray, int]:
+    """
+    Decode a synthesized speech response.
+    
+    Args:
+        data: Response body
+        response_format: 'pcm' (raw 16-bit mono) or a format in RESPONSE_FORMATS
+        sample_rate: Rate of raw PCM (other formats carry their own)
+    
+    Returns:
+        (float32 samples of shape (frames, channels), sample rate)
+    """
+    if response_format == 'pcm':
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        return (samples.astype(np.float32) / 32768.0).reshape(-1, 1), sample_rate
+    
+    if not decode_available(response_format):
+        raise ValueError(f"Cannot decode TTS format: {response_format}")
+    return sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, codec: str = 'wav', compression_level: Optional[float] = None):
+    """
+    Encode audio into an in-memory file ready to upload.
+    
+    Args:
+        audio: Float or int16 samples, shape (frames,) or (frames, channels)
+        sample_rate: Samples per second (Opus needs 8, 12, 16, 24 or 48 kHz)
+        codec: 'wav', 'flac' or 'opus'
+        compression_level: Optional libsndfile compression level (0.0-1.0)
+    
+    Returns:
+        File-like object positioned at the start, with a ``name`` whose
+        extension tells the provider the format
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown upload codec: {codec}")
+    
+    if codec == 'wav':
+        return encode_wav(audio, sample_rate)
+    
+    file_format, subtype, name = CODECS[codec]
+    buffer = io.BytesIO()
+    sf.write(
+        buffer,
+        to_pcm16(audio),
+        sample_rate,
+        format=file_format,
+        subtype=subtype,
+        compression_level=compression_level
+    )
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+class AudioEncoder:
+    """
+    Encodes recordings for upload on a background thread.
+    
+    ``submit`` returns immediately with a Future, so encoding can overlap
+    other work (such as waiting on a streaming transcript) and never runs on
+    the caller's thread. Codecs the installed libsndfile cannot write fall
+    back to WAV.
+    """
+    
+    def __init__(self, codec: str = 'flac', sample_rate: int = 16000, compression_level: Optional[float] = None):
+        if not codec_available(codec):
+            print(f"Upload codec '{codec}' is not available, using WAV")
+            codec = 'wav'
+        
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.compression_level = compression_level
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-encoder")
+        
+        # Statistics
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.audio_seconds = 0.0
+        self.pcm_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_time = 0.0
+    
+    def submit(self, audio: np.ndarray) -> Future:
+        """
+        Start encoding a recording.
+        
+        Args:
+            audio: Recorded samples (not modified while encoding runs)
+        
+        Returns:
+            Future resolving to the encoded file object
+        """
+        return self.executor.submit(self._encode, audio)
+    
+    def get_stats(self) -> dict:
+        """Get upload size and encoding cost statistics."""
+        with self._lock:
+            return {
+                'codec': self.codec,
+                'encoded': self.encoded,
+                'audio_seconds': self.audio_seconds,
+                'pcm_bytes': self.pcm_bytes,
+                'encoded_bytes': self.encoded_bytes,
+                'bytes_saved': self.pcm_bytes - self.encoded_bytes,
+                'compression_ratio': self.pcm_bytes / self.encoded_bytes if self.encoded_bytes else 0.0,
+                'cpu_per_audio_second': self.encode_time / self.audio_seconds if self.audio_seconds else 0.0
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the encoder thread."""
+        self.executor.shutdown(wait=False)
+    
+    def _encode(self, audio: np.ndarray):
+        """Encode on the worker thread and record statistics."""
+        started = time.thread_time()
+        audio_file = encode_audio(audio, self.sample_rate, self.codec, self.compression_level)
+        elapsed = time.thread_time() - started
+        
+        size = len(audio_file) if self.codec == 'wav' else audio_file.getbuffer().nbytes
+        frames = len(audio)
+        channels = audio.shape[1] if audio.ndim == 2 else 1
+        
+        with self._lock:
+            self.encoded += 1
+            self.audio_seconds += frames / self.sample_rate
+            self.pcm_bytes += frames * channels * 2
+            self.encoded_bytes += size
+            self.encode_time += elapsed
+        
+        return audio_file
+
+
+class AudioDecoder:
+    """
+    Decodes compressed speech responses on a small worker pool.
+    
+    libsndfile runs without holding the GIL, so decoding on the pool keeps
+    the event loop responsive and several sentences can decode at once.
+    """
+    
+    def __init__(self, workers: int = 2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-decoder")
+        
+        # Statistics
+        self._lock = threading.Lock()
+        self.decoded = 0
+        self.audio_seconds = 0.0
+        self.decode_time = 0.0
+    
+    def submit(self, data: bytes, response_format: str, sample_rate: int = 24000) -> Future:
+        """
+        Start decoding a response.
+        
+        Returns:
+            Future resolving to (samples, sample rate) as from ``decode_audio``
+        """
+        return self.executor.submit(self._decode, data, response_format, sample_rate)
+    
+    def get_stats(self) -> dict:
+        """Get decoding cost statistics."""
+        with self._lock:
+            return {
+                'decoded': self.decoded,
+                'audio_seconds': self.audio_seconds,
+                'cpu_per_audio_second': self.decode_time / self.audio_seconds if self.audio_seconds else 0.0
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the decoder threads."""
+        self.executor.shutdown(wait=False)
+    
+    def _decode(self, data: bytes, response_format: str, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """Decode on a worker thread and record statistics."""
+        started = time.thread_time()
+        audio, rate = decode_audio(data, response_format, sample_rate)
+        elapsed = time.thread_time() - started
+        
+        with self._lock:
+            self.decoded += 1
+            self.audio_seconds += len(audio) / rate
+            self.decode_time += elapsed
+        
+        return audio, rate
@@ -25,15 +25,33 @@ class Config:
             'LLM_PROVIDER': os.getenv('LLM_PROVIDER', 'openai'),
             'LLM_MODEL': os.getenv('LLM_MODEL', 'gpt-4-turbo-preview'),
             'STT_MODEL': os.getenv('STT_MODEL', 'whisper-1'),
+            'STT_BACKEND': os.getenv('STT_BACKEND', 'openai'),
             'TTS_PROVIDER': os.getenv('TTS_PROVIDER', 'openai'),
+            'TTS_FALLBACK_PROVIDER': os.getenv('TTS_FALLBACK_PROVIDER'),
+            'TTS_HEDGE_DEADLINE': os.getenv('TTS_HEDGE_DEADLINE', '0.6'),
+            'ELEVENLABS_VOICE_ID': os.getenv('ELEVENLABS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM'),
+            'ELEVENLABS_MODEL': os.getenv('ELEVENLABS_MODEL', 'eleven_turbo_v2_5'),
+            'TTS_MODEL': os.getenv('TTS_MODEL', 'tts-1'),
             'TTS_VOICE': os.getenv('TTS_VOICE', 'alloy'),
+            'TTS_FORMAT': os.getenv('TTS_FORMAT', 'pcm'),
+            'TTS_DECODE_WORKERS': os.getenv('TTS_DECODE_WORKERS', '2'),
+            'TTS_CACHE_MEMORY_MB': os.getenv('TTS_CACHE_MEMORY_MB', '16'),
+            'TTS_CACHE_DIR': os.getenv('TTS_CACHE_DIR', '.tts_cache'),
+            'TTS_CACHE_DISK_MB': os.getenv('TTS_CACHE_DISK_MB', '256'),
+            'SEGMENT_FIRST_MIN_CHARS': os.getenv('SEGMENT_FIRST_MIN_CHARS', '20'),
+            'SEGMENT_MIN_CHARS': os.getenv('SEGMENT_MIN_CHARS', '60'),
+            'SEGMENT_MAX_CHARS': os.getenv('SEGMENT_MAX_CHARS', '250'),
+            'SEGMENT_DEADLINE': os.getenv('SEGMENT_DEADLINE', '0.6'),
             'SAMPLE_RATE': os.getenv('SAMPLE_RATE', '16000'),
             'CHANNELS': os.getenv('CHANNELS', '1'),
             'CHUNK_SIZE': os.getenv('CHUNK_SIZE', '1024'),
+            'CALLBACK_BUFFER_SECONDS': os.getenv('CALLBACK_BUFFER_SECONDS', '2.0'),
+            'PLAYBACK_TARGET_MS': os.getenv('PLAYBACK_TARGET_MS', '80'),
             'SHORT_TERM_MEMORY_SIZE': os.getenv('SHORT_TERM_MEMORY_SIZE', '20'),
             'LONG_TERM_SUMMARY_THRESHOLD': os.getenv('LONG_TERM_SUMMARY_THRESHOLD', '30'),
             'VAD_AGGRESSIVENESS': os.getenv('VAD_AGGRESSIVENESS', '3'),
             'SILENCE_THRESHOLD': os.getenv('SILENCE_THRESHOLD', '500'),
+            'VAD_PRE_ROLL_MS': os.getenv('VAD_PRE_ROLL_MS', '300'),
         }
     
     def get(self, key: str, default=None):
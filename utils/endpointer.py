@@ -0,0 +1,236 @@
+"""
+Streaming speech endpointer.
+Finds where speech starts and ends in a live audio stream, one block at a time.
+"""
+
+import collections
+import math
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+def frame_energy(frame: np.ndarray) -> float:
+    """
+    Mean-square energy of an audio block, on a [-1, 1] scale.
+    
+    Args:
+        frame: Float or integer PCM samples, any shape
+    """
+    samples = np.asarray(frame).reshape(-1)
+    count = len(samples)
+    if count == 0:
+        return 0.0
+    if samples.dtype.kind in 'iu':
+        scale = float(np.iinfo(samples.dtype).max + 1)
+        samples = samples.astype(np.float32)
+        return float(np.dot(samples, samples)) / (count * scale * scale)
+    samples = samples.astype(np.float32, copy=False)
+    return float(np.dot(samples, samples)) / count
+
+
+class Endpointer:
+    """
+    Voice activity endpointer with constant work per block.
+    
+    Each block is classified as voiced or unvoiced: its energy must clear an
+    adaptive noise floor by ``snr``, and, if given, ``classifier`` (for
+    example a webrtcvad wrapper) must agree. Voiced and total durations over
+    the last ``window_ms`` are kept as running sums, so no block is
+    revisited. Speech starts once ``start_ratio`` of the window is voiced and
+    ends after ``hangover_ms`` of continuous unvoiced audio. Audio from the
+    ``pre_roll_ms`` before the start is kept so the first syllable is not
+    clipped.
+    
+    The noise floor follows unvoiced blocks, and is also raised to the
+    quietest energy seen over the last ``noise_window_ms`` (minimum
+    statistics), so a jump in background noise that would otherwise be
+    classified as speech forever is absorbed within that window. Speech
+    has pauses, so its minimum stays near the background level.
+    
+    Blocks can be any size; all durations are tracked in samples.
+    """
+    
+    START = "start"
+    END = "end"
+    MINIMUM_WINDOWS = 8  # Sub-windows the noise window's minimum is tracked over
+    
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: int = 300,
+        start_ratio: float = 0.6,
+        pre_roll_ms: int = 300,
+        hangover_ms: int = 500,
+        snr: float = 4.0,
+        min_energy: float = 1e-5,
+        noise_time_constant: float = 2.0,
+        noise_window_ms: int = 4000,
+        classifier: Optional[Callable[[np.ndarray], bool]] = None
+    ):
+        self.sample_rate = sample_rate
+        self.window_length = int(sample_rate * window_ms / 1000)
+        self.start_ratio = start_ratio
+        self.pre_roll_length = int(sample_rate * pre_roll_ms / 1000)
+        self.hangover_length = int(sample_rate * hangover_ms / 1000)
+        self.snr = snr
+        self.min_energy = min_energy
+        self.noise_time_constant = noise_time_constant
+        self.classifier = classifier
+        
+        self.noise_floor: Optional[float] = None
+        
+        # Minimum energy per sub-window, over the last noise window
+        self.minimum_length = max(1, int(sample_rate * noise_window_ms / 1000) // self.MINIMUM_WINDOWS)
+        self.minima = collections.deque(maxlen=self.MINIMUM_WINDOWS)
+        self.current_minimum = math.inf
+        self.current_minimum_samples = 0
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget the current stream (the noise floor estimate is kept)."""
+        self.window = collections.deque()
+        self.window_samples = 0
+        self.window_voiced = 0
+        
+        self.pre_roll = collections.deque()
+        self.pre_roll_samples = 0
+        
+        self.in_speech = False
+        self.silence_samples = 0
+        
+        # Absolute sample positions in the stream
+        self.position = 0
+        self.speech_start: Optional[int] = None
+        self.speech_end: Optional[int] = None
+        self.segments = 0
+    
+    def process(self, frame: np.ndarray) -> Optional[str]:
+        """
+        Add the next block of audio.
+        
+        Args:
+            frame: PCM samples (float or integer)
+        
+        Returns:
+            ``Endpointer.START`` when speech starts with this block,
+            ``Endpointer.END`` when it ends, otherwise None
+        """
+        samples = len(frame)
+        if samples == 0:
+            return None
+        
+        energy = frame_energy(frame)
+        voiced = self._is_voiced(frame, energy)
+        if not voiced:
+            self._update_noise_floor(energy, samples)
+        self._track_minimum(energy, samples)
+        
+        self.position += samples
+        self._add_to_window(samples, voiced)
+        
+        if not self.in_speech:
+            self._add_to_pre_roll(frame, samples)
+            if self.window_voiced >= self.start_ratio * self.window_length:
+                self.in_speech = True
+                self.silence_samples = 0
+                self.speech_start = self.position - self.pre_roll_samples
+                self.speech_end = None
+                return self.START
+            return None
+        
+        if voiced:
+            self.silence_samples = 0
+            return None
+        
+        self.silence_samples += samples
+        if self.silence_samples >= self.hangover_length:
+            self.in_speech = False
+            self.speech_end = self.position
+            self.segments += 1
+            self._clear_window()
+            return self.END
+        return None
+    
+    def pre_roll_frames(self) -> List[np.ndarray]:
+        """Blocks buffered before speech started (including the start block)."""
+        return list(self.pre_roll)
+    
+    @property
+    def threshold(self) -> float:
+        """Current energy a block needs to count as voiced."""
+        floor = self.noise_floor if self.noise_floor is not None else self.min_energy
+        return max(self.min_energy, floor * self.snr)
+    
+    def get_stats(self) -> dict:
+        """Get endpointer state."""
+        return {
+            'in_speech': self.in_speech,
+            'segments': self.segments,
+            'seconds': self.position / self.sample_rate,
+            'noise_floor': self.noise_floor,
+            'threshold': self.threshold
+        }
+    
+    def _is_voiced(self, frame: np.ndarray, energy: float) -> bool:
+        """Classify one block."""
+        if energy < self.threshold:
+            return False
+        return self.classifier is None or bool(self.classifier(frame))
+    
+    def _update_noise_floor(self, energy: float, samples: int) -> None:
+        """Track background energy; falls quickly and rises slowly."""
+        if self.noise_floor is None:
+            self.noise_floor = energy
+            return
+        
+        time_constant = self.noise_time_constant
+        if energy < self.noise_floor:
+            time_constant /= 10
+        alpha = 1.0 - math.exp(-samples / (self.sample_rate * time_constant))
+        self.noise_floor += alpha * (energy - self.noise_floor)
+    
+    def _track_minimum(self, energy: float, samples: int) -> None:
+        """Raise the noise floor to the quietest energy over the noise window."""
+        self.current_minimum = min(self.current_minimum, energy)
+        self.current_minimum_samples += samples
+        if self.current_minimum_samples < self.minimum_length:
+            return
+        
+        self.minima.append(self.current_minimum)
+        self.current_minimum = math.inf
+        self.current_minimum_samples = 0
+        
+        if len(self.minima) == self.minima.maxlen:
+            minimum = min(self.minima)
+            if self.noise_floor is None or minimum > self.noise_floor:
+                self.noise_floor = minimum
+    
+    def _add_to_window(self, samples: int, voiced: bool) -> None:
+        """Append a block to the sliding window, dropping what falls out."""
+        self.window.append((samples, voiced))
+        self.window_samples += samples
+        if voiced:
+            self.window_voiced += samples
+        
+        while self.window_samples - self.window[0][0] >= self.window_length:
+            old_samples, old_voiced = self.window.popleft()
+            self.window_samples -= old_samples
+            if old_voiced:
+                self.window_voiced -= old_samples
+    
+    def _add_to_pre_roll(self, frame: np.ndarray, samples: int) -> None:
+        """Keep the most recent blocks before speech starts."""
+        self.pre_roll.append(frame)
+        self.pre_roll_samples += samples
+        
+        while len(self.pre_roll) > 1 and self.pre_roll_samples - len(self.pre_roll[0]) >= self.pre_roll_length:
+            self.pre_roll_samples -= len(self.pre_roll.popleft())
+    
+    def _clear_window(self) -> None:
+        """Start a fresh window and pre-roll after speech ends."""
+        self.window.clear()
+        self.window_samples = 0
+        self.window_voiced = 0
+        self.pre_roll.clear()
+        self.pre_roll_samples = 0
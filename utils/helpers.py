@@ -2,9 +2,23 @@
 Utility functions for the Voice Assistant
 """
 
+import re
 import time
 from datetime import datetime
 
+# Terminal punctuation (plus closing quotes/brackets) at the end of a sentence
+SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)(?=\s|$)|\n')
+
+# Clause punctuation that is a natural place to pause
+CLAUSE_END = re.compile(r'(?:[,;:]|--|\u2014)(?=\s)')
+
+# Abbreviations whose trailing period does not end a sentence (none of
+# them is also an ordinary word, which could end one)
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc",
+    "e.g", "i.e", "approx", "inc", "ltd", "dept"
+}
+
 
 def format_timestamp():
     """Return formatted timestamp"""
@@ -26,6 +40,101 @@ def calculate_speaking_time(text, words_per_minute=150):
     return (word_count / words_per_minute) * 60
 
 
+def find_sentence_ends(text):
+    """
+    Find the positions where sentences end
+    
+    Terminal punctuation only counts when it is followed by whitespace or the
+    end of the text, so decimals like "3.5" are kept together. Periods after
+    common abbreviations ("Dr.", "e.g.") and single-letter initials are
+    skipped, and a trailing period after a digit is left for more text to
+    arrive. Newlines always end a sentence.
+    
+    Args:
+        text: Text to scan
+    
+    Returns:
+        Sorted list of end offsets (exclusive)
+    """
+    ends = []
+    
+    for match in SENTENCE_END.finditer(text):
+        if match.group() == "\n":
+            ends.append(match.end())
+            continue
+        
+        punctuation = match.group(1)
+        if punctuation.endswith("."):
+            word = text[:match.start()].rsplit(None, 1)[-1] if text[:match.start()].strip() else ""
+            if word.lower().rstrip(".") in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                continue
+            if match.end() == len(text) and word[-1:].isdigit():
+                continue
+        
+        ends.append(match.end())
+    
+    return ends
+
+
+def find_clause_ends(text):
+    """
+    Find the positions where clauses end (commas, semicolons, colons, dashes)
+    
+    Args:
+        text: Text to scan
+    
+    Returns:
+        Sorted list of end offsets (exclusive)
+    """
+    return [match.end() for match in CLAUSE_END.finditer(text)]
+
+
+def chunk_spans(text, max_length=500):
+    """
+    Compute chunk boundaries for splitting text for streaming TTS
+    
+    Whole sentences are packed into chunks of at most max_length characters.
+    A sentence longer than max_length is split at word boundaries, and a
+    single word longer than max_length is split where it overflows.
+    
+    Args:
+        text: Text to split
+        max_length: Maximum characters per chunk
+    
+    Returns:
+        List of (start, end) offsets into text
+    """
+    breaks = find_sentence_ends(text)
+    if not breaks or breaks[-1] != len(text):
+        breaks.append(len(text))
+    
+    spans = []
+    start = 0
+    last_fit = None
+    
+    for end in breaks:
+        while end - start > max_length:
+            if last_fit is not None:
+                # Close the chunk at the last sentence that fit
+                spans.append((start, last_fit))
+                start, last_fit = last_fit, None
+                continue
+            
+            # A single sentence is too long, so break it between words
+            limit = start + max_length
+            cut = text.rfind(" ", start + 1, limit + 1)
+            if cut <= start:
+                cut = limit
+            spans.append((start, cut))
+            start = cut
+        last_fit = end
+    
+    if start < len(text):
+        spans.append((start, len(text)))
+    
+    return spans
+
+
 def chunk_text(text, max_length=500):
     """
     Split text into chunks for streaming TTS
@@ -37,24 +146,53 @@ def chunk_text(text, max_length=500):
     Returns:
         List of text chunks
     """
-    sentences = text.split('. ')
     chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) < max_length:
-            current_chunk += sentence + ". "
-        else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + ". "
-    
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-        
+    
+    for start, end in chunk_spans(text, max_length):
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+    
     return chunks
 
 
+def merge_transcripts(parts, max_overlap_words=12):
+    """
+    Join transcripts of consecutive, possibly overlapping audio segments
+    
+    When segments overlap, the end of one transcript repeats at the start
+    of the next. The longest such repeat (compared case- and
+    punctuation-insensitively) is dropped from the later part.
+    
+    Args:
+        parts: Transcripts in audio order
+        max_overlap_words: Longest repeat to look for
+    
+    Returns:
+        Merged transcript
+    """
+    def normalize(word):
+        return re.sub(r"[^\w']", "", word.lower())
+    
+    merged = []
+    for part in parts:
+        words = part.split()
+        if not words:
+            continue
+        
+        tail = [normalize(word) for word in merged[-max_overlap_words:]]
+        head = [normalize(word) for word in words[:max_overlap_words]]
+        overlap = 0
+        for size in range(min(len(tail), len(head)), 0, -1):
+            if tail[-size:] == head[:size] and any(head[:size]):
+                overlap = size
+                break
+        
+        merged.extend(words[overlap:])
+    
+    return " ".join(merged)
+
+
 class Timer:
     """Simple timer utility"""
     def __init__(self):
@@ -0,0 +1,218 @@
+"""
+Playback jitter buffer.
+Queues synthesized audio for a callback-driven output stream, so clips play
+back to back without gaps and late audio is absorbed by a small cushion.
+"""
+
+import time
+from typing import Optional, Union
+
+import numpy as np
+
+
+class JitterBuffer:
+    """
+    Frame-aligned ring between audio producers and an output callback.
+    
+    Producers ``append`` int16 PCM bytes or sample arrays; bytes are split
+    on frame boundaries and any partial frame is carried over to the next
+    append, so chunks cut at arbitrary byte offsets play correctly. The
+    output callback calls ``read_into`` for every block.
+    
+    Playback starts once ``target_ms`` of audio is buffered, or sooner when
+    the producer calls ``mark_end`` to say no more audio is coming for now.
+    If the buffer runs dry before that, the gap is filled with silence,
+    counted as an underrun, and playback waits for the target depth again.
+    
+    One thread appends and the callback reads; each only advances its own
+    index, so the callback never takes a lock. ``flush`` may be called from
+    any thread and takes effect at the callback's next block, which records
+    the exact position playback was cut at in ``cut_position``.
+    """
+    
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        target_ms: int = 80,
+        capacity_seconds: float = 30.0
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.target_frames = int(sample_rate * target_ms / 1000)
+        self.storage = np.zeros((int(sample_rate * capacity_seconds), channels), dtype=np.float32)
+        
+        # Total frames appended and consumed; positions are these modulo capacity
+        self.write_index = 0
+        self.read_index = 0
+        
+        self.primed = False  # Consumer side: currently playing out of the buffer
+        self.draining = True  # Producer side: nothing more is expected
+        self._partial = b''
+        self._flush_to = 0
+        self._generation = 0
+        
+        # Consumer side: last flush applied, and the position it cut playback at
+        self.applied_generation = 0
+        self.cut_position = 0
+        
+        # Statistics (consumer-owned)
+        self.underruns = 0
+        self.underrun_frames = 0
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.storage)
+    
+    @property
+    def buffered(self) -> int:
+        """Frames waiting to be played."""
+        return self.write_index - max(self.read_index, self._flush_to)
+    
+    @property
+    def played(self) -> int:
+        """Frames consumed (played or flushed) since the buffer was created."""
+        return self.read_index
+    
+    def append(self, audio: Union[bytes, np.ndarray], timeout: Optional[float] = None) -> int:
+        """
+        Queue audio after everything already buffered (producer side).
+        
+        Waits for room when the buffer is full. Gives up if the buffer is
+        flushed meanwhile, or after ``timeout`` seconds.
+        
+        Args:
+            audio: int16 PCM bytes, or int16/float samples of shape
+                (frames,) or (frames, channels)
+            timeout: Longest wait for room, or None to wait indefinitely
+        
+        Returns:
+            Position (in frames) at which the queued audio ends
+        """
+        frames = self.to_frames(audio)
+        self.draining = False
+        generation = self._generation
+        deadline = None if timeout is None else time.monotonic() + timeout
+        block_seconds = max(self.target_frames, 256) / self.sample_rate
+        offset = 0
+        
+        while offset < len(frames) and generation == self._generation:
+            room = self.capacity - (self.write_index - self.read_index)
+            if room == 0:
+                if deadline and time.monotonic() > deadline:
+                    break
+                time.sleep(block_seconds / 2)
+                continue
+            
+            count = min(room, len(frames) - offset)
+            self._write(frames[offset:offset + count])
+            offset += count
+        
+        return self.write_index
+    
+    def mark_end(self) -> None:
+        """Let buffered audio play out below the target depth (producer side)."""
+        self._partial = b''
+        self.draining = True
+    
+    def flush(self) -> int:
+        """
+        Discard everything queued so far (any thread).
+        
+        Returns:
+            Generation number; the flush has taken effect once
+            ``applied_generation`` reaches it
+        """
+        self._partial = b''
+        self.draining = True
+        # Publish the target before the generation the callback checks
+        self._flush_to = self.write_index
+        self._generation += 1
+        return self._generation
+    
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Fill an output block (consumer side).
+        
+        Args:
+            out: Block of shape (frames, channels) to fill; whatever is not
+                covered by buffered audio is zeroed
+        
+        Returns:
+            Frames of audio written (the rest is silence)
+        """
+        generation = self._generation
+        if generation != self.applied_generation:
+            self.cut_position = self.read_index
+            self.read_index = max(self.read_index, self._flush_to)
+            self.applied_generation = generation
+            self.primed = False
+        
+        frames = len(out)
+        available = self.write_index - self.read_index
+        if not self.primed:
+            if available and (available >= self.target_frames or self.draining):
+                self.primed = True
+            else:
+                out.fill(0)
+                return 0
+        
+        count = min(frames, available)
+        storage = self.storage
+        capacity = len(storage)
+        start = self.read_index % capacity
+        first = min(count, capacity - start)
+        out[:first] = storage[start:start + first]
+        out[first:count] = storage[:count - first]
+        out[count:] = 0
+        self.read_index += count
+        
+        if count < frames:
+            self.primed = False
+            if not self.draining:
+                self.underruns += 1
+                self.underrun_frames += frames - count
+        
+        return count
+    
+    def get_stats(self) -> dict:
+        """Get buffer depth and underrun statistics."""
+        return {
+            'buffered_ms': 1000 * self.buffered / self.sample_rate,
+            'target_ms': 1000 * self.target_frames / self.sample_rate,
+            'underruns': self.underruns,
+            'underrun_ms': 1000 * self.underrun_frames / self.sample_rate
+        }
+    
+    def to_frames(self, audio: Union[bytes, np.ndarray]) -> np.ndarray:
+        """Convert PCM bytes or samples to float32 frames, carrying partial frames over (producer side)."""
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            # Only a carried-over partial frame forces a copy
+            data = self._partial + bytes(audio) if self._partial else audio
+            aligned = len(data) - len(data) % (2 * self.channels)
+            self._partial = bytes(data[aligned:])
+            audio = np.frombuffer(data, dtype=np.int16, count=aligned // 2).reshape(-1, self.channels)
+        
+        audio = np.asarray(audio)
+        if audio.dtype.kind in 'iu':
+            audio = audio.astype(np.float32) / 32768.0
+        else:
+            audio = audio.astype(np.float32, copy=False)
+        
+        if audio.ndim == 1:
+            audio = audio[:, None]
+        if audio.shape[1] not in (1, self.channels):
+            # Mix down; mono is broadcast to every output channel
+            audio = audio.mean(axis=1, keepdims=True)
+        return audio
+    
+    def _write(self, frames: np.ndarray) -> None:
+        """Copy frames that are known to fit, then publish them."""
+        storage = self.storage
+        capacity = len(storage)
+        count = len(frames)
+        start = self.write_index % capacity
+        first = min(count, capacity - start)
+        storage[start:start + first] = frames[:first]
+        storage[:count - first] = frames[first:]
+        self.write_index += count
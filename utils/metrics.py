@@ -0,0 +1,129 @@
+"""
+Lightweight in-process metrics.
+Thread-safe counters and latency histograms, collected in a process-wide registry.
+"""
+
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+# Latency buckets in seconds (upper bounds)
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5,
+    0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0
+)
+
+
+class Counter:
+    """Monotonic counter."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+    
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+    
+    Observations are counted per bucket, so memory stays constant however
+    many values are recorded. Percentiles are interpolated within a bucket.
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile.
+        
+        Args:
+            q: Percentile between 0 and 100
+        
+        Returns:
+            Estimated value (0.0 when empty)
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q / 100 * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                if count and seen + count >= rank:
+                    lower = self.buckets[index - 1] if index > 0 else self.min
+                    upper = self.buckets[index] if index < len(self.buckets) else self.max
+                    lower, upper = max(lower, self.min), min(upper, self.max)
+                    return lower + (upper - lower) * (rank - seen) / count
+                seen += count
+            return self.max
+    
+    def as_dict(self) -> dict:
+        """Summary statistics."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min or 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max or 0.0
+        }
+
+
+class MetricsRegistry:
+    """Named counters and histograms, created on first use."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+    
+    def counter(self, name: str) -> Counter:
+        """Get (or create) a counter."""
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+    
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get (or create) a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            return histogram
+    
+    def snapshot(self, prefix: str = "") -> dict:
+        """Current values of every metric whose name starts with ``prefix``."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        result = {name: c.value for name, c in counters.items() if name.startswith(prefix)}
+        result.update({name: h.as_dict() for name, h in histograms.items() if name.startswith(prefix)})
+        return result
+
+
+# Process-wide metrics
+metrics = MetricsRegistry()
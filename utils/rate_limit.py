@@ -0,0 +1,64 @@
+"""
+Per-provider rate limiting.
+Token buckets that callers on any thread can wait on before each request.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter with one bucket per key (e.g. per provider).
+    
+    Each bucket refills at ``rate`` tokens per second up to ``burst``.
+    ``acquire`` reserves tokens under a lock and then sleeps outside it, so
+    concurrent callers queue fairly and never hold each other up longer
+    than the rate requires.
+    """
+    
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated)
+        self.waited: Dict[str, float] = {}
+    
+    def acquire(self, key: str, tokens: float = 1) -> float:
+        """
+        Wait until ``tokens`` requests may be made for ``key``.
+        
+        Args:
+            key: Bucket name, such as the provider
+            tokens: Requests about to be made
+        
+        Returns:
+            Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = self.clock()
+            available, updated = self._buckets.get(key, (self.burst, now))
+            available = min(self.burst, available + (now - updated) * self.rate)
+            
+            # Reserve now; a negative balance is the queue of waiting callers
+            available -= tokens
+            self._buckets[key] = (available, now)
+            wait = -available / self.rate if available < 0 else 0.0
+            self.waited[key] = self.waited.get(key, 0.0) + wait
+        
+        if wait:
+            self.sleep(wait)
+        return wait
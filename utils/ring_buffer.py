@@ -0,0 +1,319 @@
+"""
+Preallocated audio buffers.
+Lets audio callbacks write captured blocks straight into NumPy storage.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class RecordingBuffer:
+    """
+    Preallocated, growable buffer for recorded audio frames.
+    
+    Blocks are copied straight into one NumPy array, so recording never
+    builds a list of chunks or concatenates them at the end. Without
+    ``max_frames`` the storage doubles when full; with ``max_frames`` it is
+    a ring that keeps the most recent audio and counts what was overwritten.
+    
+    One thread writes (the audio callback) and one thread may read
+    concurrently with ``read_since``: the writer copies data before it
+    publishes the new frame count, and the reader loads the count before
+    the storage, so it never sees frames that are not written yet.
+    """
+    
+    def __init__(
+        self,
+        initial_frames: int,
+        channels: int = 1,
+        dtype=np.float32,
+        max_frames: Optional[int] = None
+    ):
+        capacity = max(1, initial_frames)
+        if max_frames:
+            capacity = min(capacity, max_frames)
+        
+        self.channels = channels
+        self.max_frames = max_frames
+        self.storage = np.empty((capacity, channels), dtype=dtype)
+        
+        # Total frames ever written; the write position is this modulo capacity
+        self.total_frames = 0
+        
+        # Overflow counters (ring mode only)
+        self.overflow_frames = 0
+        self.overflow_events = 0
+    
+    @property
+    def capacity(self) -> int:
+        """Frames the current storage can hold."""
+        return len(self.storage)
+    
+    @property
+    def frames(self) -> int:
+        """Frames currently held."""
+        return min(self.total_frames, self.capacity)
+    
+    @property
+    def wrapped(self) -> bool:
+        """Whether old audio has been overwritten."""
+        return self.total_frames > self.capacity
+    
+    def write(self, block: np.ndarray) -> None:
+        """
+        Copy a block of frames into the buffer.
+        
+        Args:
+            block: Array of shape (frames, channels) or (frames,)
+        """
+        block = block.reshape(-1, self.channels)
+        count = len(block)
+        if count == 0:
+            return
+        
+        if self.total_frames + count > self.capacity and not self._grow(self.total_frames + count):
+            self._write_ring(block)
+        else:
+            start = self.total_frames
+            self.storage[start:start + count] = block
+        
+        self.total_frames += count
+    
+    def view(self) -> np.ndarray:
+        """
+        Get the recorded audio.
+        
+        Returns a zero-copy view of the storage unless the ring has wrapped,
+        in which case the two halves are joined into a new array.
+        """
+        return self._span(self.total_frames - self.frames, self.total_frames)
+    
+    def read_since(self, position: int) -> Tuple[np.ndarray, int]:
+        """
+        Read frames written after an absolute position.
+        
+        Args:
+            position: Total frame count at the previous read
+        
+        Returns:
+            (frames, new position). Frames that were overwritten before they
+            could be read are skipped.
+        """
+        end = self.total_frames
+        start = max(position, end - self.capacity)
+        return self._span(start, end), end
+    
+    def tail(self, frames: int) -> np.ndarray:
+        """Get up to the last ``frames`` frames."""
+        end = self.total_frames
+        return self._span(max(end - frames, end - self.frames), end)
+    
+    def _span(self, start: int, end: int) -> np.ndarray:
+        """Get absolute frames [start, end) from the storage."""
+        storage = self.storage
+        capacity = len(storage)
+        if end <= capacity:
+            return storage[start:end]
+        
+        first = start % capacity
+        last = first + (end - start)
+        if last <= capacity:
+            return storage[first:last]
+        return np.concatenate((storage[first:], storage[:last - capacity]))
+    
+    def _grow(self, needed: int) -> bool:
+        """Enlarge the storage to hold ``needed`` frames, if allowed."""
+        if self.wrapped:
+            return False
+        
+        capacity = self.capacity
+        if self.max_frames and capacity >= self.max_frames:
+            return False
+        
+        while capacity < needed:
+            capacity *= 2
+        if self.max_frames:
+            capacity = min(capacity, self.max_frames)
+        
+        storage = np.empty((capacity, self.channels), dtype=self.storage.dtype)
+        storage[:self.total_frames] = self.storage[:self.total_frames]
+        self.storage = storage
+        return capacity >= needed
+    
+    def _write_ring(self, block: np.ndarray) -> None:
+        """Write into the ring, overwriting the oldest frames."""
+        capacity = self.capacity
+        count = len(block)
+        position = self.total_frames
+        
+        lost = max(0, position + count - capacity) - max(0, position - capacity)
+        if lost:
+            self.overflow_frames += lost
+            self.overflow_events += 1
+        
+        if count > capacity:
+            # Only the newest frames of an oversized block survive
+            position += count - capacity
+            block = block[-capacity:]
+            count = capacity
+        
+        start = position % capacity
+        first = min(count, capacity - start)
+        self.storage[start:start + first] = block[:first]
+        self.storage[:count - first] = block[first:]
+
+
+class SPSCRingBuffer:
+    """
+    Fixed-size single-producer/single-consumer ring for handing audio from
+    a real-time callback to another thread.
+    
+    The producer only advances ``write_index`` and the consumer only
+    advances ``read_index``, each after it has finished with the storage,
+    so neither side takes a lock. ``write`` copies into preallocated
+    storage and never waits: if the consumer has fallen so far behind that
+    a block does not fit, the block is dropped and counted instead.
+    """
+    
+    def __init__(self, capacity_frames: int, channels: int = 1, dtype=np.float32):
+        self.channels = channels
+        self.storage = np.empty((max(1, capacity_frames), channels), dtype=dtype)
+        
+        # Total frames written and read; positions are these modulo capacity
+        self.write_index = 0
+        self.read_index = 0
+        
+        # Blocks the producer could not fit (producer-owned)
+        self.dropped_frames = 0
+        self.dropped_blocks = 0
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.storage)
+    
+    @property
+    def available(self) -> int:
+        """Frames waiting to be read."""
+        return self.write_index - self.read_index
+    
+    def write(self, block: np.ndarray) -> bool:
+        """
+        Copy a block in (producer side).
+        
+        Args:
+            block: Array of shape (frames, channels) or (frames,)
+        
+        Returns:
+            False if the block was dropped because the ring is full
+        """
+        if block.ndim == 1:
+            block = block.reshape(-1, self.channels)
+        count = len(block)
+        storage = self.storage
+        capacity = len(storage)
+        position = self.write_index
+        
+        if count > capacity - (position - self.read_index):
+            self.dropped_frames += count
+            self.dropped_blocks += 1
+            return False
+        
+        start = position % capacity
+        first = min(count, capacity - start)
+        storage[start:start + first] = block[:first]
+        if first < count:
+            storage[:count - first] = block[first:]
+        
+        # Publish only after the frames are in place
+        self.write_index = position + count
+        return True
+    
+    def read(self, max_frames: Optional[int] = None) -> np.ndarray:
+        """
+        Take frames out (consumer side).
+        
+        Args:
+            max_frames: Most frames to return (default: all available)
+        
+        Returns:
+            A new array of shape (frames, channels), possibly empty
+        """
+        position = self.read_index
+        count = self.write_index - position
+        if max_frames is not None:
+            count = min(count, max_frames)
+        
+        storage = self.storage
+        capacity = len(storage)
+        start = position % capacity
+        first = min(count, capacity - start)
+        if first == count:
+            frames = storage[start:start + count].copy()
+        else:
+            frames = np.concatenate((storage[start:], storage[:count - first]))
+        
+        # Release the space only after copying out of it
+        self.read_index = position + count
+        return frames
+    
+    def clear(self) -> None:
+        """Discard unread frames (consumer side)."""
+        self.read_index = self.write_index
+
+
+class CallbackStats:
+    """
+    Counters updated from inside a real-time audio callback.
+    
+    ``record`` only does arithmetic on plain attributes (no locks, no
+    logging, no I/O), so it cannot stall the audio thread. Only the callback
+    writes; other threads read values that may be one block out of date.
+    """
+    
+    FLAGS = ('input_overflow', 'input_underflow', 'output_overflow', 'output_underflow')
+    
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.callbacks = 0
+        self.frames = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+        self.late = 0  # Callbacks that took longer than their block lasts
+        self.flags = dict.fromkeys(self.FLAGS, 0)
+    
+    def record(self, frames: int, started: float, status=None) -> None:
+        """
+        Count one callback.
+        
+        Args:
+            frames: Frames in the block
+            started: ``time.perf_counter()`` at callback entry
+            status: sounddevice CallbackFlags, if any
+        """
+        elapsed = time.perf_counter() - started
+        self.callbacks += 1
+        self.frames += frames
+        self.busy_seconds += elapsed
+        if elapsed > self.max_seconds:
+            self.max_seconds = elapsed
+        if elapsed * self.sample_rate > frames:
+            self.late += 1
+        
+        if status:
+            for flag in self.FLAGS:
+                if getattr(status, flag, False):
+                    self.flags[flag] += 1
+    
+    def as_dict(self) -> dict:
+        """Summary for logging or ``get_stats``."""
+        audio_seconds = self.frames / self.sample_rate
+        return {
+            'callbacks': self.callbacks,
+            'mean_callback_ms': 1000 * self.busy_seconds / self.callbacks if self.callbacks else 0.0,
+            'max_callback_ms': 1000 * self.max_seconds,
+            'callback_load': self.busy_seconds / audio_seconds if audio_seconds else 0.0,
+            'late_callbacks': self.late,
+            **self.flags
+        }
@@ -0,0 +1,188 @@
+"""
+Just-in-time TTS scheduling.
+Starts synthesis of each segment only as far ahead of playback as needed,
+using speaking-time estimates calibrated from the audio actually produced.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+from utils.helpers import calculate_speaking_time
+
+
+class SpeakingRateModel:
+    """
+    Words-per-minute model of synthesized speech, per voice and speed.
+    
+    Starts from ``words_per_minute`` scaled by the speed and is calibrated
+    online: every completed clip updates an exponential moving average of
+    the rate for its voice and speed. A speed not yet heard for a voice is
+    estimated from that voice's rate at another speed.
+    """
+    
+    def __init__(self, words_per_minute: float = 150.0, smoothing: float = 0.3):
+        self.default_wpm = words_per_minute
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._rates: Dict[Tuple[str, float], float] = {}
+        self._samples: Dict[Tuple[str, float], int] = {}
+    
+    def words_per_minute(self, voice: str, speed: float = 1.0) -> float:
+        """Current rate estimate for a voice and speed."""
+        with self._lock:
+            rate = self._rates.get((voice, speed))
+            if rate is not None:
+                return rate
+            
+            # Scale the most calibrated speed of this voice
+            known = [(count, key) for key, count in self._samples.items() if key[0] == voice]
+            if known:
+                _, (_, base_speed) = max(known)
+                return self._rates[(voice, base_speed)] * speed / base_speed
+        return self.default_wpm * speed
+    
+    def estimate(self, text: str, voice: str, speed: float = 1.0) -> float:
+        """Estimated seconds of speech for ``text``."""
+        return calculate_speaking_time(text, self.words_per_minute(voice, speed))
+    
+    def observe(self, text: str, voice: str, speed: float, seconds: float) -> None:
+        """
+        Calibrate with the length of a synthesized clip.
+        
+        Args:
+            text: Text that was synthesized
+            voice: Voice it was spoken in
+            speed: Speaking speed it was requested at
+            seconds: Length of the complete audio
+        """
+        words = len(text.split())
+        if not words or seconds <= 0:
+            return
+        rate = words / seconds * 60
+        
+        key = (voice, speed)
+        with self._lock:
+            previous = self._rates.get(key)
+            self._rates[key] = rate if previous is None else previous + self.smoothing * (rate - previous)
+            self._samples[key] = self._samples.get(key, 0) + 1
+    
+    def get_stats(self) -> dict:
+        """Get the calibrated rate and clip count per ``voice@speed``."""
+        with self._lock:
+            return {
+                f"{voice}@{speed:g}": {'words_per_minute': rate, 'clips': self._samples[(voice, speed)]}
+                for (voice, speed), rate in self._rates.items()
+            }
+
+
+class SynthesisScheduler:
+    """
+    Keeps synthesis just far enough ahead of playback.
+    
+    Tracks the speech queued for the listener in the current response:
+    exact lengths for clips that have finished arriving and model estimates
+    for those still synthesizing. The next segment should start once the
+    unplayed remainder drops to the lead time, which is the smoothed time
+    from request to first audio plus a safety margin. Starting earlier
+    only spends synthesis on text an interrupt may discard; starting
+    later leaves a gap.
+    """
+    
+    def __init__(
+        self,
+        model: SpeakingRateModel,
+        voice: str,
+        speed: float = 1.0,
+        first_audio: float = 0.5,
+        margin: float = 0.3,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.model = model
+        self.voice = voice
+        self.speed = speed
+        self.first_audio = first_audio
+        self.margin = margin
+        self.smoothing = smoothing
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._segments: Dict[int, list] = {}  # id -> [text, estimate, received seconds, started, done]
+        self._next_id = 0
+        self._played_base = 0.0
+    
+    @property
+    def lead_time(self) -> float:
+        """Seconds of unplayed speech at which the next synthesis starts."""
+        return self.first_audio + self.margin
+    
+    def reset(self, played: float = 0.0) -> None:
+        """Start a new response; ``played`` is the output's current played time."""
+        with self._lock:
+            self._segments.clear()
+            self._played_base = played
+    
+    def start(self, text: str) -> int:
+        """Record that synthesis of ``text`` is starting; returns its segment id."""
+        with self._lock:
+            segment = self._next_id
+            self._next_id += 1
+            estimate = self.model.estimate(text, self.voice, self.speed)
+            self._segments[segment] = [text, estimate, 0.0, self.clock(), False]
+            return segment
+    
+    def received(self, segment: int, seconds: float, calibrate: bool = True) -> None:
+        """
+        Record ``seconds`` of audio arriving for a segment.
+        
+        Args:
+            segment: Id from ``start``
+            seconds: Length of the audio that arrived
+            calibrate: False if the audio did not come from a request (a
+                cache hit), so its arrival says nothing about the time to
+                first audio
+        """
+        with self._lock:
+            state = self._segments.get(segment)
+            if state is None:
+                return
+            if state[2] == 0 and seconds > 0 and calibrate:
+                latency = self.clock() - state[3]
+                self.first_audio += self.smoothing * (latency - self.first_audio)
+            state[2] += seconds
+    
+    def finish(self, segment: int, complete: bool = True) -> None:
+        """
+        Record that a segment's audio has fully arrived.
+        
+        Args:
+            segment: Id from ``start``
+            complete: False if synthesis was abandoned or failed, so its
+                length is not used for calibration
+        """
+        with self._lock:
+            state = self._segments.get(segment)
+            if state is None:
+                return
+            state[4] = True
+            text, received = state[0], state[2]
+        
+        if complete:
+            self.model.observe(text, self.voice, self.speed, received)
+    
+    def queued_seconds(self) -> float:
+        """Speech queued in this response: actual lengths where known, else estimates."""
+        with self._lock:
+            return sum(
+                received if done else max(estimate, received)
+                for _, estimate, received, _, done in self._segments.values()
+            )
+    
+    def remaining(self, played: float) -> float:
+        """Unplayed seconds of queued speech, given the output's played time."""
+        return max(0.0, self.queued_seconds() - (played - self._played_base))
+    
+    def delay(self, played: float) -> float:
+        """Seconds to wait before starting the next segment (0 = start now)."""
+        return max(0.0, self.remaining(played) - self.lead_time)
@@ -0,0 +1,150 @@
+"""
+Streaming sentence segmenter for TTS.
+Groups LLM tokens into synthesis requests, favouring a quick first clause.
+"""
+
+import time
+from typing import Callable, List, Optional
+
+from utils.helpers import chunk_spans, find_clause_ends, find_sentence_ends
+
+
+class SentenceSegmenter:
+    """
+    Incrementally splits streamed text into TTS-sized segments.
+    
+    The first segment is cut at the earliest sentence or clause boundary
+    past ``first_min_chars`` so audio can start quickly. Later segments pack
+    as many whole sentences as fit in ``max_chars`` once ``min_chars`` are
+    buffered, which keeps the number of TTS requests down while earlier
+    audio is playing. If text has been pending for ``deadline`` seconds it
+    is cut at the best boundary available, and text without any boundary is
+    split at word boundaries once it exceeds ``max_chars``.
+    """
+    
+    def __init__(
+        self,
+        first_min_chars: int = 20,
+        min_chars: int = 60,
+        max_chars: int = 250,
+        deadline: float = 0.6,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.first_min_chars = first_min_chars
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.deadline = deadline
+        self.clock = clock
+        
+        self.buffer = ""
+        self.pending_since: Optional[float] = None
+        self.overdue = False
+        self.segments_emitted = 0
+    
+    def push(self, text: str) -> List[str]:
+        """
+        Add streamed text.
+        
+        Args:
+            text: Next token or text fragment
+        
+        Returns:
+            Segments that are ready for synthesis
+        """
+        if self.pending_since is None and text.strip():
+            self.pending_since = self.clock()
+        self.buffer += text
+        return self._drain(final=False)
+    
+    def poll(self) -> List[str]:
+        """Check the deadline without new text (call while the stream is idle)."""
+        return self._drain(final=False)
+    
+    def flush(self) -> List[str]:
+        """Return everything still buffered at the end of the stream."""
+        segments = self._drain(final=True)
+        self.reset()
+        return segments
+    
+    def reset(self) -> None:
+        """Discard buffered text and start a new response."""
+        self.buffer = ""
+        self.pending_since = None
+        self.overdue = False
+        self.segments_emitted = 0
+    
+    def time_to_deadline(self) -> Optional[float]:
+        """
+        Seconds until pending text is due.
+        
+        Returns None if nothing is pending, or if the deadline already passed
+        without a usable boundary (the next push will cut as soon as it can).
+        """
+        if self.pending_since is None or self.overdue:
+            return None
+        return max(0.0, self.pending_since + self.deadline - self.clock())
+    
+    def _drain(self, final: bool) -> List[str]:
+        """Cut as many segments from the buffer as the rules allow."""
+        segments = []
+        
+        while self.buffer.strip():
+            cut = self._find_cut(final)
+            if cut is None:
+                break
+            
+            segment = self.buffer[:cut].strip()
+            self.buffer = self.buffer[cut:].lstrip()
+            self.pending_since = self.clock() if self.buffer.strip() else None
+            self.overdue = False
+            
+            if segment:
+                segments.append(segment)
+                self.segments_emitted += 1
+        
+        if not self.buffer.strip():
+            self.buffer = ""
+            self.pending_since = None
+        elif self._deadline_passed():
+            self.overdue = True
+        
+        return segments
+    
+    def _find_cut(self, final: bool) -> Optional[int]:
+        """Return the buffer offset to cut the next segment at, if any."""
+        text = self.buffer
+        sentence_ends = [end for end in find_sentence_ends(text) if end <= self.max_chars]
+        
+        if self.segments_emitted == 0:
+            # First segment: earliest natural pause past the minimum
+            boundaries = sorted(sentence_ends + find_clause_ends(text[:self.max_chars]))
+            for end in boundaries:
+                if end >= self.first_min_chars:
+                    return end
+        else:
+            # Later segments: as many whole sentences as fit
+            if sentence_ends and sentence_ends[-1] >= self.min_chars:
+                return sentence_ends[-1]
+        
+        if len(text) > self.max_chars:
+            # No usable boundary within the limit, so split between words
+            return chunk_spans(text, self.max_chars)[0][1]
+        
+        if final:
+            return len(text)
+        
+        if self._deadline_passed():
+            # Prefer whole sentences, then clauses
+            boundaries = sentence_ends or find_clause_ends(text)
+            if boundaries:
+                return boundaries[-1]
+            # Fall back to the last complete word
+            last_space = text.rstrip().rfind(" ")
+            if last_space > 0:
+                return last_space
+        
+        return None
+    
+    def _deadline_passed(self) -> bool:
+        """Whether pending text has waited longer than the deadline."""
+        return self.pending_since is not None and self.clock() - self.pending_since >= self.deadline
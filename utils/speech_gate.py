@@ -0,0 +1,262 @@
+"""
+Local speech-presence gate.
+Rejects recordings without speech before they are sent for transcription,
+and finds pauses to split long recordings at.
+"""
+
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.wav import to_pcm16
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+
+class GateResult(NamedTuple):
+    """Outcome of checking one recording."""
+    has_speech: bool
+    start: int  # First frame to keep
+    end: int  # Frame after the last one to keep
+    voiced_seconds: float
+    reason: str
+
+
+class SpeechGate:
+    """
+    Decides whether a recording contains speech and trims the silence.
+    
+    The recording is split into 30 ms blocks. A block is voiced when its
+    energy clears both ``min_level`` and ``snr`` times the recording's own
+    noise floor (its quietest blocks), and webrtcvad, when installed, agrees.
+    The floor-based threshold is capped at ``max_threshold`` so recordings
+    that are speech from end to end still pass.
+    Recordings with less than ``min_voiced_seconds`` of voiced audio are
+    rejected; the rest are trimmed to the voiced region plus ``padding``.
+    """
+    
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        min_voiced_seconds: float = 0.25,
+        min_level: float = 1e-4,
+        snr: float = 4.0,
+        max_threshold: float = 1e-3,
+        padding_seconds: float = 0.2,
+        vad_aggressiveness: Optional[int] = 2
+    ):
+        self.sample_rate = sample_rate
+        self.block = int(sample_rate * 0.03)
+        self.min_voiced_seconds = min_voiced_seconds
+        self.min_level = min_level
+        self.snr = snr
+        self.max_threshold = max_threshold
+        self.padding = int(sample_rate * padding_seconds)
+        
+        self.vad = None
+        if webrtcvad is not None and vad_aggressiveness is not None and sample_rate in (8000, 16000, 32000, 48000):
+            self.vad = webrtcvad.Vad(vad_aggressiveness)
+        
+        # Statistics
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.rejected = 0
+        self.seconds_checked = 0.0
+        self.seconds_rejected = 0.0
+        self.seconds_trimmed = 0.0
+    
+    def check(self, audio: np.ndarray, streamed: bool = False) -> GateResult:
+        """
+        Check a recording for speech.
+        
+        Args:
+            audio: Samples, shape (frames,) or (frames, channels)
+            streamed: The recording was already uploaded while it was
+                captured, so skipping or trimming it saves nothing
+        
+        Returns:
+            GateResult with the frame range worth uploading
+        """
+        result = self._analyze(audio)
+        self._record(len(audio), result, streamed)
+        return result
+    
+    def trim(self, audio: np.ndarray, streamed: bool = False) -> Optional[np.ndarray]:
+        """
+        Get the part of a recording worth transcribing.
+        
+        Args:
+            audio: Samples, shape (frames,) or (frames, channels)
+            streamed: As for ``check``
+        
+        Returns:
+            A view of ``audio`` without leading and trailing silence, or
+            None if it contains no speech
+        """
+        result = self.check(audio, streamed)
+        if not result.has_speech:
+            return None
+        return audio[result.start:result.end]
+    
+    def get_stats(self) -> dict:
+        """Get how many transcription calls and seconds the gate saved."""
+        with self._lock:
+            return {
+                'checked': self.checked,
+                'calls_saved': self.rejected,
+                'seconds_checked': self.seconds_checked,
+                'seconds_saved': self.seconds_rejected + self.seconds_trimmed,
+                'seconds_trimmed': self.seconds_trimmed
+            }
+    
+    def split(
+        self,
+        audio: np.ndarray,
+        max_seconds: float,
+        overlap_seconds: float = 0.5,
+        min_pause_seconds: float = 0.15
+    ) -> List[Tuple[int, int]]:
+        """
+        Split a long recording into segments, preferring silent points.
+        
+        Each cut is placed in the middle of the longest unvoiced run in the
+        second half of the allowed segment length. Where there is no pause
+        of at least ``min_pause_seconds``, the segment is cut at
+        ``max_seconds`` and the next one starts ``overlap_seconds`` earlier
+        so no word is lost.
+        
+        Args:
+            audio: Samples, shape (frames,) or (frames, channels)
+            max_seconds: Longest segment
+            overlap_seconds: Overlap used at cuts without a pause
+            min_pause_seconds: Shortest unvoiced run to cut in
+        
+        Returns:
+            (start, end) frame ranges in order; consecutive ranges overlap
+            only where no pause was found
+        """
+        total = len(audio)
+        max_frames = int(max_seconds * self.sample_rate)
+        if total <= max_frames:
+            return [(0, total)]
+        
+        voiced = self._classify(self._mono(audio))[0]
+        overlap = int(overlap_seconds * self.sample_rate)
+        min_pause = max(1, int(min_pause_seconds * self.sample_rate) // self.block)
+        block = self.block
+        segments = []
+        start = 0
+        
+        while total - start > max_frames:
+            # Candidate blocks for the cut: second half of the allowed length
+            first = (start + max_frames // 2) // block
+            last = min(len(voiced), (start + max_frames) // block)
+            cut = self._longest_pause(voiced, first, last, min_pause)
+            
+            if cut is None:
+                end = start + max_frames
+                segments.append((start, end))
+                start = end - overlap
+            else:
+                end = cut * block
+                segments.append((start, end))
+                start = end
+        
+        segments.append((start, total))
+        return segments
+    
+    @staticmethod
+    def _longest_pause(voiced: np.ndarray, first: int, last: int, min_length: int) -> Optional[int]:
+        """Middle block of the longest unvoiced run in voiced[first:last], if long enough."""
+        best_length, best_middle = min_length - 1, None
+        run_start = None
+        
+        for index in range(first, last + 1):
+            if index < last and not voiced[index]:
+                if run_start is None:
+                    run_start = index
+                continue
+            if run_start is not None:
+                length = index - run_start
+                if length > best_length:
+                    best_length, best_middle = length, run_start + length // 2
+                run_start = None
+        
+        return best_middle
+    
+    @staticmethod
+    def _mono(audio: np.ndarray) -> np.ndarray:
+        """Collapse (frames, channels) audio to one channel."""
+        audio = np.asarray(audio)
+        if audio.ndim == 2:
+            return audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1)
+        return audio
+    
+    def _classify(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify 30 ms blocks of mono audio.
+        
+        Returns:
+            (voiced flag per block, energy per block)
+        """
+        count = len(audio) // self.block
+        if count == 0:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.float32)
+        
+        blocks = audio[:count * self.block].reshape(count, self.block)
+        if blocks.dtype.kind in 'iu':
+            blocks = blocks.astype(np.float32) / 32768.0
+        else:
+            blocks = blocks.astype(np.float32, copy=False)
+        energies = np.einsum('ij,ij->i', blocks, blocks) / self.block
+        
+        if energies.max() < self.min_level:
+            return np.zeros(count, dtype=bool), energies
+        
+        noise_floor = float(np.percentile(energies, 10))
+        threshold = max(self.min_level, min(noise_floor * self.snr, self.max_threshold))
+        voiced = energies >= threshold
+        
+        if self.vad is not None:
+            for index in np.flatnonzero(voiced):
+                pcm = to_pcm16(blocks[index]).tobytes()
+                voiced[index] = self.vad.is_speech(pcm, self.sample_rate)
+        
+        return voiced, energies
+    
+    def _analyze(self, audio: np.ndarray) -> GateResult:
+        """Classify blocks and find the voiced region."""
+        audio = self._mono(audio)
+        voiced, energies = self._classify(audio)
+        
+        if len(voiced) == 0:
+            return GateResult(False, 0, 0, 0.0, "too short")
+        if energies.max() < self.min_level:
+            return GateResult(False, 0, 0, 0.0, "silent")
+        
+        voiced_seconds = int(voiced.sum()) * self.block / self.sample_rate
+        if voiced_seconds < self.min_voiced_seconds:
+            return GateResult(False, 0, 0, voiced_seconds, "not enough speech")
+        
+        indices = np.flatnonzero(voiced)
+        start = max(0, int(indices[0]) * self.block - self.padding)
+        end = min(len(audio), (int(indices[-1]) + 1) * self.block + self.padding)
+        return GateResult(True, start, end, voiced_seconds, "speech")
+    
+    def _record(self, frames: int, result: GateResult, streamed: bool) -> None:
+        """Update statistics for one checked recording."""
+        seconds = frames / self.sample_rate
+        with self._lock:
+            self.checked += 1
+            self.seconds_checked += seconds
+            if streamed:
+                return
+            if result.has_speech:
+                self.seconds_trimmed += (frames - (result.end - result.start)) / self.sample_rate
+            else:
+                self.rejected += 1
+                self.seconds_rejected += seconds
@@ -0,0 +1,195 @@
+"""
+Time-stretching for speech playback.
+Changes the speaking rate of audio without changing its pitch (WSOLA), so
+one synthesized clip can be played at any speed.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Same range the TTS speed parameter accepts
+MIN_RATE = 0.25
+MAX_RATE = 4.0
+
+
+class TimeStretcher:
+    """
+    Streaming WSOLA (waveform similarity overlap-add) time-stretcher.
+    
+    Output is built from Hann-windowed frames overlapping by half. Each
+    frame is read from the input at its nominal position (advancing by
+    ``rate`` times the output hop) shifted by up to ``tolerance_ms`` to
+    the offset whose waveform best matches the natural continuation of the
+    previous frame, so pitch periods line up and no phase artifacts are
+    heard. The offset search is one matrix-vector product over all
+    candidate windows, and overlap-add is done for every frame of a chunk
+    at once.
+    
+    ``rate`` may be changed at any time and applies from the next frame.
+    At rate 1.0 with nothing buffered, audio passes through untouched.
+    """
+    
+    def __init__(self, sample_rate: int = 24000, rate: float = 1.0, frame_ms: float = 20.0, tolerance_ms: float = 5.0):
+        self.sample_rate = sample_rate
+        self.frame = 2 * int(sample_rate * frame_ms / 2000)
+        self.hop = self.frame // 2
+        self.tolerance = int(sample_rate * tolerance_ms / 1000)
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(self.frame) / self.frame)).astype(np.float32)[:, None]
+        self._offsets = np.arange(self.frame)
+        self.rate = rate
+        self.reset()
+    
+    @property
+    def rate(self) -> float:
+        """Playback speed: 2.0 plays twice as fast, 0.5 half as fast."""
+        return self._rate
+    
+    @rate.setter
+    def rate(self, value: float) -> None:
+        self._rate = min(max(float(value), MIN_RATE), MAX_RATE)
+    
+    @property
+    def active(self) -> bool:
+        """Whether a clip is part-way through the stretcher."""
+        return self._input is not None
+    
+    def reset(self) -> None:
+        """Drop buffered input and start the next clip afresh."""
+        self._input = None  # (samples, channels) starting at absolute position _start
+        self._start = 0
+        self._position = 0.0  # Nominal input position of the next frame
+        self._previous = None  # Input position the last frame was read from
+        self._tail = None  # Second half of the last frame, to overlap with the next
+        self._skip = 0
+        self._expected = 0.0  # Output length the input so far should stretch to
+        self._produced = 0
+    
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Stretch the next chunk of a clip.
+        
+        Args:
+            audio: float32 samples, shape (frames,) or (frames, channels)
+        
+        Returns:
+            Stretched samples of shape (frames, channels); about one frame
+            of input is held back until more arrives or ``flush``
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim == 1:
+            audio = audio[:, None]
+        
+        if not self.active:
+            if self._rate == 1.0:
+                return audio
+            # Lead with half a frame of silence so the first frame's full
+            # weight lands on the first sample; that half is not output
+            self._input = np.concatenate([np.zeros((self.hop, audio.shape[1]), np.float32), audio])
+            self._tail = np.zeros((self.hop, audio.shape[1]), np.float32)
+            self._skip = self.hop
+        else:
+            self._input = np.concatenate([self._input, audio])
+        
+        self._expected += len(audio) / self._rate
+        return self._emit(self._run())
+    
+    def flush(self) -> np.ndarray:
+        """
+        Finish the clip: return the remaining output and reset.
+        
+        Returns:
+            The rest of the stretched clip, shape (frames, channels)
+        """
+        if not self.active:
+            return np.zeros((0, 1), np.float32)
+        
+        # Enough frames that, with the last frame's tail, the output reaches its expected length
+        owed = max(int(round(self._expected)) - self._produced, 0)
+        frames = math.ceil(max(owed + self._skip - self.hop, 0) / self.hop)
+        
+        # Pad with silence so the frames that cover the end can be read
+        channels = self._input.shape[1]
+        needed = math.ceil(self._position + frames * self.hop * self._rate) + self.tolerance + self.frame + self.hop
+        padding = max(needed - (self._start + len(self._input)), 0)
+        self._input = np.concatenate([self._input, np.zeros((padding, channels), np.float32)])
+        
+        out = self._emit(np.concatenate([self._run(frames), self._tail]))[:owed]
+        self.reset()
+        return out
+    
+    def _run(self, max_frames: Optional[int] = None) -> np.ndarray:
+        """Produce as many frames as the buffered input allows (one hop of output each)."""
+        x = self._input
+        base = self._start
+        end = base + len(x)
+        frame, hop, tolerance = self.frame, self.hop, self.tolerance
+        mono = x[:, 0] if x.shape[1] == 1 else x.sum(axis=1)
+        starts = []
+        
+        while max_frames is None or len(starts) < max_frames:
+            nominal = int(round(self._position))
+            low = max(nominal - tolerance, base)
+            high = nominal + tolerance
+            if high + frame > end:
+                break
+            
+            if self._previous is None:
+                best = nominal
+            else:
+                natural = self._previous + hop
+                if natural + frame > end:
+                    break
+                # Correlate every candidate window with the natural continuation
+                template = mono[natural - base:natural - base + frame]
+                candidates = sliding_window_view(mono[low - base:high - base + frame], frame)
+                best = low + int(np.argmax(candidates @ template))
+            
+            starts.append(best)
+            self._previous = best
+            self._position += hop * self._rate
+        
+        if not starts:
+            return np.zeros((0, x.shape[1]), np.float32)
+        
+        # Overlap-add all frames at once: each output hop is a frame's first
+        # half plus the previous frame's second half
+        frames = x[np.asarray(starts)[:, None] - base + self._offsets] * self.window
+        out = frames[:, :hop].copy()
+        out[0] += self._tail
+        out[1:] += frames[:-1, hop:]
+        self._tail = frames[-1, hop:].copy()
+        
+        # Keep only the input later frames can still read
+        keep = max(min(self._previous + hop, int(self._position) - tolerance), base)
+        self._input = x[keep - base:]
+        self._start = keep
+        return out.reshape(-1, x.shape[1])
+    
+    def _emit(self, out: np.ndarray) -> np.ndarray:
+        """Drop the lead-in silence and count what is output."""
+        if self._skip:
+            dropped = min(self._skip, len(out))
+            out = out[dropped:]
+            self._skip -= dropped
+        self._produced += len(out)
+        return out
+
+
+def time_stretch(audio: np.ndarray, rate: float, sample_rate: int = 24000) -> np.ndarray:
+    """
+    Change the speed of a whole clip without changing its pitch.
+    
+    Args:
+        audio: float32 samples, shape (frames,) or (frames, channels)
+        rate: Playback speed (2.0 is twice as fast)
+        sample_rate: Samples per second
+    
+    Returns:
+        Stretched samples, shaped like ``audio``
+    """
+    stretcher = TimeStretcher(sample_rate, rate)
+    out = np.concatenate([stretcher.process(audio), stretcher.flush()])
+    return out[:, 0] if np.ndim(audio) == 1 else out
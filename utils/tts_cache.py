@@ -0,0 +1,200 @@
+"""
+Synthesized speech cache.
+Keeps TTS audio for repeated sentences in a memory LRU and an on-disk
+tier, keyed by everything that affects the audio.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Text as it affects synthesis: Unicode-normalized with whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(text: str, model: str, voice: str, speed: float = 1.0, response_format: str = "pcm") -> str:
+    """Content address of a synthesized sentence."""
+    identity = "\x1f".join((model, voice, f"{speed:g}", response_format, normalize_text(text)))
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized audio.
+    
+    The memory tier is an LRU bounded by ``memory_bytes``. The disk tier
+    keeps one file per clip under ``disk_dir``, bounded by ``disk_bytes``
+    and evicted least recently used first (by modification time, which is
+    refreshed on every hit). Disk hits are read into the memory tier.
+    
+    The disk tier is best effort: if the directory cannot be created or
+    written (read-only, full disk), the error is logged once and the cache
+    carries on in memory only.
+    """
+    
+    def __init__(self, memory_bytes: int = 16 << 20, disk_dir: Optional[str] = None, disk_bytes: int = 256 << 20):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.disk_dir = Path(disk_dir).expanduser() if disk_dir else None
+        
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = 0
+        if self.disk_dir:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_size = sum(size for _, size, _ in self._disk_files(self.disk_dir))
+            except OSError as e:
+                self._disable_disk(e)
+        
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a clip.
+        
+        Returns:
+            The audio, or None on a miss
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, data)
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        """Store a clip in both tiers."""
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, bytes(data))
+        if self.disk_dir:
+            try:
+                self._write_disk(key, data)
+            except OSError as e:
+                self._disable_disk(e)
+    
+    def get_stats(self) -> dict:
+        """Get hit, miss and eviction counts and tier sizes."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_evictions': self.memory_evictions,
+                'disk_evictions': self.disk_evictions,
+                'memory_bytes': self._memory_size,
+                'disk_bytes': self._disk_size
+            }
+    
+    def _remember(self, key: str, data: bytes) -> None:
+        """Add to the memory tier and evict down to its limit (lock held)."""
+        if len(data) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.memory_evictions += 1
+    
+    @staticmethod
+    def _path(disk_dir: Path, key: str) -> Path:
+        return disk_dir / key[:2] / f"{key}.pcm"
+    
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """Read a clip from the disk tier, if present."""
+        disk_dir = self.disk_dir
+        if not disk_dir:
+            return None
+        path = self._path(disk_dir, key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            # Missing or unreadable: a miss
+            return None
+        return data or None
+    
+    @staticmethod
+    def _disk_files(disk_dir: Path) -> list:
+        """(mtime, size, path) of every clip on disk, skipping files deleted meanwhile."""
+        files = []
+        for path in disk_dir.glob("*/*.pcm"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+    
+    def _disable_disk(self, error: OSError) -> None:
+        """Fall back to memory-only caching after a disk error."""
+        with self._lock:
+            if self.disk_dir is not None:
+                logger.warning(f"TTS disk cache disabled ({self.disk_dir}): {error}")
+                self.disk_dir = None
+    
+    def _write_disk(self, key: str, data: bytes) -> None:
+        """Write a clip atomically, then evict the least recently used files over the limit."""
+        disk_dir = self.disk_dir
+        if not disk_dir:
+            return
+        path = self._path(disk_dir, key)
+        path.parent.mkdir(exist_ok=True)
+        existing = path.stat().st_size if path.exists() else 0
+        
+        temporary = path.with_suffix(f".tmp{threading.get_ident()}")
+        try:
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            raise
+        
+        with self._lock:
+            self._disk_size += len(data) - existing
+            if self._disk_size <= self.disk_bytes:
+                return
+            
+            for _, size, old in sorted(self._disk_files(disk_dir)):
+                if self._disk_size <= self.disk_bytes:
+                    break
+                if old == path:
+                    continue
+                old.unlink(missing_ok=True)
+                self._disk_size -= size
+                self.disk_evictions += 1
@@ -0,0 +1,156 @@
+"""
+WAV container helpers.
+Builds RIFF/WAVE headers for 16-bit PCM audio held in memory and serves
+WAV files straight from NumPy arrays, without temp files or copies.
+"""
+
+import io
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Size used in the header when the data length is not known up front
+STREAMING_SIZE = 0xFFFFFFFF
+
+
+def wav_header(sample_rate: int, channels: int = 1, data_size: Optional[int] = None) -> bytes:
+    """
+    Build a 44-byte header for 16-bit PCM WAV data.
+    
+    Args:
+        sample_rate: Samples per second
+        channels: Number of interleaved channels
+        data_size: Length of the PCM data in bytes, or None when streaming
+            (the RIFF and data sizes are then set to the maximum, which
+            decoders read as "until end of stream")
+    
+    Returns:
+        Header bytes
+    """
+    sample_width = 2
+    block_align = channels * sample_width
+    
+    if data_size is None:
+        riff_size = data_size = STREAMING_SIZE
+    else:
+        riff_size = 36 + data_size
+    
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b'data', data_size
+    )
+
+
+def to_pcm16(audio: np.ndarray, block_size: int = 16384) -> np.ndarray:
+    """
+    Get audio as 16-bit PCM samples.
+    
+    int16 input is returned as is. Float input (-1.0 to 1.0) is clipped and
+    converted one block at a time, so the only full-size allocation is the
+    int16 result.
+    
+    Args:
+        audio: Audio samples, shape (frames,) or (frames, channels)
+        block_size: Samples converted per step
+    
+    Returns:
+        C-contiguous int16 array with the same shape
+    """
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return np.ascontiguousarray(audio)
+    
+    pcm = np.empty(audio.shape, dtype=np.int16)
+    source = audio.reshape(-1)
+    target = pcm.reshape(-1)
+    scratch = np.empty(min(block_size, len(source)), dtype=np.float32)
+    
+    for start in range(0, len(source), block_size):
+        end = min(start + block_size, len(source))
+        step = scratch[:end - start]
+        np.multiply(source[start:end], 32767.0, out=step, casting='unsafe')
+        np.clip(step, -32768, 32767, out=step)
+        target[start:end] = step
+    
+    return pcm
+
+
+class WavReader(io.RawIOBase):
+    """
+    Read-only WAV file over in-memory PCM samples.
+    
+    Serves a 44-byte header followed by a memoryview of the samples, so the
+    audio is never copied into a file buffer. Uploads (httpx, the OpenAI
+    SDK) stream it in chunks like any open file.
+    """
+    
+    def __init__(self, pcm: np.ndarray, sample_rate: int, channels: int = 1, name: str = "audio.wav"):
+        super().__init__()
+        self.pcm = pcm
+        self.header = wav_header(sample_rate, channels, pcm.nbytes)
+        self.data = memoryview(pcm).cast('B')
+        self.name = name
+        self.position = 0
+    
+    def __len__(self) -> int:
+        return len(self.header) + len(self.data)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self)
+        self.position = max(0, offset)
+        return self.position
+    
+    def readinto(self, buffer) -> int:
+        """Copy the next bytes of the file into ``buffer``."""
+        target = memoryview(buffer).cast('B')
+        written = 0
+        header_size = len(self.header)
+        
+        if self.position < header_size:
+            part = self.header[self.position:self.position + len(target)]
+            target[:len(part)] = part
+            written = len(part)
+        
+        if written < len(target):
+            start = max(0, self.position + written - header_size)
+            part = self.data[start:start + len(target) - written]
+            target[written:written + len(part)] = part
+            written += len(part)
+        
+        self.position += written
+        return written
+
+
+def encode_wav(audio, sample_rate: int, channels: Optional[int] = None, name: str = "audio.wav") -> WavReader:
+    """
+    Wrap audio as an in-memory 16-bit WAV file, ready to upload.
+    
+    Args:
+        audio: NumPy samples (float or int16) or raw int16 PCM bytes
+        sample_rate: Samples per second
+        channels: Channel count (defaults to the array's second dimension)
+        name: File name reported to upload clients
+    
+    Returns:
+        A file-like WavReader positioned at the start
+    """
+    if not isinstance(audio, np.ndarray):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    if channels is None:
+        channels = audio.shape[1] if audio.ndim == 2 else 1
+    return WavReader(to_pcm16(audio), sample_rate, channels, name)